@@ -25,12 +25,12 @@ from django.utils.translation import ugettext_lazy as _
 
 from django_tools.permissions import check_permission
 
-from publisher import constants
+from publisher import app_settings, constants
 
 from publisher.forms import PublisherForm, PublisherNoteForm, PublisherParlerForm
-from publisher.models import PublisherStateModel
+from publisher.models import PublisherJob, PublisherRelease, PublisherReleaseItem, PublisherStateModel
 from publisher.permissions import can_publish_object, has_object_permission
-from publisher.utils import django_cms_exists, hvad_exists, parler_exists, edit_on_url
+from publisher.utils import PublisherLockError, django_cms_exists, hvad_exists, parler_exists, edit_on_url
 
 log = logging.getLogger(__name__)
 
@@ -68,12 +68,11 @@ class VisibilityMixin:
         list_display = (..., "visibility", ...)
     """
     def visibility(self, obj):
-        is_dirty = obj.is_dirty
-        if obj.publisher_linked:
-            obj = obj.publisher_linked
+        # Use the annotated values from PublisherQuerySet.with_publish_status(), if available.
+        status = obj.get_publish_status
 
-        if obj.is_visible:
-            if is_dirty:
+        if status("is_visible"):
+            if status("is_dirty"):
                 alt_text = _("Changed!")
                 title = _("Changes not yet published. Older version is online.")
                 icon_filename = "icon_alert.gif"
@@ -81,18 +80,20 @@ class VisibilityMixin:
                 alt_text = _("is public")
                 title = _("Is public.")
                 icon_filename = "icon-yes.gif"
-        elif not obj.is_published:
+        elif not status("is_published"):
             alt_text = _("not public")
             title = _("Not published, yet")
             icon_filename = "icon-no.gif"
         else:
             alt_text = _("hidden")
             icon_filename = "icon_alert.gif"
-            if obj.hidden_by_end_date and obj.hidden_by_start_date:
+            hidden_by_start_date = status("hidden_by_start_date")
+            hidden_by_end_date = status("hidden_by_end_date")
+            if hidden_by_end_date and hidden_by_start_date:
                 title = _("Published, but hidden by start/end date.")
-            elif obj.hidden_by_start_date:
+            elif hidden_by_start_date:
                 title = _("Published, but hidden by start date.")
-            elif obj.hidden_by_end_date:
+            elif hidden_by_end_date:
                 title = _("Published, but hidden by end date.")
             else:
                 log.error("Unknown why hidden?!?")
@@ -153,6 +154,10 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
             self.admin_site.name,
             self.url_name_prefix
         )
+        self.job_status_reverse = "%s:%sjob_status" % (
+            self.admin_site.name,
+            self.url_name_prefix
+        )
 
     def get_form(self, request, obj=None, **kwargs):
         """
@@ -215,6 +220,10 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
         return u"%s" % obj
     publisher_object_title.short_description = "Title"
 
+    def is_dirty(self, obj):
+        return obj.get_publish_status("is_dirty")
+    is_dirty.short_description = "Is dirty"
+
     def publisher_status(self, obj):
         if not self.has_publish_permission(self.request, obj, raise_exception=False):
             return ""
@@ -222,7 +231,7 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
         template_name = "publisher/change_list_publish_status.html"
 
         publish_btn = None
-        if obj.is_dirty:
+        if obj.get_publish_status("is_dirty"):
             publish_btn = reverse(self.publish_reverse, args=(obj.pk, ))
 
         t = loader.get_template(template_name)
@@ -237,7 +246,7 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
         template_name = "publisher/change_list_publish.html"
 
         is_published = False
-        if obj.publisher_linked and obj.publisher_is_draft:
+        if obj.publisher_linked_id and obj.publisher_is_draft:
             is_published = True
 
         t = loader.get_template(template_name)
@@ -255,7 +264,7 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
     def get_queryset(self, request):
         # hack! We need request.user to check user publish perms
         self.request = request
-        qs = self.model.objects.drafts()
+        qs = self.model.objects.drafts().with_publish_status()
         ordering = self.get_ordering(request)
         if ordering:
             qs = qs.order_by(*ordering)
@@ -269,10 +278,12 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
         publish_name = "%spublish" % (self.url_name_prefix, )
         unpublish_name = "%sunpublish" % (self.url_name_prefix, )
         revert_name = "%srevert" % (self.url_name_prefix, )
+        job_status_name = "%sjob_status" % (self.url_name_prefix, )
         publish_urls = [
             url(r"^(?P<object_id>\d+)/publish/$", self.publish_view, name=publish_name),
             url(r"^(?P<object_id>\d+)/unpublish/$", self.unpublish_view, name=unpublish_name),
             url(r"^(?P<object_id>\d+)/revert/$", self.revert_view, name=revert_name),
+            url(r"^job/(?P<job_id>\d+)/$", self.job_status_view, name=job_status_name),
         ]
 
         return publish_urls + urls
@@ -290,12 +301,50 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
 
         return obj
 
+    def locked_response(self, request, err):
+        log.warning("Publisher action failed: %s", err)
+        msg = _("Someone else is publishing this entry at the moment. Please try again.")
+        if not request.is_ajax():
+            messages.error(request, msg)
+            return HttpResponseRedirect(reverse(self.changelist_reverse))
+
+        return http_json_response({"success": False, "error": force_text(msg)})
+
+    def enqueue_response(self, request, obj, action):
+        """
+        Create a PublisherJob, used if settings.PUBLISHER_BACKGROUND_PUBLISH is True
+        """
+        job = PublisherJob.objects.enqueue(action=action, publisher_instance=obj, user=request.user)
+
+        if not request.is_ajax():
+            messages.success(request, _("The %s job has been queued.") % job.action_name)
+            return HttpResponseRedirect(reverse(self.changelist_reverse))
+
+        return http_json_response({
+            "success": True,
+            "job": job.status_dict(),
+            "status_url": reverse(self.job_status_reverse, args=(job.pk, )),
+        })
+
+    def job_status_view(self, request, job_id):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+
+        job = get_object_or_404(PublisherJob,
+            pk=job_id,
+            content_type=ContentType.objects.get_for_model(self.model),
+        )
+        return http_json_response(job.status_dict())
+
     def revert_view(self, request, object_id):
         obj = self.get_model_object(request, object_id)
 
         self.has_publish_permission(request, obj, raise_exception=True)
 
-        obj.revert_to_public()
+        try:
+            obj.revert_to_public()
+        except PublisherLockError as err:
+            return self.locked_response(request, err)
 
         if not request.is_ajax():
             messages.success(request, _("Draft has been revert to the public version."))
@@ -308,7 +357,13 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
 
         self.has_publish_permission(request, obj, raise_exception=True)
 
-        obj.unpublish()
+        if app_settings.PUBLISHER_BACKGROUND_PUBLISH:
+            return self.enqueue_response(request, obj, constants.ACTION_UNPUBLISH)
+
+        try:
+            obj.unpublish()
+        except PublisherLockError as err:
+            return self.locked_response(request, err)
 
         if not request.is_ajax():
             messages.success(request, _("Published version has been deleted."))
@@ -321,7 +376,13 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
 
         self.has_publish_permission(request, obj, raise_exception=True)
 
-        obj.publish()
+        if app_settings.PUBLISHER_BACKGROUND_PUBLISH:
+            return self.enqueue_response(request, obj, constants.ACTION_PUBLISH)
+
+        try:
+            obj.publish()
+        except PublisherLockError as err:
+            return self.locked_response(request, err)
 
         if not request.is_ajax():
             messages.success(request, _("Draft version has been published."))
@@ -331,7 +392,8 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
 
     def post_ask_publish(self, request, obj, form):
         if not obj.is_dirty:
-            # FIXME: Will never happen, because obj.save() always sets the dirty flag, no matter if something"s changed :(
+            # Note: Will only happen with 'publisher_track_fingerprint', otherwise
+            # obj.save() always sets the dirty flag, no matter if something"s changed :(
             messages.warning(request, _("Don't create publish request, because it's not dirty!"))
             return False
 
@@ -377,7 +439,13 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
     def post_save_and_publish(self, request, obj, form):
         self.has_publish_permission(request, obj, raise_exception=True)
 
-        obj.publish()
+        if app_settings.PUBLISHER_BACKGROUND_PUBLISH:
+            return self.enqueue_response(request, obj, constants.ACTION_PUBLISH)
+
+        try:
+            obj.publish()
+        except PublisherLockError as err:
+            return self.locked_response(request, err)
 
         if not request.is_ajax():
             messages.success(request, _("Draft version has been published."))
@@ -444,6 +512,13 @@ class PublisherAdmin(VisibilityMixin, ModelAdmin):
                 if obj.is_dirty and callable(getattr(obj, "get_absolute_url", None)):
                     context["preview_draft_btn"] = True
 
+            if app_settings.PUBLISHER_BACKGROUND_PUBLISH:
+                # The progress is polled via job_status_view() in publisher.js
+                job = PublisherJob.objects.for_instance(obj).unfinished().order_by("-pk").first()
+                if job is not None:
+                    context["publisher_job"] = job
+                    context["publisher_job_status_url"] = reverse(self.job_status_reverse, args=(job.pk, ))
+
         if self.user_can_publish:
             if current_request is None:
                 context["POST_SAVE_AND_PUBLISH_KEY"] = constants.POST_SAVE_AND_PUBLISH_KEY
@@ -511,7 +586,7 @@ if parler_exists:
             qs_language = self.get_queryset_language(request)
             if qs_language:
                 qs = qs.language(qs_language)
-            qs = qs.filter(publisher_is_draft=True)
+            qs = qs.filter(publisher_is_draft=True).with_publish_status()
             ordering = getattr(self, "ordering", None) or ()
             if ordering:
                 qs = qs.order_by(*ordering)
@@ -997,3 +1072,46 @@ class PublisherStateModelAdmin(admin.ModelAdmin):
         StatusListFilter,
         "action", "state",
     )
+
+
+def execute_releases(modeladmin, request, queryset):
+    """
+    Execute the selected releases: The user needs 'can_publish' for all models in the releases.
+    """
+    for release in queryset.filter(state=constants.RELEASE_STATE_OPEN):
+        for item in release.items.select_related("content_type"):
+            can_publish_object(request.user, opts=item.content_type.model_class()._meta, raise_exception=True)
+
+        try:
+            publish_count, unpublish_count = release.execute()
+        except Exception as err:
+            # The error is stored in the release, too.
+            messages.error(request, _("Release %(release)s failed: %(error)s") % {"release": release, "error": err})
+        else:
+            messages.success(request, _("Release %(release)s executed: %(published)i published, %(unpublished)i unpublished.") % {
+                "release": release, "published": publish_count, "unpublished": unpublish_count,
+            })
+
+
+execute_releases.short_description = _("Execute selected releases")
+
+
+class PublisherReleaseItemInline(admin.TabularInline):
+    model = PublisherReleaseItem
+    fields = ("content_type", "object_id", "action", "publisher_instance")
+    readonly_fields = ("publisher_instance",)
+    extra = 0
+
+
+@admin.register(PublisherRelease)
+class PublisherReleaseAdmin(admin.ModelAdmin):
+    inlines = (PublisherReleaseItemInline,)
+    actions = (execute_releases,)
+    list_display = ("name", "scheduled_at", "state", "created_at", "executed_at", "user")
+    list_filter = ("state",)
+    readonly_fields = ("state", "created_at", "executed_at", "user", "error")
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.user = request.user
+        super(PublisherReleaseAdmin, self).save_model(request, obj, form, change)
@@ -3,3 +3,60 @@ from django.conf import settings
 
 # Is used to reverse admin urls:
 ADMIN_NAMESPACE = getattr(settings, "ADMIN_NAMESPACE", "admin")
+
+# Max. seconds to wait for the row lock on publish/unpublish/revert:
+#   None -> wait (database default)
+#   0 -> don't wait (SELECT ... FOR UPDATE NOWAIT)
+#   > 0 -> seconds to wait (PostgreSQL only)
+# A PublisherLockError will be raised if the lock can't be acquired.
+PUBLISHER_LOCK_TIMEOUT = getattr(settings, "PUBLISHER_LOCK_TIMEOUT", None)
+
+# (Un-)publish in admin views and on accepted requests via a PublisherJob,
+# executed by the 'publisher_worker' management command:
+PUBLISHER_BACKGROUND_PUBLISH = getattr(settings, "PUBLISHER_BACKGROUND_PUBLISH", False)
+
+# A PublisherJob that can't get the row lock is retried after this number of seconds,
+# doubled on every attempt. It fails after PUBLISHER_JOB_MAX_ATTEMPTS attempts.
+PUBLISHER_JOB_RETRY_DELAY = getattr(settings, "PUBLISHER_JOB_RETRY_DELAY", 5)
+PUBLISHER_JOB_MAX_ATTEMPTS = getattr(settings, "PUBLISHER_JOB_MAX_ATTEMPTS", 10)
+
+# Seconds after that a running PublisherJob is claimed again (e.g.: the worker was killed):
+PUBLISHER_JOB_STALE_TIMEOUT = getattr(settings, "PUBLISHER_JOB_STALE_TIMEOUT", 10 * 60)
+
+# Retention of PublisherSnapshot entries (for models with 'publisher_snapshots = True'),
+# applied on every publish:
+#   Max. number of snapshots per entry (None -> unlimited)
+PUBLISHER_SNAPSHOT_MAX_COUNT = getattr(settings, "PUBLISHER_SNAPSHOT_MAX_COUNT", 10)
+#   Delete snapshots older than this number of days (None -> never)
+PUBLISHER_SNAPSHOT_MAX_AGE = getattr(settings, "PUBLISHER_SNAPSHOT_MAX_AGE", None)
+
+# Max. number of drafts per batch in bulk (un-)publish, see: PublisherQuerySet.publish()
+PUBLISHER_BULK_BATCH_SIZE = getattr(settings, "PUBLISHER_BULK_BATCH_SIZE", 500)
+
+# Alias of the Django cache that stores the publish generations, see: publisher/generations.py
+PUBLISHER_CACHE = getattr(settings, "PUBLISHER_CACHE", "default")
+
+# Default bucket size in seconds of PublisherQuerySet.cached_visible():
+# 'now' is rounded down to it, so entries become visible/hidden up to this delay
+PUBLISHER_VISIBLE_GRANULARITY = getattr(settings, "PUBLISHER_VISIBLE_GRANULARITY", 60)
+
+# Max. seconds for "Cache-Control: max-age" of PublisherDetailView/PublisherListView responses.
+# The max-age ends at the next visibility change by publication_start_date/publication_end_date.
+#   None -> don't set Cache-Control
+PUBLISHER_VIEW_MAX_AGE = getattr(settings, "PUBLISHER_VIEW_MAX_AGE", None)
+
+# Database aliases of the read replicas for published()/visible() querysets,
+# used by publisher.routers.PublisherRouter (empty -> read from the primary database)
+PUBLISHER_READ_DATABASES = getattr(settings, "PUBLISHER_READ_DATABASES", ())
+
+# Seconds to read from the primary database after (un-)publish, see: publisher/routers.py
+PUBLISHER_PIN_SECONDS = getattr(settings, "PUBLISHER_PIN_SECONDS", 5)
+
+# Max. seconds to cache a public instance, see: PublisherQuerySet.get_cached()
+PUBLISHER_INSTANCE_CACHE_TIMEOUT = getattr(settings, "PUBLISHER_INSTANCE_CACHE_TIMEOUT", 300)
+# Max. size in bytes of a cached public instance (None -> unlimited)
+PUBLISHER_INSTANCE_CACHE_MAX_SIZE = getattr(settings, "PUBLISHER_INSTANCE_CACHE_MAX_SIZE", 100 * 1024)
+
+# Seconds to catch up on the first run of the 'publisher_scheduler' management command
+# (without a stored last run): The signals are sent for the changes in this period.
+PUBLISHER_SCHEDULER_CATCH_UP = getattr(settings, "PUBLISHER_SCHEDULER_CATCH_UP", 24 * 60 * 60)
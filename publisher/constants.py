@@ -10,6 +10,17 @@ STATE_REJECTED = "rejected"
 STATE_ACCEPTED = "accepted"
 STATE_DONE = "done"
 
+# PublisherJob.state choice keys:
+JOB_STATE_PENDING = "pending"
+JOB_STATE_RUNNING = "running"
+JOB_STATE_DONE = "done"
+JOB_STATE_FAILED = "failed"
+
+# PublisherRelease.state choice keys:
+RELEASE_STATE_OPEN = "open"
+RELEASE_STATE_DONE = "done"
+RELEASE_STATE_FAILED = "failed"
+
 
 ##############################################################################
 # permissions
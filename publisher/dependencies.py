@@ -0,0 +1,308 @@
+"""
+    Find the related publisher drafts of a draft and publish them
+    before the draft itself, see: PublisherModelBase.publish(with_dependencies=True)
+
+    Dependencies are the targets of ForeignKeys and ManyToManyFields
+    to other publisher models, followed recursively.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.apps import apps
+from django.db.models import Case, F, Value, When
+
+log = logging.getLogger(__name__)
+
+
+def is_publisher_model(model):
+    from publisher.models import PublisherModelBase
+
+    return isinstance(model, type) and issubclass(model, PublisherModelBase)
+
+
+def get_dependency_fields(model):
+    """
+    Returns the ForeignKeys and the ManyToManyFields of model that
+    points to publisher models, as a tuple of two lists.
+    """
+    foreign_keys = []
+    many_to_many = []
+    for field in model._meta.get_fields():
+        if not field.is_relation or field.auto_created or not is_publisher_model(field.related_model):
+            continue
+        if field.name in model.publisher_fields:
+            continue
+
+        if field.many_to_one or field.one_to_one:
+            foreign_keys.append(field)
+        elif field.many_to_many:
+            many_to_many.append(field)
+
+    return foreign_keys, many_to_many
+
+
+def get_dependencies(model, pks):
+    """
+    Returns the direct dependencies of the drafts with the given pks
+    as a dict: {<pk>: set([(<model>, <pk>), ...])}
+    Not existing drafts are not included.
+    The number of queries doesn't depend on the number of drafts.
+    """
+    foreign_keys, many_to_many = get_dependency_fields(model)
+
+    attnames = [field.attname for field in foreign_keys]
+    rows = model._base_manager.filter(pk__in=pks, publisher_is_draft=True).values_list("pk", *attnames)
+
+    dependencies = {}
+    for row in rows:
+        pk = row[0]
+        dependencies[pk] = set(
+            (field.related_model, value)
+            for field, value in zip(foreign_keys, row[1:])
+            if value is not None
+        )
+
+    for field in many_to_many:
+        through = field.remote_field.through
+        source_field = through._meta.get_field(field.m2m_field_name())
+        target_field = through._meta.get_field(field.m2m_reverse_field_name())
+
+        rows = through._base_manager.filter(
+            **{"%s__in" % source_field.attname: list(dependencies)}
+        ).values_list(source_field.attname, target_field.attname)
+        for pk, target_pk in rows:
+            dependencies[pk].add((field.related_model, target_pk))
+
+    return dependencies
+
+
+def get_dependency_graph(instance):
+    """
+    Returns all drafts reachable from instance as a dict:
+        {(<model>, <pk>): set([(<model>, <pk>), ...])}
+    Every draft is included only once.
+    """
+    graph = {}
+    seen = set()
+
+    root = (instance.__class__, instance.pk)
+    pending = {instance.__class__: set([instance.pk])}
+    seen.add(root)
+
+    while pending:
+        next_pending = defaultdict(set)
+        for model, pks in pending.items():
+            for pk, dependencies in get_dependencies(model, pks).items():
+                graph[(model, pk)] = dependencies
+                for node in dependencies:
+                    if node not in seen:
+                        seen.add(node)
+                        next_pending[node[0]].add(node[1])
+        pending = next_pending
+
+    return graph
+
+
+def get_publish_batches(graph):
+    """
+    Sort the graph topological: Returns a list of sets,
+    every draft comes after all its dependencies.
+    Drafts in a dependency cycle are put into the same set.
+    """
+    remaining = dict(
+        (node, set(dependency for dependency in dependencies if dependency in graph and dependency != node))
+        for node, dependencies in graph.items()
+    )
+
+    batches = []
+    while remaining:
+        batch = set(node for node, dependencies in remaining.items() if not dependencies)
+        if not batch:
+            # Cyclic dependencies: publish them together
+            batch = set(remaining)
+
+        batches.append(batch)
+        for node in batch:
+            del remaining[node]
+        for dependencies in remaining.values():
+            dependencies -= batch
+
+    return batches
+
+
+def get_items_graph(nodes):
+    """
+    Returns the dependency graph between the given drafts (a list of (<model>, <pk>) tuples),
+    without following dependencies outside of them.
+    """
+    pks_by_model = defaultdict(set)
+    for model, pk in nodes:
+        pks_by_model[model].add(pk)
+
+    graph = {}
+    for model, pks in pks_by_model.items():
+        for pk, dependencies in get_dependencies(model, pks).items():
+            graph[(model, pk)] = dependencies
+    return graph
+
+
+def publish_graph(graph, exclude=(), using=None):
+    """
+    Publish all dirty drafts of the graph, dependencies first. Every batch is
+    published with one PublisherQuerySet.publish() per model.
+    After all batches, the public ForeignKeys are pointed to the public
+    dependencies, see: remap_foreign_keys()
+
+    using: database alias of the publish transaction (None -> the router decides)
+
+    Models with 'publisher_update_in_place' are published one by one
+    (by PublisherQuerySet.publish()), so their public pk stays stable.
+
+    Returns the number of published drafts.
+    """
+    count = 0
+    for batch in get_publish_batches(graph):
+        pks_by_model = defaultdict(list)
+        for model, pk in batch:
+            if (model, pk) not in exclude:
+                pks_by_model[model].append(pk)
+
+        for model, pks in pks_by_model.items():
+            drafts = [
+                draft for draft in model.objects.db_manager(using).filter(pk__in=pks).with_publish_status().order_by("pk")
+                if draft.get_publish_status("is_dirty")
+            ]
+            if not drafts:
+                continue
+
+            log.debug("Publish %i %s entries", len(drafts), model.__name__)
+
+            model.objects.db_manager(using).filter(pk__in=[draft.pk for draft in drafts]).publish()
+            count += len(drafts)
+
+    pks_by_model = defaultdict(list)
+    for model, pk in graph:
+        if (model, pk) not in exclude:
+            pks_by_model[model].append(pk)
+    for model, pks in pks_by_model.items():
+        remap_foreign_keys(model, pks, using=using)
+
+    return count
+
+
+def remap_foreign_keys(model, pks, using=None):
+    """
+    Point the ForeignKeys of the public versions of the drafts with the given pks
+    to the public version of their targets (like bulk_clone_relations() does
+    for ManyToManyFields), with one UPDATE per field.
+    Targets without a public version are not changed.
+
+    Returns the changed values as a dict: {<public pk>: {<attname>: <value>, ...}}
+    """
+    foreign_keys = get_dependency_fields(model)[0]
+    if not foreign_keys:
+        return {}
+
+    manager = model._base_manager.db_manager(using)
+    public_pks = list(
+        manager.filter(pk__in=pks, publisher_is_draft=True, publisher_linked__isnull=False)
+        .values_list("publisher_linked", flat=True)
+    )
+    if not public_pks:
+        return {}
+
+    attnames = [field.attname for field in foreign_keys]
+    rows = list(manager.filter(pk__in=public_pks).values_list("pk", *attnames))
+
+    changes = defaultdict(dict)
+    for index, field in enumerate(foreign_keys, start=1):
+        target_ids = set(row[index] for row in rows if row[index] is not None)
+        if not target_ids:
+            continue
+
+        # Replace the draft targets with their public version:
+        target_map = dict(
+            field.related_model._base_manager.db_manager(using).filter(
+                pk__in=target_ids, publisher_is_draft=True, publisher_linked__isnull=False
+            ).values_list("pk", "publisher_linked")
+        )
+        if not target_map:
+            continue
+        repoint_references([(manager, field, public_pks)], target_map)
+
+        for row in rows:
+            if row[index] in target_map:
+                changes[row[0]][field.attname] = target_map[row[index]]
+
+    return dict(changes)
+
+
+def publish_dependencies(instance):
+    """
+    Publish all dirty drafts that instance depends on (but not instance itself).
+
+    Returns the number of published drafts.
+    """
+    root = (instance.__class__, instance.pk)
+    return publish_graph(get_dependency_graph(instance), exclude=(root,), using=instance._state.db)
+
+
+def get_public_references(model, public_pks, using=None):
+    """
+    Returns the references of public entries to the given public entries of model:
+    ForeignKeys and through rows of ManyToManyFields (e.g. set by remap_foreign_keys()
+    or PublisherModelBase.bulk_clone_relations()), as a list of tuples:
+        [(<manager>, <field>, [<row pk>, ...]), ...]
+    Used to keep them, if public entries are replaced on publish, see: repoint_references()
+    """
+    references = []
+    if not public_pks:
+        return references
+
+    for source_model in apps.get_models():
+        if not is_publisher_model(source_model):
+            continue
+
+        foreign_keys, many_to_many = get_dependency_fields(source_model)
+        for field in foreign_keys:
+            if field.related_model is not model:
+                continue
+            manager = source_model._base_manager.db_manager(using)
+            row_pks = list(manager.filter(
+                publisher_is_draft=False, **{"%s__in" % field.attname: public_pks}
+            ).values_list("pk", flat=True))
+            if row_pks:
+                references.append((manager, field, row_pks))
+
+        for field in many_to_many:
+            if field.related_model is not model:
+                continue
+            through = field.remote_field.through
+            source_field = through._meta.get_field(field.m2m_field_name())
+            target_field = through._meta.get_field(field.m2m_reverse_field_name())
+            manager = through._base_manager.db_manager(using)
+            row_pks = list(manager.filter(**{
+                "%s__in" % target_field.attname: public_pks,
+                "%s__publisher_is_draft" % source_field.name: False,
+            }).values_list("pk", flat=True))
+            if row_pks:
+                references.append((manager, target_field, row_pks))
+
+    return references
+
+
+def repoint_references(references, pk_map):
+    """
+    Point the references from get_public_references() from the old
+    to the new pk, pk_map is a dict: {<old pk>: <new pk>}
+    One UPDATE per field.
+    """
+    for manager, field, row_pks in references:
+        manager.filter(pk__in=row_pks).update(**{
+            field.attname: Case(
+                *[When(**{field.attname: old_pk, "then": Value(new_pk)}) for old_pk, new_pk in pk_map.items()],
+                default=F(field.attname),
+                output_field=field.target_field
+            )
+        })
@@ -0,0 +1,105 @@
+"""
+    Publish generation counters in the Django cache.
+
+    Every (un-)publish increments the generation of the model and resets
+    the generation of the (un-)published objects. Use the generations
+    in cache keys, so cached content of a model or an object is
+    invalidated on the next (un-)publish without a database query:
+
+        key = "news-list-%s" % NewsEntry.objects.publish_generation()
+        key = "news-detail-%s-%s" % (pk, NewsEntry.objects.publish_generation(pk=pk))
+
+    Object generations are keyed by the draft pk, because the
+    public pk changes on every publish.
+"""
+
+import logging
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+from publisher import app_settings
+
+log = logging.getLogger(__name__)
+
+
+KEY_PREFIX = "publisher_generation"
+
+
+def get_cache():
+    return caches[app_settings.PUBLISHER_CACHE]
+
+
+def get_generation_key(model, pk=None):
+    opts = model._meta.concrete_model._meta
+    key = "%s:%s.%s" % (KEY_PREFIX, opts.app_label, opts.model_name)
+    if pk is not None:
+        key += ":%s" % pk
+    return key
+
+
+def get_initial_generation():
+    """
+    Start with the current time in milliseconds, so a new counter will not
+    reuse old generations, e.g.: after a cache eviction or restart.
+    """
+    return int(time.time() * 1000)
+
+
+def get_model_generation(model):
+    cache = get_cache()
+    key = get_generation_key(model)
+
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, get_initial_generation(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_generation(model, pk=None):
+    """
+    Returns the current generation of the model or of the draft with the given pk.
+    """
+    if pk is None:
+        return get_model_generation(model)
+
+    cache = get_cache()
+    key = get_generation_key(model, pk)
+
+    generation = cache.get(key)
+    if generation is None:
+        # The model generation was incremented on the last (un-)publish,
+        # so the object never gets an old generation again:
+        cache.add(key, get_model_generation(model), None)
+        generation = cache.get(key)
+    return generation
+
+
+def increment_generation(model, pks=()):
+    """
+    Increment the model generation and reset the generations
+    of the drafts with the given pks.
+    """
+    cache = get_cache()
+    key = get_generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Not in cache: start a new counter
+        cache.add(key, get_initial_generation(), None)
+        cache.incr(key)
+
+    if pks:
+        cache.delete_many([get_generation_key(model, pk) for pk in pks])
+
+
+def increment_generation_on_commit(model, pks=(), using=None):
+    """
+    Increment the generations after the current transaction is committed,
+    otherwise new generations may be used to cache old content.
+    Called on every (un-)publish.
+    """
+    pks = list(pks)
+    transaction.on_commit(lambda: increment_generation(model, pks), using=using)
@@ -0,0 +1,66 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+
+from publisher.models import PUBLISHER_INDEX_TOGETHER
+from publisher.scheduler import get_publisher_models
+
+
+def get_index_columns(model, using):
+    """
+    Returns the columns of all existing indexes of the model table as a set of tuples.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return set(tuple(info["columns"]) for info in constraints.values() if info["index"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Report publisher models that are missing the composite indexes"
+        " of PublisherModel.Meta.index_together and create their migrations"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--makemigrations', action='store_true', default=False,
+            help='Create the migrations for all models that declare the indexes'
+        )
+
+    def handle(self, *args, **options):
+        missing_count = 0
+        app_labels = set()
+        for model in get_publisher_models():
+            opts = model._meta
+            if opts.proxy or not opts.managed:
+                continue
+
+            declared = set(tuple(fields) for fields in opts.index_together)
+            using = router.db_for_write(model)
+            existing = get_index_columns(model, using)
+
+            for fields in PUBLISHER_INDEX_TOGETHER:
+                if fields not in declared:
+                    missing_count += 1
+                    self.stdout.write(
+                        "%s: index %s not declared, derive Meta from PublisherModel.Meta" % (
+                            opts.label, ", ".join(fields)
+                        )
+                    )
+                    continue
+
+                columns = tuple(opts.get_field(name).column for name in fields)
+                if columns not in existing:
+                    missing_count += 1
+                    app_labels.add(opts.app_label)
+                    self.stdout.write("%s: index %s missing in database %r" % (
+                        opts.label, ", ".join(fields), using
+                    ))
+
+        if not missing_count:
+            self.stdout.write("All publisher indexes exist.")
+            return
+
+        if options["makemigrations"] and app_labels:
+            call_command("makemigrations", *sorted(app_labels), stdout=self.stdout)
+            self.stdout.write("Apply the migrations with: ./manage.py migrate")
@@ -0,0 +1,85 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from publisher import app_settings, scheduler
+from publisher.models import PublisherSchedulerRun
+
+
+class Command(BaseCommand):
+    help = (
+        "Send 'publisher_became_visible' and 'publisher_became_hidden' signals"
+        " if entries became visible/hidden by publication start/end date"
+        " and execute scheduled releases"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', default=False,
+            help='Send signals for all changes since the last run and exit'
+        )
+        parser.add_argument('--since',
+            help='Send signals for all changes since this ISO 8601 datetime (default: last run)'
+        )
+        parser.add_argument('--max-sleep', type=float, default=60.0,
+            help='Max. seconds to sleep until the next change (default: 60)'
+        )
+        parser.add_argument('--batch-size', type=int, default=scheduler.BATCH_SIZE,
+            help='Max. number of pks per signal (default: %i)' % scheduler.BATCH_SIZE
+        )
+
+    def get_since(self, since):
+        if since is None:
+            return PublisherSchedulerRun.objects.get_last_run()
+
+        dt = parse_datetime(since)
+        if dt is None:
+            raise CommandError("Invalid datetime: %r" % since)
+        if timezone.is_naive(dt):
+            dt = timezone.make_aware(dt)
+        return dt
+
+    def handle(self, *args, **options):
+        max_sleep = options["max_sleep"]
+        batch_size = options["batch_size"]
+
+        since = self.get_since(options["since"])
+        if since is None:
+            # First run: Catch up the last settings.PUBLISHER_SCHEDULER_CATCH_UP seconds
+            # and set 'publisher_visible' of all entries, older changes are not tracked.
+            now = timezone.now()
+            since = now - datetime.timedelta(seconds=app_settings.PUBLISHER_SCHEDULER_CATCH_UP)
+            count = scheduler.update_visible(now)
+            if count:
+                self.stdout.write("%i 'publisher_visible' entries updated." % count)
+
+        while True:
+            now = timezone.now()
+
+            release_count = scheduler.execute_due_releases(now)
+            if release_count:
+                self.stdout.write("%i releases executed." % release_count)
+
+            visible_count, hidden_count = scheduler.send_transitions(since, now, batch_size=batch_size)
+            PublisherSchedulerRun.objects.set_last_run(now)
+            since = now
+
+            if visible_count or hidden_count:
+                self.stdout.write("%i entries became visible, %i entries became hidden." % (
+                    visible_count, hidden_count
+                ))
+
+            if options["once"]:
+                break
+
+            # Sleep exactly until the next change, but wake up regularly,
+            # because new entries with earlier dates can be published in the meantime.
+            sleep = max_sleep
+            next_transition = scheduler.next_transition(now)
+            if next_transition is not None:
+                seconds = (next_transition - timezone.now()).total_seconds()
+                sleep = max(min(seconds, max_sleep), 0)
+
+            time.sleep(sleep)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from publisher.scheduler import get_publisher_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the 'publisher_visible' field of all public entries by publication start/end date,"
+        " for models with 'publisher_track_visible'. Run it once after enabling the option."
+    )
+
+    def handle(self, *args, **options):
+        for model in get_publisher_models():
+            if not model.publisher_track_visible:
+                continue
+
+            count = model.objects.update_visible()
+            self.stdout.write("%s: %i entries updated." % (model._meta.label, count))
@@ -0,0 +1,66 @@
+import logging
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from publisher.models import PublisherJob
+
+log = logging.getLogger(__name__)
+
+
+def run_worker(once, sleep):
+    """
+    Claim and run PublisherJob entries.
+    Returns the number of executed jobs, if 'once' is True.
+    """
+    count = 0
+    try:
+        while True:
+            job = PublisherJob.objects.claim()
+            if job is None:
+                if once:
+                    break
+                time.sleep(sleep)
+                continue
+
+            job.run()
+            count += 1
+    finally:
+        connections.close_all()
+
+    return count
+
+
+class Command(BaseCommand):
+    help = 'Execute the queued (un-)publish jobs (see: settings.PUBLISHER_BACKGROUND_PUBLISH)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+            help='Number of parallel worker processes (default: 1)'
+        )
+        parser.add_argument('--once', action='store_true', default=False,
+            help='Exit if all claimable jobs are done (delayed retries are not awaited)'
+        )
+        parser.add_argument('--sleep', type=float, default=1.0,
+            help='Seconds to wait for new jobs (default: 1.0)'
+        )
+
+    def handle(self, *args, **options):
+        processes = options["processes"]
+        once = options["once"]
+        sleep = options["sleep"]
+
+        if processes <= 1:
+            count = run_worker(once, sleep)
+        else:
+            # Every process must open its own database connection:
+            connections.close_all()
+            pool = multiprocessing.Pool(processes)
+            try:
+                count = sum(pool.starmap(run_worker, [(once, sleep)] * processes))
+            finally:
+                pool.terminate()
+
+        self.stdout.write("%i jobs executed." % count)
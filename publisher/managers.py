@@ -1,18 +1,27 @@
+import datetime
+import functools
+import hashlib
 import logging
+import math
+import pickle
+from collections import defaultdict
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.urlresolvers import reverse
-from django.db import models
-from django.db.models import Q
+from django.db import connections, models, router, transaction
+from django.db.models import Case, Count, F, Max, Min, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from cms.models import Page
+from cms.models import CMSPlugin, Page
 
-from publisher import constants
+from publisher import app_settings, constants, dependencies, generations, snapshots
 from publisher.permissions import has_object_permission
-from publisher.utils import parler_exists
+from publisher.utils import chunks, floor_datetime, lock_queryset, parler_exists
 
 from .signal_handlers import publisher_post_save, publisher_pre_delete
+from .signals import (publisher_post_bulk_publish, publisher_post_bulk_unpublish, publisher_pre_bulk_publish,
+                      publisher_pre_bulk_unpublish)
 
 log = logging.getLogger(__name__)
 
@@ -26,26 +35,526 @@ class PublisherQuerySet(models.QuerySet):
         Note: will ignore start/end date!
         Use self.visible() to get all publicly accessible entries.
         """
-        return self.filter(
+        queryset = self.filter(
             publisher_is_draft=False,
         )
+        # Allow the PublisherRouter to read from a replica, see: publisher/routers.py
+        queryset._hints = dict(queryset._hints, publisher_public=True)
+        return queryset
 
-    def visible(self):
+    def visible(self, granularity=None):
         """
         Filter all publicly accessible entries.
+
+        granularity (seconds or timedelta): round 'now' down to this bucket,
+        so all calls in the same bucket produce the same SQL statement.
+        Entries become visible/hidden up to 'granularity' later.
+        """
+        now = floor_datetime(timezone.now(), granularity)
+        return self._visible_at(now)
+
+    def _visible_at(self, now):
+        return self.published().filter(self._get_visible_q(now))
+
+    def _get_visible_q(self, now):
+        if self.model.publisher_track_visible:
+            # Maintained on (un-)publish and by the scheduler, see: update_visible()
+            return Q(publisher_visible=True)
+        return self._visible_q(now)
+
+    def _visible_q(self, now):
+        return (
+            (Q(publication_start_date__isnull=True) | Q(publication_start_date__lte=now)) &
+            (Q(publication_end_date__isnull=True) | Q(publication_end_date__gt=now))
+        )
+
+    def update_visible(self, now=None):
+        """
+        Set the denormalized 'publisher_visible' flag of the public entries
+        by publication_start_date/publication_end_date at 'now',
+        used for models with 'publisher_track_visible'.
+        Returns the number of changed entries.
+        """
+        if now is None:
+            now = timezone.now()
+
+        queryset = self.published()
+        visible_q = self._visible_q(now)
+        count = queryset.filter(visible_q, publisher_visible=False).update(publisher_visible=True)
+        count += queryset.filter(publisher_visible=True).exclude(visible_q).update(publisher_visible=False)
+        return count
+
+    def cached_visible(self, granularity=None):
+        """
+        Like visible(granularity), but the pks of the visible entries are
+        stored in the cache (settings.PUBLISHER_CACHE), so only cache misses hit the database.
+        Returns a queryset filtered by these pks.
+
+        The cache key contains the model, the filters, the bucket of 'now' and the
+        publish generation, so every (un-)publish invalidates it. It doesn't contain
+        the database, so all read replicas share the same entry. The cache timeout ends at the
+        end of the bucket or at the next visibility change, whichever comes first.
         """
+        if granularity is None:
+            granularity = app_settings.PUBLISHER_VISIBLE_GRANULARITY
+        if isinstance(granularity, datetime.timedelta):
+            granularity = granularity.total_seconds()
+
         now = timezone.now()
-        return self.filter(
-            Q(publication_start_date__isnull=True) | Q(publication_start_date__lte=now),
-            Q(publication_end_date__isnull=True) | Q(publication_end_date__gt=now),
-            publisher_is_draft=False,
+        bucket = floor_datetime(now, granularity)
+        queryset = self._visible_at(bucket)
+
+        sql, params = queryset.values_list("pk", flat=True).query.sql_with_params()
+        cache = generations.get_cache()
+        key = "publisher_visible:%s:%s:%s" % (
+            generations.get_generation_key(self.model),
+            generations.get_generation(self.model),
+            hashlib.md5(repr((sql, params)).encode("utf-8")).hexdigest(),
+        )
+
+        pks = cache.get(key)
+        if pks is None:
+            pks = list(queryset.values_list("pk", flat=True))
+
+            expire_at = bucket + datetime.timedelta(seconds=granularity)
+            next_change = self.next_visibility_change(now=now)
+            if next_change is not None and next_change < expire_at:
+                expire_at = next_change
+            timeout = max(1, int(math.ceil((expire_at - now).total_seconds())))
+
+            cache.set(key, pks, timeout)
+
+        return self.filter(pk__in=pks)
+
+    def get_cached(self, **lookup):
+        """
+        Like published().get(**lookup), but the instance is stored in the cache
+        (settings.PUBLISHER_CACHE), with prefetched translations.
+
+        Cached instances are invalidated by the publish generation of their draft,
+        so (un-)publish and visibility changes found by the scheduler invalidate them.
+        The timeout is settings.PUBLISHER_INSTANCE_CACHE_TIMEOUT, but ends at the next
+        publication start/end date of the instance. Instances bigger than
+        settings.PUBLISHER_INSTANCE_CACHE_MAX_SIZE bytes are not cached.
+        Note: The max. number of cached entries is set by the cache backend, e.g.: MAX_ENTRIES
+        """
+        model = self.model
+        queryset = self.published().filter(**lookup)
+
+        sql, params = queryset.query.sql_with_params()
+        cache = generations.get_cache()
+        key = "publisher_instance:%s:%s" % (
+            generations.get_generation_key(model),
+            hashlib.md5(repr((self._db, sql, params)).encode("utf-8")).hexdigest(),
+        )
+
+        entry = cache.get(key)
+        if entry is not None:
+            draft_pk, generation, instance = entry
+            if generations.get_generation(model, pk=draft_pk) == generation:
+                return instance
+
+        model_generation = generations.get_generation(model)
+        instance = queryset.prefetch_related(*model.get_translation_relations()).annotate(
+            _publisher_draft_pk=F("publisher_draft__pk")
+        ).get()
+
+        draft_pk = instance._publisher_draft_pk
+        if draft_pk is None or generations.get_generation(model) != model_generation:
+            # Not linked or (un-)published in the meantime: don't cache
+            return instance
+
+        entry = (draft_pk, generations.get_generation(model, pk=draft_pk), instance)
+        max_size = app_settings.PUBLISHER_INSTANCE_CACHE_MAX_SIZE
+        if max_size and len(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)) > max_size:
+            log.debug("Don't cache %s: bigger than %i bytes", instance, max_size)
+            return instance
+
+        now = timezone.now()
+        timeout = app_settings.PUBLISHER_INSTANCE_CACHE_TIMEOUT
+        for dt in (instance.publication_start_date, instance.publication_end_date):
+            if dt is not None and dt > now:
+                timeout = min(timeout, int(math.ceil((dt - now).total_seconds())))
+
+        cache.set(key, entry, timeout)
+        return instance
+
+    def get_visible_cached(self, **lookup):
+        """
+        Like get_cached(), but raise DoesNotExist if the public instance is not visible.
+        """
+        instance = self.get_cached(**lookup)
+        if not instance.is_visible:
+            raise self.model.DoesNotExist("%s matching query is not visible." % self.model._meta.object_name)
+        return instance
+
+    def next_visibility_change(self, now=None):
+        """
+        Returns the next point in time after 'now' on which a public entry
+        becomes visible or hidden by publication_start_date/publication_end_date.
+        Returns None if there is no upcoming change.
+        """
+        if now is None:
+            now = timezone.now()
+
+        # Two plain aggregates on the filtered date columns, so the indexes can be used:
+        published = self.published()
+        dates = [
+            published.filter(publication_start_date__gt=now).aggregate(
+                next_start=Min("publication_start_date")
+            )["next_start"],
+            published.filter(publication_end_date__gt=now).aggregate(
+                next_end=Min("publication_end_date")
+            )["next_end"],
+        ]
+        dates = [dt for dt in dates if dt is not None]
+        if dates:
+            return min(dates)
+
+    def visible_summary(self, now=None):
+        """
+        Returns the latest 'publisher_modified_at' and the number of the visible entries
+        and the next visibility change of the public entries, with one query, as a dict:
+            {"last_modified": <datetime>, "count": <int>, "next_change": <datetime>}
+        Used for the ETag of the publisher views.
+        """
+        if now is None:
+            now = timezone.now()
+
+        published = self.published()
+
+        # The next start/end dates as not correlated subqueries, filtered
+        # and ordered by the date columns, so the indexes can be used:
+        def next_date(field_name):
+            subquery = published.filter(**{"%s__gt" % field_name: now}).order_by(field_name).values(field_name)[:1]
+            return Max(Subquery(subquery, output_field=models.DateTimeField()))
+
+        visible_q = self._get_visible_q(now)
+        result = published.aggregate(
+            last_modified=Max(Case(
+                When(visible_q, then=F("publisher_modified_at")),
+                output_field=models.DateTimeField(),
+            )),
+            count=Count(Case(
+                When(visible_q, then=Value(1)),
+                output_field=models.IntegerField(),
+            )),
+            next_start=next_date("publication_start_date"),
+            next_end=next_date("publication_end_date"),
+        )
+        dates = [dt for dt in (result.pop("next_start"), result.pop("next_end")) if dt is not None]
+        result["next_change"] = min(dates) if dates else None
+        return result
+
+    def seconds_until_visibility_change(self, now=None):
+        """
+        Returns the seconds (rounded up) until a public entry becomes visible or hidden,
+        e.g.: for "Cache-Control: max-age". Returns None if there is no upcoming change.
+        """
+        if now is None:
+            now = timezone.now()
+
+        next_change = self.next_visibility_change(now=now)
+        if next_change is not None:
+            return int(math.ceil((next_change - now).total_seconds()))
+
+    def with_publish_status(self):
+        """
+        Annotate the publish status of every entry, so that e.g. the admin
+        change list doesn't need extra queries per row.
+
+        Added annotations (used by PublisherModelBase.get_publish_status()):
+            publisher_status_is_dirty
+            publisher_status_is_published
+            publisher_status_is_visible
+            publisher_status_hidden_by_start_date
+            publisher_status_hidden_by_end_date
+
+        Like the model properties: For published drafts the visibility values
+        are the values of the public version.
+        """
+        model = self.model
+        now = timezone.now()
+
+        def hidden_by_start_date(prefix):
+            return Q(**{
+                "%spublication_start_date__isnull" % prefix: False,
+                "%spublication_start_date__gte" % prefix: now,
+            })
+
+        def hidden_by_end_date(prefix):
+            return Q(**{
+                "%spublication_end_date__isnull" % prefix: False,
+                "%spublication_end_date__lte" % prefix: now,
+            })
+
+        def bool_case(*whens):
+            return Case(*whens, default=Value(False), output_field=models.BooleanField())
+
+        # The visibility values are from the public version, if the draft is published:
+        use_linked = Q(publisher_is_draft=True, publisher_linked__isnull=False)
+        use_self = Q(publisher_is_draft=False) | Q(publisher_linked__isnull=True)
+
+        is_published = Q(publisher_is_draft=False) | Q(publisher_linked__isnull=False)
+        hidden_by_start = (
+            (use_linked & hidden_by_start_date("publisher_linked__")) |
+            (use_self & hidden_by_start_date(""))
+        )
+        hidden_by_end = (
+            (use_linked & hidden_by_end_date("publisher_linked__")) |
+            (use_self & hidden_by_end_date(""))
+        )
+
+        modified_after_publish = Q(
+            publisher_modified_at__gt=F("publisher_linked__publisher_modified_at")
+        )
+        if model.publisher_track_fingerprint:
+            has_fingerprints = Q(
+                publisher_fingerprint__isnull=False,
+                publisher_linked__publisher_fingerprint__isnull=False,
+            )
+            changed = (
+                (has_fingerprints & (
+                    Q(publisher_fingerprint__lt=F("publisher_linked__publisher_fingerprint")) |
+                    Q(publisher_fingerprint__gt=F("publisher_linked__publisher_fingerprint"))
+                )) |
+                ((
+                    Q(publisher_fingerprint__isnull=True) |
+                    Q(publisher_linked__publisher_fingerprint__isnull=True)
+                ) & modified_after_publish)
+            )
+        else:
+            changed = modified_after_publish
+
+        queryset = self
+
+        # Plugins can be changed without saving the draft:
+        for field_name in model.publisher_placeholder_fields:
+            field = model._meta.get_field(field_name)
+            annotation_name = "_publisher_plugins_changed_%s" % field_name
+            latest_change = CMSPlugin.objects.filter(
+                placeholder=OuterRef(field.attname)
+            ).order_by().values("placeholder").annotate(
+                latest_change=Max("changed_date")
+            ).values("latest_change")
+            queryset = queryset.annotate(**{
+                annotation_name: Subquery(latest_change, output_field=models.DateTimeField())
+            })
+            changed |= Q(**{
+                "%s__gt" % annotation_name: F("publisher_linked__publisher_modified_at")
+            })
+
+        is_dirty = Q(publisher_is_draft=True) & (Q(publisher_linked__isnull=True) | changed)
+
+        return queryset.annotate(
+            publisher_status_is_dirty=bool_case(When(is_dirty, then=Value(True))),
+            publisher_status_is_published=bool_case(When(is_published, then=Value(True))),
+            publisher_status_hidden_by_start_date=bool_case(When(hidden_by_start, then=Value(True))),
+            publisher_status_hidden_by_end_date=bool_case(When(hidden_by_end, then=Value(True))),
+            publisher_status_is_visible=bool_case(
+                When(hidden_by_start | hidden_by_end, then=Value(False)),
+                When(is_published, then=Value(True)),
+            ),
+        )
+
+    def _get_write_db(self):
+        """
+        The database for (un-)publish, never a read replica of published()/visible()
+        """
+        return self._db or router.db_for_write(self.model, **self._hints)
+
+    def publish(self, batch_size=None):
+        """
+        Publish all dirty drafts of this queryset with a fixed number of queries per batch,
+        except for models with PlaceholderFields: PlaceholderField.pre_save() creates
+        the placeholder of every public object with one INSERT and the plugins
+        are copied one by one, see: PublisherModelBase.bulk_clone_placeholders()
+
+        Unlike PublisherModelBase.publish() it will:
+         * always replace the existing public versions
+         * send one 'publisher_pre_bulk_publish' and 'publisher_post_bulk_publish'
+           signal per batch instead of the per instance signals
+           ('publisher_post_bulk_publish' is sent on transaction commit)
+
+        Models with 'publisher_update_in_place' are published one by one
+        with PublisherModelBase.publish(), so their public pks stay stable.
+        The bulk signals are sent per batch, too (and the per instance signals).
+
+        All batches are published in one transaction,
+        batch_size defaults to settings.PUBLISHER_BULK_BATCH_SIZE
+
+        Returns the number of published drafts.
+        """
+        model = self.model
+        db = self._get_write_db()
+        base_manager = model._base_manager.using(db)
+
+        count = 0
+        with transaction.atomic(using=db):
+            # Lock all drafts (ordered by pk to avoid deadlocks)
+            drafts = lock_queryset(
+                base_manager.filter(pk__in=self.drafts().values("pk")).order_by("pk")
+            )
+
+            # Skip drafts without changes:
+            dirty_pks = set(
+                model.objects.using(db).filter(
+                    pk__in=[draft.pk for draft in drafts]
+                ).with_publish_status().filter(
+                    publisher_status_is_dirty=True
+                ).values_list("pk", flat=True)
+            )
+            drafts = [draft for draft in drafts if draft.pk in dirty_pks]
+
+            for batch in chunks(drafts, batch_size or app_settings.PUBLISHER_BULK_BATCH_SIZE):
+                draft_pks = [draft.pk for draft in batch]
+                publisher_pre_bulk_publish.send(sender=model, pks=draft_pks)
+                if model.publisher_update_in_place:
+                    for draft in model.objects.using(db).filter(pk__in=draft_pks).order_by("pk"):
+                        draft.publish()
+                else:
+                    self._publish_batch(base_manager, batch)
+                    generations.increment_generation_on_commit(model, draft_pks, using=db)
+                # Send the signal after the (outermost) transaction is committed:
+                transaction.on_commit(
+                    functools.partial(publisher_post_bulk_publish.send, sender=model, pks=draft_pks), using=db
+                )
+                count += len(draft_pks)
+
+        return count
+    publish.queryset_only = True
+
+    def _publish_batch(self, base_manager, drafts):
+        model = self.model
+
+        draft_pks = [draft.pk for draft in drafts]
+        old_public_pks = [draft.publisher_linked_id for draft in drafts if draft.publisher_linked_id]
+
+        now = timezone.now()
+
+        references = []
+        if old_public_pks:
+            # Other public entries may point to the current published records:
+            # Point them to the drafts until the new published records exist.
+            references = dependencies.get_public_references(model, old_public_pks, using=base_manager.db)
+            dependencies.repoint_references(references, dict(
+                (draft.publisher_linked_id, draft.pk) for draft in drafts if draft.publisher_linked_id
+            ))
+
+            # Remove the current published records
+            # (the draft links will be set to NULL by on_delete)
+            base_manager.filter(pk__in=old_public_pks).delete()
+
+        public_objects = []
+        for draft in drafts:
+            publish_obj = model(**draft.get_copy_field_values(draft))
+            publish_obj.publisher_is_draft = False
+            publish_obj.publisher_modified_at = now
+            publish_obj.publisher_published_at = draft.publisher_published_at or now
+
+            # Temporary link the public copy to its draft,
+            # because bulk_create() can't return the new pks on every database
+            publish_obj.publisher_linked_id = draft.pk
+
+            public_objects.append(publish_obj)
+
+        base_manager.bulk_create(public_objects)
+
+        public_objects = base_manager.filter(
+            publisher_is_draft=False, publisher_linked__in=draft_pks
+        )
+        public_map = dict((obj.publisher_linked_id, obj) for obj in public_objects)
+        public_pks = [obj.pk for obj in public_map.values()]
+
+        # Remove the temporary links and link the drafts to the new public versions:
+        base_manager.filter(pk__in=public_pks).update(publisher_linked=None)
+        dependencies.repoint_references(references, dict(
+            (draft_pk, obj.pk) for draft_pk, obj in public_map.items()
+        ))
+        base_manager.filter(pk__in=draft_pks).update(
+            publisher_linked=Case(
+                *[When(pk=draft_pk, then=Value(obj.pk)) for draft_pk, obj in public_map.items()],
+                output_field=models.IntegerField()
+            ),
+            publisher_published_at=Coalesce(F('publisher_published_at'), Value(now)),
         )
 
+        if model.publisher_track_visible:
+            model.objects.using(base_manager.db).filter(pk__in=public_pks).update_visible(now)
+
+        pairs = []
+        for draft in drafts:
+            publish_obj = public_map[draft.pk]
+            publish_obj.publisher_linked_id = None
+            pairs.append((draft, publish_obj))
+
+        model.bulk_clone_translations(pairs)
+        model.bulk_clone_placeholders(pairs)
+        model.bulk_clone_relations(pairs)
+
+        for draft, publish_obj in pairs:
+            draft.clone_relations(draft, publish_obj)
+
+        model.create_snapshots(pairs)
+
+    def unpublish(self, batch_size=None):
+        """
+        Unpublish all drafts of this queryset with a fixed number of queries per batch.
+
+        Sends one 'publisher_pre_bulk_unpublish' and 'publisher_post_bulk_unpublish'
+        signal per batch instead of the per instance signals.
+        ('publisher_post_bulk_unpublish' is sent on transaction commit)
+
+        All batches are unpublished in one transaction,
+        batch_size defaults to settings.PUBLISHER_BULK_BATCH_SIZE
+
+        Returns the number of unpublished drafts.
+        """
+        model = self.model
+        db = self._get_write_db()
+        base_manager = model._base_manager.using(db)
+
+        count = 0
+        with transaction.atomic(using=db):
+            # Lock all drafts (ordered by pk to avoid deadlocks)
+            linked = lock_queryset(
+                base_manager.filter(
+                    pk__in=self.drafts().values("pk"), publisher_linked__isnull=False
+                ).order_by("pk").values_list("pk", "publisher_linked")
+            )
+            for batch in chunks(linked, batch_size or app_settings.PUBLISHER_BULK_BATCH_SIZE):
+                draft_pks = [draft_pk for draft_pk, public_pk in batch]
+                public_pks = [public_pk for draft_pk, public_pk in batch]
+
+                publisher_pre_bulk_unpublish.send(sender=model, pks=draft_pks)
+
+                base_manager.filter(pk__in=public_pks).delete()
+                base_manager.filter(pk__in=draft_pks).update(
+                    publisher_linked=None,
+                    publisher_published_at=None,
+                )
+                generations.increment_generation_on_commit(model, draft_pks, using=db)
+                # Send the signal after the (outermost) transaction is committed:
+                transaction.on_commit(
+                    functools.partial(publisher_post_bulk_unpublish.send, sender=model, pks=draft_pks), using=db
+                )
+                count += len(draft_pks)
+
+        return count
+    unpublish.queryset_only = True
+
 
 class BasePublisherManager(models.Manager):
     def get_queryset(self):
         return PublisherQuerySet(self.model, using=self._db)
 
+    def publish_generation(self, pk=None):
+        """
+        Returns the publish generation of this model or of the draft with the given pk,
+        for versioned cache keys. Needs no database query, see: publisher/generations.py
+        """
+        return generations.get_generation(self.model, pk=pk)
+
     def contribute_to_class(self, model, name):
         super(BasePublisherManager, self).contribute_to_class(model, name)
 
@@ -212,3 +721,199 @@ class BasePublisherStateManager(models.Manager):
         )
 
 PublisherStateManager = BasePublisherStateManager.from_queryset(PublisherStateQuerySet)
+
+
+class PublisherJobQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(state=constants.JOB_STATE_PENDING)
+
+    def running(self):
+        return self.filter(state=constants.JOB_STATE_RUNNING)
+
+    def unfinished(self):
+        return self.filter(state__in=(constants.JOB_STATE_PENDING, constants.JOB_STATE_RUNNING))
+
+    def for_instance(self, publisher_instance):
+        draft = publisher_instance.get_draft_object()
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(draft),
+            object_id=draft.pk,
+        )
+
+    def claimable(self, now=None):
+        """
+        Pending jobs that are not delayed by 'retry_after' and running jobs
+        that are started before settings.PUBLISHER_JOB_STALE_TIMEOUT seconds
+        (e.g.: the worker was killed)
+        """
+        if now is None:
+            now = timezone.now()
+        stale = now - datetime.timedelta(seconds=app_settings.PUBLISHER_JOB_STALE_TIMEOUT)
+        return self.filter(
+            Q(state=constants.JOB_STATE_PENDING, retry_after__isnull=True)
+            | Q(state=constants.JOB_STATE_PENDING, retry_after__lte=now)
+            | Q(state=constants.JOB_STATE_RUNNING, started_at__lt=stale)
+        )
+
+
+class BasePublisherJobManager(models.Manager):
+
+    def get_queryset(self):
+        return PublisherJobQuerySet(self.model, using=self._db)
+
+    def enqueue(self, action, publisher_instance, user=None):
+        """
+        Create a job to (un-)publish the draft of publisher_instance
+        in the 'publisher_worker' management command.
+        """
+        assert action in (constants.ACTION_PUBLISH, constants.ACTION_UNPUBLISH)
+
+        draft = publisher_instance.get_draft_object()
+
+        job = self.model()
+        job.action = action
+        job.publisher_instance = draft
+        job.user = user
+        job.save()
+
+        log.debug("Enqueued: %s", job)
+        return job
+
+    def enqueue_publish(self, publisher_instance, user=None):
+        return self.enqueue(constants.ACTION_PUBLISH, publisher_instance, user)
+
+    def enqueue_unpublish(self, publisher_instance, user=None):
+        return self.enqueue(constants.ACTION_UNPUBLISH, publisher_instance, user)
+
+    def claim(self):
+        """
+        Mark the oldest claimable job as 'running' and return it.
+        Returns None if there are no claimable jobs.
+        Every claim counts as an attempt.
+
+        Jobs locked by other workers are skipped, if the database supports
+        SELECT ... FOR UPDATE SKIP LOCKED. Otherwise the state update
+        ensures that a job will be claimed only once.
+        """
+        connection = connections[self.db]
+        skip_locked = connection.features.has_select_for_update_skip_locked
+
+        while True:
+            with transaction.atomic(using=self.db):
+                now = timezone.now()
+                queryset = self.get_queryset().claimable(now).order_by("pk")
+                job = queryset.select_for_update(skip_locked=skip_locked).first()
+                if job is None:
+                    return None
+
+                updated = self.get_queryset().claimable(now).filter(pk=job.pk, attempts=job.attempts).update(
+                    state=constants.JOB_STATE_RUNNING,
+                    started_at=now,
+                    attempts=job.attempts + 1,
+                )
+                if updated:
+                    job.state = constants.JOB_STATE_RUNNING
+                    job.started_at = now
+                    job.attempts += 1
+                    return job
+
+            log.debug("Job %s was claimed by another worker.", job.pk)
+
+PublisherJobManager = BasePublisherJobManager.from_queryset(PublisherJobQuerySet)
+
+
+class PublisherSnapshotQuerySet(models.QuerySet):
+    def for_instance(self, publisher_instance):
+        draft = publisher_instance.get_draft_object()
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(draft),
+            object_id=draft.pk,
+        )
+
+
+class BasePublisherSnapshotManager(models.Manager):
+
+    def get_queryset(self):
+        return PublisherSnapshotQuerySet(self.model, using=self._db)
+
+    def create_snapshots(self, model, pairs):
+        """
+        Store the public versions with one bulk_create() and evict old snapshots.
+
+        pairs: list of (draft_obj, publish_obj) tuples
+        """
+        content_type = ContentType.objects.get_for_model(model)
+        data = snapshots.dump_many(model, [publish_obj for draft_obj, publish_obj in pairs])
+
+        now = timezone.now()
+        self.bulk_create([
+            self.model(content_type=content_type, object_id=draft_obj.pk, created_at=now, data=data[publish_obj.pk])
+            for draft_obj, publish_obj in pairs
+        ])
+
+        self.evict(content_type, [draft_obj.pk for draft_obj, publish_obj in pairs])
+
+    def evict(self, content_type, object_ids):
+        """
+        Delete the snapshots of the given objects that are older than
+        settings.PUBLISHER_SNAPSHOT_MAX_AGE or exceed settings.PUBLISHER_SNAPSHOT_MAX_COUNT
+        """
+        queryset = self.get_queryset().filter(content_type=content_type, object_id__in=object_ids)
+
+        if app_settings.PUBLISHER_SNAPSHOT_MAX_AGE is not None:
+            max_age = timezone.now() - datetime.timedelta(days=app_settings.PUBLISHER_SNAPSHOT_MAX_AGE)
+            queryset.filter(created_at__lt=max_age).delete()
+
+        if app_settings.PUBLISHER_SNAPSHOT_MAX_COUNT is not None:
+            counts = defaultdict(int)
+            delete_pks = []
+            for pk, object_id in queryset.order_by("object_id", "-created_at", "-pk").values_list("pk", "object_id"):
+                counts[object_id] += 1
+                if counts[object_id] > app_settings.PUBLISHER_SNAPSHOT_MAX_COUNT:
+                    delete_pks.append(pk)
+
+            if delete_pks:
+                self.get_queryset().filter(pk__in=delete_pks).delete()
+
+PublisherSnapshotManager = BasePublisherSnapshotManager.from_queryset(PublisherSnapshotQuerySet)
+
+
+class PublisherReleaseQuerySet(models.QuerySet):
+    def open(self):
+        return self.filter(state=constants.RELEASE_STATE_OPEN)
+
+    def due(self, now=None):
+        """
+        Open releases that are scheduled before 'now'
+        """
+        if now is None:
+            now = timezone.now()
+        return self.open().filter(scheduled_at__lte=now)
+
+
+class BasePublisherReleaseManager(models.Manager):
+
+    def get_queryset(self):
+        return PublisherReleaseQuerySet(self.model, using=self._db)
+
+    def next_scheduled(self, now):
+        """
+        Returns the next 'scheduled_at' after 'now' of all open releases, or None
+        """
+        return self.get_queryset().open().filter(scheduled_at__gt=now).aggregate(
+            next_scheduled=Min("scheduled_at")
+        )["next_scheduled"]
+
+PublisherReleaseManager = BasePublisherReleaseManager.from_queryset(PublisherReleaseQuerySet)
+
+
+class PublisherSchedulerRunManager(models.Manager):
+
+    def get_last_run(self):
+        """
+        Returns the last run of the 'publisher_scheduler' management command, or None
+        """
+        return self.get_queryset().values_list("last_run_at", flat=True).first()
+
+    def set_last_run(self, last_run_at):
+        self.get_queryset().update_or_create(pk=1, defaults={"last_run_at": last_run_at})
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 18:22
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('publisher', '0004_auto_20180102_0502'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublisherJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('action', models.CharField(choices=[('publish', 'publish'), ('unpublish', 'unpublish')], editable=False, max_length=9)),
+                ('state', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='pending', editable=False, max_length=7)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('started_at', models.DateTimeField(editable=False, null=True)),
+                ('finished_at', models.DateTimeField(editable=False, null=True)),
+                ('error', models.TextField(editable=False, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+                ('user', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='publisher_publisherjob_user', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Publisher Job',
+                'verbose_name_plural': 'Publisher Jobs',
+                'ordering': ['created_at'],
+                'default_permissions': (),
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 18:40
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('publisher', '0006_publishersnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublisherRelease',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='name')),
+                ('scheduled_at', models.DateTimeField(blank=True, db_index=True, help_text='Execute the release at this point in time. Leave blank to execute it manually.', null=True, verbose_name='scheduled at')),
+                ('state', models.CharField(choices=[('open', 'open'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='open', editable=False, max_length=6)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('executed_at', models.DateTimeField(editable=False, null=True)),
+                ('error', models.TextField(editable=False, null=True)),
+                ('user', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='publisher_publisherrelease_user', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Release',
+                'verbose_name_plural': 'Releases',
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='PublisherReleaseItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('action', models.CharField(choices=[('publish', 'publish'), ('unpublish', 'unpublish')], default='publish', max_length=9)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+                ('release', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='publisher.PublisherRelease')),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='publisherreleaseitem',
+            unique_together=set([('release', 'content_type', 'object_id')]),
+        ),
+    ]
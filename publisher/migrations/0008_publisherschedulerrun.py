@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 19:10
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher', '0007_publisherrelease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublisherSchedulerRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_run_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Publisher Scheduler Run',
+                'verbose_name_plural': 'Publisher Scheduler Runs',
+                'default_permissions': (),
+            },
+        ),
+    ]
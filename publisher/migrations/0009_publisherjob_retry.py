@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 19:11
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher', '0008_publisherschedulerrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisherjob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='publisherjob',
+            name='retry_after',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
@@ -1,12 +1,18 @@
+import datetime
+import functools
+import hashlib
 import logging
+from collections import defaultdict
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.db import models
+from django.core.exceptions import FieldDoesNotExist, FieldError, ObjectDoesNotExist, ValidationError
+from django.db import connections, models, transaction
+from django.db.models import Case, Value, When
 from django.template.defaultfilters import truncatewords
 from django.utils import six, timezone
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 
@@ -16,19 +22,23 @@ from django_tools.permissions import ModelPermissionMixin, check_permission
 from publisher.admin_utils import admin_url
 from publisher.permissions import can_publish_object
 
-from . import constants
-from .managers import PublisherManager, PublisherStateManager
-from .signals import (publisher_post_publish, publisher_post_unpublish, publisher_pre_publish, publisher_pre_unpublish,
-                      publisher_publish_pre_save_draft)
-from .utils import aldryn_translation_tools_exists, assert_draft, django_cms_exists, parler_exists
+from . import app_settings, constants, dependencies, generations, snapshots
+from .managers import (PublisherJobManager, PublisherManager, PublisherReleaseManager, PublisherSchedulerRunManager,
+                       PublisherSnapshotManager, PublisherStateManager)
+from .signal_handlers import publisher_class_prepared
+from .signals import (publisher_post_publish, publisher_post_revert, publisher_post_rollback, publisher_post_unpublish,
+                      publisher_pre_publish, publisher_pre_unpublish, publisher_publish_pre_save_draft)
+from .utils import (PublisherLockError, aldryn_translation_tools_exists, assert_draft, django_cms_exists, lock_queryset, parler_exists,
+                    publisher_transaction)
 
 log = logging.getLogger(__name__)
 
 if django_cms_exists:
-    from cms.models import Page
+    from cms.models import CMSPlugin, Page
     from cms.models.placeholdermodel import Placeholder
     from cms.models.fields import PlaceholderField
     from cms.utils.copy_plugins import copy_plugins_to
+    from cms.utils.plugins import downcast_plugins
 
 
 class PublisherModelBase(ModelPermissionMixin, models.Model):
@@ -43,6 +53,12 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
     publisher_modified_at = models.DateTimeField(default=timezone.now, editable=False)
     publisher_published_at = models.DateTimeField(null=True, editable=False)
 
+    # Hash over the content, only used if 'publisher_track_fingerprint' is True
+    publisher_fingerprint = models.CharField(max_length=40, null=True, editable=False)
+
+    # Denormalized visibility of the public version, only used if 'publisher_track_visible' is True
+    publisher_visible = models.BooleanField(default=False, editable=False, db_index=True)
+
     publication_start_date = models.DateTimeField(
         _("publication start date"),
         null=True, blank=True, db_index=True,
@@ -65,6 +81,7 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
         'publisher_is_draft',
         'publisher_modified_at',
         'publisher_draft',
+        'publisher_visible',
     )
     publisher_ignore_fields = publisher_fields + (
         'pk',
@@ -76,6 +93,39 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
         'id',
     )
 
+    # Copy the draft onto the existing public row on publish, instead of
+    # delete it and insert a new one. So the public pk stays stable and
+    # rows that references the public object will not be deleted.
+    publisher_update_in_place = False
+
+    # Store a hash over fields, translations and plugins on every draft save
+    # and compare the hashes in is_dirty. So saving without changes will not
+    # mark the draft as dirty.
+    publisher_track_fingerprint = False
+
+    # Remember the field values loaded from the database and save only the
+    # changed fields. A save without changes will not update the database
+    # and will not mark the draft as dirty.
+    # Note: In-place changes of mutable field values will not be detected.
+    publisher_track_changes = False
+
+    # Names of ManyToManyFields and reverse ForeignKeys (the related query name)
+    # that will be copied on publish, see: bulk_clone_relations()
+    publisher_clone_relations = ()
+
+    # Store a PublisherSnapshot of the public version on every publish,
+    # see: rollback_to() and settings.PUBLISHER_SNAPSHOT_MAX_COUNT/PUBLISHER_SNAPSHOT_MAX_AGE
+    publisher_snapshots = False
+
+    # Maintain 'publisher_visible' on (un-)publish and in the 'publisher_scheduler'
+    # management command, so visible() is a filter on one indexed column.
+    # Note: Entries become visible/hidden when the scheduler runs, not exactly
+    # on publication_start_date/publication_end_date.
+    publisher_track_visible = False
+
+    # Names of all PlaceholderFields, set on class_prepared, see: get_placeholder_fields()
+    publisher_placeholder_fields = None
+
     class Meta:
         abstract = True
 
@@ -134,7 +184,12 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
         if not self.publisher_linked:
             return True
 
-        if self.publisher_modified_at > self.publisher_linked.publisher_modified_at:
+        public_fingerprint = self.publisher_linked.publisher_fingerprint
+        if self.publisher_track_fingerprint and self.publisher_fingerprint and public_fingerprint:
+            if self.publisher_fingerprint != public_fingerprint:
+                return True
+            # Plugins can be changed without saving the draft, check them below
+        elif self.publisher_modified_at > self.publisher_linked.publisher_modified_at:
             return True
 
         # Get all placeholders + their plugins to find their modified date
@@ -146,14 +201,69 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
 
         return False
 
+    def get_publish_status(self, name):
+        """
+        Returns the publish status 'name', one of:
+            "is_dirty", "is_published", "is_visible",
+            "hidden_by_start_date" or "hidden_by_end_date"
+
+        Use the value annotated by PublisherQuerySet.with_publish_status(),
+        if available. Otherwise fall back to the properties.
+        """
+        try:
+            return getattr(self, "publisher_status_%s" % name)
+        except AttributeError:
+            pass
+
+        if name == "is_dirty":
+            return self.is_dirty
+
+        # Like the admin: for published drafts use the public version
+        obj = self.publisher_linked or self
+        return getattr(obj, name)
+
+    def lock_draft(self):
+        """
+        Lock the draft row until the end of the current transaction and
+        refresh the publish state, because the draft may be (un-)published
+        by someone else in the meantime.
+        """
+        rows = lock_queryset(
+            self.__class__._base_manager.using(self._state.db).filter(pk=self.pk).values_list(
+                "publisher_linked", "publisher_published_at"
+            )
+        )
+        if not rows:
+            raise self.DoesNotExist("Draft %r was deleted." % self.pk)
+
+        linked_id, self.publisher_published_at = rows[0]
+        if linked_id != self.publisher_linked_id:
+            self.publisher_linked_id = linked_id
+            # Remove the cached public object:
+            self.__dict__.pop(self._meta.get_field("publisher_linked").get_cache_name(), None)
+
     @assert_draft
-    def publish(self):
+    @publisher_transaction
+    def publish(self, with_dependencies=False):
+        """
+        with_dependencies: publish all related publisher drafts
+            (ForeignKey and ManyToManyField targets, recursively) before,
+            see: publisher/dependencies.py
+        """
         if self.publisher_is_draft == False:
             log.info("Don't publish %s because it's not the daft version!", self)
             return self
 
+        if with_dependencies:
+            dependencies.publish_dependencies(self)
+
         if not self.is_dirty:
             log.info("Don't publish %s because it's not dirty!", self)
+            if self.publisher_track_visible and self.publisher_linked_id is not None:
+                # e.g.: 'publisher_track_visible' was enabled for existing entries
+                self.update_visible(self.publisher_linked)
+            if with_dependencies and self.publisher_linked_id is not None:
+                self.remap_dependencies(self.publisher_linked)
             return self
 
         publisher_pre_publish.send(sender=self.__class__, instance=self)
@@ -171,28 +281,56 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
             # version of the page
             self.patch_placeholders(draft_obj)
 
-            # Remove the current published record
-            draft_obj.publisher_linked.delete()
+        if draft_obj.publisher_linked and self.publisher_update_in_place:
+            publish_obj = draft_obj.publisher_linked
+
+            # Copy all field values with a single UPDATE
+            self.update_public_object(draft_obj, publish_obj)
+
+            # Replace translations, plugins and relations on the existing public object
+            self.sync_translations(draft_obj, publish_obj)
+            self.sync_placeholder(draft_obj, publish_obj)
+            self.bulk_clone_relations([(draft_obj, publish_obj)], replace=True)
+            self.clone_relations(draft_obj, publish_obj)
+        else:
+            references = []
+            if draft_obj.publisher_linked:
+                # Other public entries may point to the current published record:
+                # Point them to the draft until the new published record exists.
+                old_public_pk = draft_obj.publisher_linked_id
+                references = dependencies.get_public_references(
+                    self.__class__, [old_public_pk], using=self._state.db
+                )
+                dependencies.repoint_references(references, {old_public_pk: draft_obj.pk})
+
+                # Remove the current published record
+                draft_obj.publisher_linked.delete()
+
+            # Duplicate the draft object and set to published
+            publish_obj = self.__class__.objects.get(pk=self.pk)
+            for fld in self.publisher_publish_empty_fields:
+                setattr(publish_obj, fld, None)
+            publish_obj.publisher_is_draft = False
+            publish_obj.publisher_published_at = draft_obj.publisher_published_at
 
-        # Duplicate the draft object and set to published
-        publish_obj = self.__class__.objects.get(pk=self.pk)
-        for fld in self.publisher_publish_empty_fields:
-            setattr(publish_obj, fld, None)
-        publish_obj.publisher_is_draft = False
-        publish_obj.publisher_published_at = draft_obj.publisher_published_at
+            # Link the published obj to the draft version
+            # publish_obj.publisher_linked = draft_obj
+            publish_obj.save()
 
-        # Link the published obj to the draft version
-        # publish_obj.publisher_linked = draft_obj
-        publish_obj.save()
+            dependencies.repoint_references(references, {draft_obj.pk: publish_obj.pk})
 
-        # Check for translations, if so duplicate the object
-        self.clone_translations(draft_obj, publish_obj)
+            # Check for translations, if so duplicate the object
+            self.clone_translations(draft_obj, publish_obj)
 
-        # Clone any placeholder fields into the new published object
-        self.clone_placeholder(draft_obj, publish_obj)
+            # Clone any placeholder fields into the new published object
+            self.clone_placeholder(draft_obj, publish_obj)
 
-        # Clone relationships
-        self.clone_relations(draft_obj, publish_obj)
+            # Clone relationships
+            self.bulk_clone_relations([(draft_obj, publish_obj)])
+            self.clone_relations(draft_obj, publish_obj)
+
+        self.update_visible(publish_obj)
+        self.create_snapshots([(draft_obj, publish_obj)])
 
         # Link the draft obj to the current published version
         draft_obj.publisher_linked = publish_obj
@@ -203,10 +341,34 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
         draft_obj.save()
         self._suppress_modified=False
 
-        publisher_post_publish.send(sender=draft_obj.__class__, instance=draft_obj)
+        if with_dependencies:
+            self.remap_dependencies(publish_obj)
+
+        # Send the signal after the (outermost) transaction is committed:
+        transaction.on_commit(
+            functools.partial(publisher_post_publish.send, sender=draft_obj.__class__, instance=draft_obj),
+            using=self._state.db
+        )
+
+        generations.increment_generation_on_commit(self.__class__, [draft_obj.pk], using=self._state.db)
 
         return publish_obj
 
+    @assert_draft
+    def remap_dependencies(self, publish_obj):
+        """
+        Point the ForeignKeys of publish_obj to the public version
+        of the published dependencies, see: publish(with_dependencies=True)
+        """
+        changes = dependencies.remap_foreign_keys(
+            self.__class__, [self.pk], using=self._state.db
+        ).get(publish_obj.pk, {})
+        for attname, value in changes.items():
+            setattr(publish_obj, attname, value)
+            # Remove the cached draft object:
+            field = next(field for field in self._meta.concrete_fields if field.attname == attname)
+            publish_obj.__dict__.pop(field.get_cache_name(), None)
+
     @assert_draft
     def patch_placeholders(self, draft_obj):
         if not django_cms_exists:
@@ -222,7 +384,14 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
                 published_placeholder.pk = None
                 published_placeholder.save()
 
+                # Store the new placeholder, needed if the public object will be updated in place:
+                attname = published_obj._meta.get_field(field).attname
+                published_obj.__class__.objects.filter(pk=published_obj.pk).update(
+                    **{attname: published_placeholder.pk}
+                )
+
     @assert_draft
+    @publisher_transaction
     def unpublish(self):
         if self.publisher_is_draft == False or not self.publisher_linked:
             return
@@ -232,91 +401,496 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
         self.publisher_linked = None
         self.publisher_published_at = None
         self.save()
-        publisher_post_unpublish.send(sender=self.__class__, instance=self)
+        # Send the signal after the (outermost) transaction is committed:
+        transaction.on_commit(
+            functools.partial(publisher_post_unpublish.send, sender=self.__class__, instance=self),
+            using=self._state.db
+        )
+
+        generations.increment_generation_on_commit(self.__class__, [self.pk], using=self._state.db)
 
     @assert_draft
+    @publisher_transaction
     def revert_to_public(self):
         """
-        @todo Relook at this method. It would be nice if the draft pk did not have to change
-        @toavoid Updates self to a alternative instance
-        @toavoid self.__class__ = draft_obj.__class__
-        @toavoid self.__dict__ = draft_obj.__dict__
+        Copy the field values, translations, placeholders and relations
+        of the public version back onto this draft.
+        The draft keeps its pk.
         """
         if not self.publisher_linked:
             return
 
-        # Get published obj and delete the draft
         draft_obj = self
         publish_obj = self.publisher_linked
 
-        draft_obj.publisher_linked = None
-        draft_obj.save()
-        draft_obj.delete()
+        self.sync_translations(publish_obj, draft_obj)
+        self.sync_placeholder(publish_obj, draft_obj)
+        self.bulk_clone_relations([(publish_obj, draft_obj)], replace=True)
+        self.clone_relations(publish_obj, draft_obj)
 
-        # Mark the published object as a draft
-        draft_obj = publish_obj
-        publish_obj = None
+        # Set the same modified date on both, after the plugins are copied,
+        # so the draft is not dirty:
+        now = timezone.now()
 
-        draft_obj.publisher_is_draft = True
-        draft_obj.save()
-        draft_obj.publish()
+        values = self.get_copy_field_values(publish_obj)
+        values['publisher_modified_at'] = now
+        draft_obj.__class__._base_manager.filter(pk=draft_obj.pk).update(**values)
+        publish_obj.__class__._base_manager.filter(pk=publish_obj.pk).update(publisher_modified_at=now)
+
+        # Update the in-memory instances, too:
+        for attname, value in values.items():
+            setattr(draft_obj, attname, value)
+        publish_obj.publisher_modified_at = now
+
+        if draft_obj._publisher_loaded_values is not None:
+            draft_obj._publisher_loaded_values.update(values)
+
+        # Send the signal after the (outermost) transaction is committed:
+        transaction.on_commit(
+            functools.partial(publisher_post_revert.send, sender=self.__class__, instance=draft_obj),
+            using=self._state.db
+        )
 
         return draft_obj
 
+    @classmethod
+    def create_snapshots(cls, pairs):
+        """
+        Store a PublisherSnapshot of the public objects, if 'publisher_snapshots' is True
+
+        pairs: list of (draft_obj, publish_obj) tuples
+        """
+        if cls.publisher_snapshots and pairs:
+            PublisherSnapshot.objects.create_snapshots(cls, pairs)
+
+    @assert_draft
+    def get_snapshots(self):
+        """
+        Returns all snapshots of this entry, newest first.
+        """
+        return PublisherSnapshot.objects.for_instance(self)
+
+    @assert_draft
+    @publisher_transaction
+    def rollback_to(self, snapshot):
+        """
+        Restore the public version from a PublisherSnapshot: the field values,
+        translations and placeholder plugins. The public version gets the current
+        'publisher_modified_at'. The draft content is not changed, but it's marked as dirty.
+
+        Note: Relations are not stored in snapshots.
+        """
+        if snapshot.content_type_id != ContentType.objects.get_for_model(self).pk or snapshot.object_id != self.pk:
+            raise ValidationError("%s is not a snapshot of %s" % (snapshot, self))
+
+        data = snapshot.get_data()
+        values = snapshots.get_field_values(self.__class__, data)
+
+        now = timezone.now()
+        values['publisher_modified_at'] = now
+
+        publish_obj = self.publisher_linked
+        if publish_obj is None:
+            # Not published at the moment: create a new public version
+            publish_obj = self.__class__(**values)
+            publish_obj.publisher_is_draft = False
+            publish_obj._suppress_modified = True # Use 'now' from above
+            publish_obj.save()
+
+            self.__class__._base_manager.filter(pk=self.pk).update(publisher_linked=publish_obj)
+            self.publisher_linked = publish_obj
+            if self._publisher_loaded_values is not None:
+                self._publisher_loaded_values['publisher_linked_id'] = publish_obj.pk
+        else:
+            self.__class__._base_manager.filter(pk=publish_obj.pk).update(**values)
+            for attname, value in values.items():
+                setattr(publish_obj, attname, value)
+
+        snapshots.restore_translations(publish_obj, data)
+        snapshots.restore_placeholders(publish_obj, self, data)
+        self.update_visible(publish_obj)
+
+        # The draft differs from the restored public version: mark it as dirty
+        self.publisher_modified_at = now + datetime.timedelta(microseconds=1)
+        self.__class__._base_manager.filter(pk=self.pk).update(publisher_modified_at=self.publisher_modified_at)
+        if self._publisher_loaded_values is not None:
+            self._publisher_loaded_values['publisher_modified_at'] = self.publisher_modified_at
+
+        generations.increment_generation_on_commit(self.__class__, [self.pk], using=self._state.db)
+
+        # Send the signal after the (outermost) transaction is committed:
+        transaction.on_commit(
+            functools.partial(publisher_post_rollback.send, sender=self.__class__, instance=self, snapshot=snapshot),
+            using=self._state.db
+        )
+
+        log.info("%s rolled back to %s", self, snapshot)
+        return publish_obj
+
+    def update_visible(self, publish_obj):
+        """
+        Update 'publisher_visible' of the public object, if 'publisher_track_visible' is True
+        """
+        if self.publisher_track_visible:
+            self.__class__.objects.filter(pk=publish_obj.pk).update_visible()
+            publish_obj.publisher_visible = not (publish_obj.hidden_by_start_date or publish_obj.hidden_by_end_date)
+
+    def get_copy_field_values(self, obj):
+        """
+        Returns the concrete field values of obj that will be copied on publish
+        as a dict: {<attname>: <value>}
+
+        Primary key, publisher fields and placeholder fields are not included.
+        """
+        placeholder_fields = self.get_placeholder_fields(obj)
+
+        values = {}
+        for field in obj._meta.concrete_fields:
+            if field.primary_key or field.name in self.publisher_ignore_fields:
+                continue
+            if field.name in placeholder_fields:
+                # The public version has its own placeholder
+                continue
+            values[field.attname] = getattr(obj, field.attname)
+        return values
+
+    def update_public_object(self, draft_obj, publish_obj):
+        """
+        Copy the draft field values onto the existing public row with one UPDATE.
+        """
+        values = self.get_copy_field_values(draft_obj)
+        values.update({
+            'publisher_is_draft': False,
+            'publisher_modified_at': timezone.now(),
+            'publisher_published_at': draft_obj.publisher_published_at,
+        })
+        publish_obj.__class__.objects.filter(pk=publish_obj.pk).update(**values)
+
+        # Update the in-memory instance, too:
+        for attname, value in values.items():
+            setattr(publish_obj, attname, value)
+
     @staticmethod
     def clone_translations(src_obj, dst_obj):
-        if hasattr(src_obj, 'translations'):
-            for translation in src_obj.translations.all():
+        src_obj.bulk_clone_translations([(src_obj, dst_obj)])
+
+    def sync_translations(self, src_obj, dst_obj):
+        """
+        Replace all existing translations of dst_obj with the translations of src_obj
+        """
+        self.bulk_clone_translations([(src_obj, dst_obj)], replace=True)
+
+    @classmethod
+    def get_translation_relations(cls):
+        """
+        Returns the related names of the translation models.
+        """
+        try:
+            cls._meta.get_field('translations')
+        except FieldDoesNotExist:
+            return ()
+        return ('translations',)
+
+    @classmethod
+    def bulk_clone_translations(cls, pairs, replace=False):
+        """
+        Copy the translations of many objects with one bulk_create() per translation model.
+
+        pairs: list of (src_obj, dst_obj) tuples
+        replace: delete all existing translations of the dst objects first
+        """
+        dst_map = dict((src_obj.pk, dst_obj) for src_obj, dst_obj in pairs)
+
+        for rel_name in cls.get_translation_relations():
+            relation = cls._meta.get_field(rel_name)
+            manager = relation.related_model._base_manager
+            master_field = relation.field
+
+            if replace:
+                manager.filter(**{
+                    "%s__in" % master_field.name: [dst_obj.pk for dst_obj in dst_map.values()]
+                }).delete()
+
+            translations = list(
+                manager.filter(**{"%s__in" % master_field.name: list(dst_map)}).order_by("pk")
+            )
+            for translation in translations:
+                dst_obj = dst_map[getattr(translation, master_field.attname)]
                 translation.pk = None
-                translation.master = dst_obj
-                translation.save()
+                setattr(translation, master_field.name, dst_obj)
+
+            manager.bulk_create(translations)
+
+    @classmethod
+    def clear_translations_cache(cls, objects):
+        """
+        Invalidate cached translations of objects, after their translations
+        are changed without save()
+        """
+        pass
 
     def clone_placeholder(self, src_obj, dst_obj):
-        if not django_cms_exists:
+        self.bulk_clone_placeholders([(src_obj, dst_obj)])
+
+    def sync_placeholder(self, src_obj, dst_obj):
+        """
+        Replace the plugins in the existing placeholders of dst_obj
+        with copies of the src_obj plugins.
+        """
+        self.bulk_clone_placeholders([(src_obj, dst_obj)])
+
+    @classmethod
+    def bulk_clone_placeholders(cls, pairs):
+        """
+        Copy the plugins of all placeholder fields of many objects.
+
+        pairs: list of (src_obj, dst_obj) tuples
+
+        A dst object gets a new placeholder, if it has none or shares it with
+        the src object. The existing dst placeholders are cleared.
+        The queries are independent of the number of objects and fields, except for:
+         * copy_plugins_to(): The plugins are multi-table inherited
+           models, so they can't be created with bulk_create().
+         * new dst objects: PlaceholderField.pre_save() creates their placeholders
+           one by one on save() and bulk_create(), before this method is called.
+           So the bulk creation below is only used for dst objects without
+           a placeholder or with a shared one (see: patch_placeholders())
+        """
+        if not django_cms_exists or not pairs:
+            return
+
+        field_names = pairs[0][0].get_placeholder_fields()
+        if not field_names:
             return
 
-        for field in self.get_placeholder_fields(src_obj):
-            src_placeholder = getattr(src_obj, field)
-            dst_placeholder = getattr(dst_obj, field)
+        attnames = dict((name, cls._meta.get_field(name).attname) for name in field_names)
+
+        # (dst_obj, field name, src placeholder id) that need a new placeholder
+        missing = []
+        clear_ids = []
+        src_ids = set()
+        for src_obj, dst_obj in pairs:
+            for name, attname in attnames.items():
+                src_id = getattr(src_obj, attname)
+                if src_id is None:
+                    continue
+                dst_id = getattr(dst_obj, attname)
+                src_ids.add(src_id)
+                if dst_id is None or dst_id == src_id:
+                    missing.append((dst_obj, name, src_id))
+                else:
+                    clear_ids.append(dst_id)
+
+        dst_placeholders = {}
+        if clear_ids:
+            # Delete the old plugins (incl. the plugin model rows) of all existing placeholders
+            CMSPlugin._base_manager.filter(placeholder_id__in=clear_ids).delete()
+            dst_placeholders.update(Placeholder.objects.in_bulk(clear_ids))
+
+        if missing:
+            src_placeholders = Placeholder.objects.in_bulk([src_id for dst_obj, name, src_id in missing])
+            new_placeholders = [
+                Placeholder(slot=src_placeholders[src_id].slot)
+                for dst_obj, name, src_id in missing
+            ]
+            if connections[Placeholder.objects.db].features.can_return_ids_from_bulk_insert:
+                Placeholder.objects.bulk_create(new_placeholders)
+            else:
+                for placeholder in new_placeholders:
+                    placeholder.save()
+
+            # Store the new placeholders with one UPDATE per field:
+            for name, attname in attnames.items():
+                dst_pks = []
+                whens = []
+                for (dst_obj, field_name, src_id), placeholder in zip(missing, new_placeholders):
+                    if field_name == name:
+                        setattr(dst_obj, name, placeholder)
+                        dst_pks.append(dst_obj.pk)
+                        whens.append(When(pk=dst_obj.pk, then=Value(placeholder.pk)))
+                if whens:
+                    cls._base_manager.filter(pk__in=dst_pks).update(
+                        **{attname: Case(*whens, output_field=models.IntegerField())}
+                    )
 
-            dst_placeholder.pk = None
-            dst_placeholder.save()
+            dst_placeholders.update((placeholder.pk, placeholder) for placeholder in new_placeholders)
 
-            setattr(dst_obj, field, dst_placeholder)
-            dst_obj.save()
+        # Fetch the plugins of all src placeholders with one query:
+        plugins = defaultdict(list)
+        for plugin in CMSPlugin.objects.filter(placeholder_id__in=src_ids).order_by('path'):
+            plugins[plugin.placeholder_id].append(plugin)
 
-            src_plugins = src_placeholder.get_plugins_list()
+        for src_obj, dst_obj in pairs:
+            for name, attname in attnames.items():
+                src_plugins = plugins.get(getattr(src_obj, attname))
+                if src_plugins:
+                    copy_plugins_to(src_plugins, dst_placeholders[getattr(dst_obj, attname)])
 
-            # CMS automatically generates a new Placeholder ID
-            copy_plugins_to(src_plugins, dst_placeholder)
+    @classmethod
+    def bulk_clone_relations(cls, pairs, replace=False):
+        """
+        Copy the relations listed in 'publisher_clone_relations' of many objects.
+
+        pairs: list of (src_obj, dst_obj) tuples
+        replace: delete the existing relations of the dst objects first
+
+        ManyToManyField: The through rows are copied with one bulk_create().
+            Targets that are publisher drafts are replaced by their public
+            version, not published drafts are skipped.
+            (On revert the public targets are replaced by their drafts)
+        Reverse ForeignKey: The related objects are copied with one bulk_create()
+            (So they can't be multi-table inherited models)
+        """
+        if not cls.publisher_clone_relations or not pairs:
+            return
+
+        dst_map = dict((src_obj.pk, dst_obj.pk) for src_obj, dst_obj in pairs)
+
+        # Copy to drafts on revert_to_public()
+        to_draft = pairs[0][1].publisher_is_draft
+
+        for name in cls.publisher_clone_relations:
+            field = cls._meta.get_field(name)
+
+            if field.many_to_many and not field.auto_created:
+                # A ManyToManyField on this model
+                through = field.remote_field.through
+                source_field = through._meta.get_field(field.m2m_field_name())
+                target_field = through._meta.get_field(field.m2m_reverse_field_name())
+                target_model = field.related_model
+            elif field.one_to_many:
+                # A reverse ForeignKey
+                through = field.related_model
+                source_field = field.field
+                target_field = target_model = None
+            else:
+                raise FieldError("Can't clone %r: Only ManyToManyFields and reverse ForeignKeys are supported" % name)
+
+            manager = through._base_manager
+
+            if replace:
+                manager.filter(**{"%s__in" % source_field.name: list(dst_map.values())}).delete()
+
+            related = list(manager.filter(**{"%s__in" % source_field.name: list(dst_map)}).order_by("pk"))
+
+            if target_model is not None and issubclass(target_model, PublisherModelBase):
+                target_ids = set(getattr(obj, target_field.attname) for obj in related)
+                queryset = target_model._base_manager.filter(publisher_is_draft=True)
+                if to_draft:
+                    # Replace the public targets with their draft version:
+                    target_map = dict(
+                        queryset.filter(publisher_linked__in=target_ids).values_list("publisher_linked", "pk")
+                    )
+                else:
+                    # Replace the draft targets with their public version:
+                    target_map = dict(
+                        queryset.filter(pk__in=target_ids).values_list("pk", "publisher_linked")
+                    )
+                remapped = []
+                for obj in related:
+                    target_id = getattr(obj, target_field.attname)
+                    if target_id in target_map:
+                        target_id = target_map[target_id]
+                        if target_id is None:
+                            # The draft is not published: skip
+                            continue
+                        setattr(obj, target_field.attname, target_id)
+                    remapped.append(obj)
+                related = remapped
+
+            for obj in related:
+                obj.pk = None
+                setattr(obj, source_field.attname, dst_map[getattr(obj, source_field.attname)])
+
+            manager.bulk_create(related)
 
     def clone_relations(self, src_obj, dst_obj):
         """
         Since copying relations is so complex, leave this to the implementing class
+        (ManyToManyFields and reverse ForeignKeys can be copied by 'publisher_clone_relations')
+
+        Note: With 'publisher_update_in_place' the dst_obj is the existing public
+        object, that may have relations from the last publishing.
         """
         pass
 
     def get_placeholder_fields(self, obj=None):
+        if obj is None:
+            obj = self
+
+        placeholder_fields = obj.__class__.publisher_placeholder_fields
+        if placeholder_fields is None:
+            # class_prepared signal was not sent, yet
+            placeholder_fields = obj.__class__.collect_placeholder_fields()
+
+        return placeholder_fields
+
+    @classmethod
+    def collect_placeholder_fields(cls):
+        """
+        Returns the names of all PlaceholderFields.
+        Called once per model class by the class_prepared signal handler.
+        """
         if not django_cms_exists:
-            return []
+            return ()
 
-        placeholder_fields = []
+        return tuple(
+            field.name
+            for field in cls._meta.fields
+            if isinstance(field, PlaceholderField) and field.name not in cls.publisher_ignore_fields
+        )
 
-        if obj is None:
-            obj = self
+    def get_fingerprint_translations(self):
+        """
+        Returns all translation instances that should be included into the fingerprint.
+        """
+        if self.pk is None or not hasattr(self, 'translations'):
+            return []
+        return list(self.translations.all().order_by('language_code'))
 
-        model_fields = obj.__class__._meta.get_fields()
-        for field in model_fields:
-            if field.name in self.publisher_ignore_fields:
-                continue
+    def get_fingerprint_plugins(self):
+        """
+        Returns all plugin instances of all placeholder fields.
+        """
+        if not django_cms_exists:
+            return []
 
-            try:
-                if isinstance(field, (Placeholder, PlaceholderField)):
-                    placeholder_fields.append(field.name)
-            except (ObjectDoesNotExist, AttributeError) as err:
-                continue
+        plugins = []
+        for field in self.get_placeholder_fields():
+            placeholder = getattr(self, field)
+            if placeholder is not None:
+                plugins += list(downcast_plugins(placeholder.get_plugins_list()))
+        return plugins
 
-        return placeholder_fields
+    def get_publisher_fingerprint(self):
+        """
+        Returns a SHA1 hex digest over the content of this instance:
+        the concrete fields, the translations and the placeholder plugins.
+        """
+        def get_values(obj, exclude):
+            return [
+                (field.attname, getattr(obj, field.attname))
+                for field in obj._meta.concrete_fields
+                if not field.primary_key and field.name not in exclude
+            ]
+
+        values = self.get_copy_field_values(self)
+        values.pop('publisher_published_at', None) # will be set on publish
+        values.pop('publisher_fingerprint', None)
+        data = [sorted(values.items())]
+
+        for translation in self.get_fingerprint_translations():
+            data.append(get_values(translation, exclude=('master',)))
+
+        if django_cms_exists:
+            # Skip the tree/timestamp fields, but keep the plugin position:
+            base_fields = set(field.name for field in CMSPlugin._meta.concrete_fields)
+            base_fields -= set(('plugin_type', 'language', 'position', 'depth'))
+            base_fields.add('cmsplugin_ptr')
+            for plugin in self.get_fingerprint_plugins():
+                data.append(get_values(plugin, exclude=base_fields))
+
+        return hashlib.sha1(force_bytes(repr(data))).hexdigest()
 
     @assert_draft
     def admin_change(self):
@@ -341,13 +915,98 @@ class PublisherModelBase(ModelPermissionMixin, models.Model):
 
     _suppress_modified=False
 
+    # Field values loaded from the database, only used if 'publisher_track_changes' is True
+    _publisher_loaded_values = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(PublisherModelBase, cls).from_db(db, field_names, values)
+        if cls.publisher_track_changes:
+            instance._publisher_loaded_values = instance.get_tracked_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super(PublisherModelBase, self).refresh_from_db(using=using, fields=fields)
+        if self._publisher_loaded_values is None:
+            return
+
+        values = self.get_tracked_values()
+        if fields is None:
+            self._publisher_loaded_values = values
+        else:
+            for name in fields:
+                attname = self._meta.get_field(name).attname
+                if attname in values:
+                    self._publisher_loaded_values[attname] = values[attname]
+
+    def get_tracked_values(self):
+        """
+        Returns a dict with the values of all loaded (not deferred) concrete fields.
+        """
+        return {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def get_changed_fields(self):
+        """
+        Returns the attnames of all fields changed since loading from the database.
+        """
+        loaded_values = self._publisher_loaded_values or {}
+        return [
+            attname
+            for attname, value in self.get_tracked_values().items()
+            if attname not in loaded_values or loaded_values[attname] != value
+        ]
+
+    def has_changed_translations(self):
+        """
+        Returns True if not yet saved translations exists.
+        """
+        return False
+
     def save(self, **kwargs):
-        if self._suppress_modified is False:
-            # FIXME: Will always sets the dirty flag, no matter if really something's changed :(
+        if self.publisher_track_fingerprint and self.publisher_is_draft:
+            self.publisher_fingerprint = self.get_publisher_fingerprint()
+
+        track_changes = (
+            self._publisher_loaded_values is not None
+            and self.pk is not None
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        )
+        if track_changes:
+            update_fields = self.get_changed_fields()
+            if self._suppress_modified is False and (update_fields or self.has_changed_translations()):
+                self.publisher_modified_at = timezone.now()
+                if 'publisher_modified_at' not in update_fields:
+                    update_fields.append('publisher_modified_at')
+
+            # Django will skip the query, if update_fields is empty:
+            kwargs['update_fields'] = update_fields
+
+        elif self._suppress_modified is False:
             self.publisher_modified_at = timezone.now()
 
         super(PublisherModelBase, self).save(**kwargs)
 
+        if self.publisher_track_changes:
+            self._publisher_loaded_values = self.get_tracked_values()
+
+
+# Set PublisherModelBase.publisher_placeholder_fields for all publisher models:
+models.signals.class_prepared.connect(publisher_class_prepared)
+
+
+# Composite indexes for drafts()/published() with ordering and visible(),
+# checked by the 'publisher_indexes' management command:
+PUBLISHER_INDEX_TOGETHER = (
+    ("publisher_is_draft", "publication_start_date", "publication_end_date"),
+    ("publisher_is_draft", "publisher_modified_at"),
+    ("publisher_is_draft", "publisher_visible"),
+)
+
 
 class PublisherModel(PublisherModelBase):
     objects = PublisherManager()
@@ -355,6 +1014,9 @@ class PublisherModel(PublisherModelBase):
     class Meta:
         abstract = True
 
+        # Inherited by subclasses that derive their Meta from PublisherModel.Meta:
+        index_together = PUBLISHER_INDEX_TOGETHER
+
         # https://docs.djangoproject.com/en/1.11/ref/models/options/#default-permissions
         default_permissions = (
             # Django default permissions:
@@ -367,6 +1029,9 @@ class PublisherModel(PublisherModelBase):
 
 if parler_exists:
     from .managers import PublisherParlerManager
+    from django.core.cache import cache
+    from parler import appsettings as parler_appsettings
+    from parler.cache import get_translation_cache_key, is_missing
     from parler.models import TranslatableModelMixin
 
     class PublisherParlerModel(TranslatableModelMixin, PublisherModelBase):
@@ -375,6 +1040,66 @@ if parler_exists:
         class Meta(PublisherModel.Meta):
             abstract = True
 
+        @classmethod
+        def get_translation_relations(cls):
+            return tuple(meta.rel_name for meta in cls._parler_meta)
+
+        @classmethod
+        def bulk_clone_translations(cls, pairs, replace=False):
+            """
+            bulk_create() doesn't call save(), so the parler caches
+            of the dst objects must be invalidated.
+            """
+            super(PublisherParlerModel, cls).bulk_clone_translations(pairs, replace=replace)
+            cls.clear_translations_cache([dst_obj for src_obj, dst_obj in pairs])
+
+        @classmethod
+        def clear_translations_cache(cls, objects):
+            for obj in objects:
+                if obj._translations_cache is not None:
+                    obj._translations_cache.clear()
+
+            if not parler_appsettings.PARLER_ENABLE_CACHING:
+                return
+
+            language_codes = [language_code for language_code, name in settings.LANGUAGES]
+            keys = []
+            for obj in objects:
+                for translation_model in cls._parler_meta.get_all_models():
+                    for language_code in language_codes:
+                        keys.append(get_translation_cache_key(translation_model, obj.pk, language_code))
+
+            cache.delete_many(keys)
+
+        def has_changed_translations(self):
+            if self._translations_cache is None:
+                return False
+
+            for meta in self._parler_meta:
+                for translation in self._translations_cache[meta.model].values():
+                    if not is_missing(translation) and (translation.pk is None or translation.is_modified):
+                        return True
+            return False
+
+        def get_fingerprint_translations(self):
+            """
+            The saved translations updated with the not yet saved translations
+            from the parler cache, because parler saves the translations
+            after the master model.
+            """
+            translations = {}
+            for meta in self._parler_meta:
+                if self.pk is not None:
+                    for translation in getattr(self, meta.rel_name).all():
+                        translations[(meta.rel_name, translation.language_code)] = translation
+
+                if self._translations_cache is not None:
+                    for language_code, translation in self._translations_cache[meta.model].items():
+                        if not is_missing(translation):
+                            translations[(meta.rel_name, language_code)] = translation
+
+            return [translations[key] for key in sorted(translations)]
+
     if aldryn_translation_tools_exists:
         from aldryn_translation_tools.models import TranslatedAutoSlugifyMixin
 
@@ -625,6 +1350,8 @@ class PublisherStateModel(ModelPermissionMixin, models.Model):
                 for language in languages:
                     log.debug("Publish cms page in language %s", language)
                     self.publisher_instance.publish(language=language)
+            elif app_settings.PUBLISHER_BACKGROUND_PUBLISH:
+                PublisherJob.objects.enqueue_publish(self.publisher_instance, user=response_user)
             else:
                 self.publisher_instance.publish()
 
@@ -643,7 +1370,10 @@ class PublisherStateModel(ModelPermissionMixin, models.Model):
                 published = self.publisher_instance.get_public_object()
                 assert published is not None
                 draft = self.publisher_instance.get_draft_object()
-                draft.unpublish()
+                if app_settings.PUBLISHER_BACKGROUND_PUBLISH:
+                    PublisherJob.objects.enqueue_unpublish(draft, user=response_user)
+                else:
+                    draft.unpublish()
         else:
             raise ValidationError("Unknown action: %r !" % self.action)
 
@@ -690,3 +1420,326 @@ class PublisherStateModel(ModelPermissionMixin, models.Model):
         verbose_name_plural = _("Publisher States")
         get_latest_by = 'request_timestamp'
         ordering = ['-request_timestamp']
+
+
+class PublisherJob(models.Model):
+    """
+    A (un-)publish action, executed in background by the 'publisher_worker' management command.
+    Used if settings.PUBLISHER_BACKGROUND_PUBLISH is True.
+    """
+    objects = PublisherJobManager()
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+
+    # Note: It's always the draft version!
+    publisher_instance = GenericForeignKey('content_type', 'object_id')
+
+    ACTION_CHOICES = PublisherStateModel.ACTION_CHOICES
+    ACTION_DICT = PublisherStateModel.ACTION_DICT
+
+    action = models.CharField(max_length=9, choices=ACTION_CHOICES, editable=False)
+
+    @property
+    def action_name(self):
+        return self.ACTION_DICT[self.action]
+
+    STATE_CHOICES = (
+        (constants.JOB_STATE_PENDING, _('pending')),
+        (constants.JOB_STATE_RUNNING, _('running')),
+        (constants.JOB_STATE_DONE, _('done')),
+        (constants.JOB_STATE_FAILED, _('failed')),
+    )
+    STATE_DICT = dict(STATE_CHOICES)
+
+    state = models.CharField(
+        max_length=7, choices=STATE_CHOICES, default=constants.JOB_STATE_PENDING,
+        editable=False, db_index=True
+    )
+
+    @property
+    def state_name(self):
+        return self.STATE_DICT[self.state]
+
+    user = models.ForeignKey( # User that creates the job
+        getattr(settings, 'AUTH_USER_MODEL', 'auth.User'),
+        null=True, editable=False, on_delete=models.SET_NULL,
+        related_name='%(app_label)s_%(class)s_user'
+    )
+
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    started_at = models.DateTimeField(null=True, editable=False)
+    finished_at = models.DateTimeField(null=True, editable=False)
+
+    # Number of claims and the delay of the next claim, see: run()
+    attempts = models.PositiveIntegerField(default=0, editable=False)
+    retry_after = models.DateTimeField(null=True, editable=False)
+
+    error = models.TextField(null=True, editable=False)
+
+    def run(self):
+        """
+        Execute the (un-)publish action. Called by the worker after the job was claimed.
+        """
+        assert self.state == constants.JOB_STATE_RUNNING, "%r != %r" % (self.state, constants.JOB_STATE_RUNNING)
+
+        try:
+            instance = self.publisher_instance
+            if instance is None:
+                raise ObjectDoesNotExist("Publisher instance was deleted!")
+
+            if self.action == constants.ACTION_PUBLISH:
+                instance.publish()
+            elif self.action == constants.ACTION_UNPUBLISH:
+                instance.unpublish()
+            else:
+                raise ValidationError("Unknown action: %r !" % self.action)
+        except PublisherLockError as err:
+            if self.attempts < app_settings.PUBLISHER_JOB_MAX_ATTEMPTS:
+                # Someone else (un-)publish the same instance: try again later
+                delay = app_settings.PUBLISHER_JOB_RETRY_DELAY * 2 ** (self.attempts - 1)
+                log.info("Requeue %s in %s sec.: %s", self, delay, err)
+                self.state = constants.JOB_STATE_PENDING
+                self.started_at = None
+                self.retry_after = timezone.now() + datetime.timedelta(seconds=delay)
+                self.save()
+                return
+
+            log.error("Job %s failed after %i attempts: %s", self, self.attempts, err)
+            self.state = constants.JOB_STATE_FAILED
+            self.error = "%s: %s" % (err.__class__.__name__, err)
+        except Exception as err:
+            log.exception("Job %s failed", self)
+            self.state = constants.JOB_STATE_FAILED
+            self.error = "%s: %s" % (err.__class__.__name__, err)
+        else:
+            log.info('Job "%s" for "%s" done.', self.action, instance)
+            self.state = constants.JOB_STATE_DONE
+
+        self.finished_at = timezone.now()
+        self.save()
+
+    def status_dict(self):
+        """
+        Used in the admin for the JSON status response.
+        """
+        def isoformat(dt):
+            if dt is not None:
+                return dt.isoformat()
+
+        return {
+            "id": self.pk,
+            "action": self.action,
+            "state": self.state,
+            "state_name": six.text_type(self.state_name),
+            "created_at": isoformat(self.created_at),
+            "started_at": isoformat(self.started_at),
+            "finished_at": isoformat(self.finished_at),
+            "attempts": self.attempts,
+            "retry_after": isoformat(self.retry_after),
+            "error": self.error,
+        }
+
+    def __str__(self):
+        return "%s %s (%s pk:%r) %s" % (
+            self.pk, self.action, self.content_type, self.object_id, self.state
+        )
+
+    class Meta:
+        verbose_name = _("Publisher Job")
+        verbose_name_plural = _("Publisher Jobs")
+        ordering = ['created_at']
+        # Jobs are created via PublisherAdmin, that checks the publish permissions
+        default_permissions = ()
+
+
+class PublisherSnapshot(models.Model):
+    """
+    The public version of a publisher entry at publish time,
+    used to restore it via PublisherModelBase.rollback_to()
+    """
+    objects = PublisherSnapshotManager()
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+
+    # Note: It's always the draft version!
+    publisher_instance = GenericForeignKey('content_type', 'object_id')
+
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
+
+    # zlib compressed JSON, see: publisher/snapshots.py
+    data = models.BinaryField(editable=False)
+
+    def get_data(self):
+        return snapshots.load(self.data)
+
+    def __str__(self):
+        return "Snapshot %s of %s #%s from %s" % (self.pk, self.content_type, self.object_id, self.created_at)
+
+    class Meta:
+        ordering = ("-created_at", "-pk")
+        index_together = (
+            ("content_type", "object_id"),
+        )
+        default_permissions = () # snapshots are created and deleted by publish()
+
+
+class PublisherRelease(models.Model):
+    """
+    A set of drafts across publisher models that will be (un-)published
+    together in one transaction.
+    Executed directly via execute() or at 'scheduled_at' by the
+    'publisher_scheduler' management command.
+    """
+    objects = PublisherReleaseManager()
+
+    name = models.CharField(_("name"), max_length=255)
+
+    scheduled_at = models.DateTimeField(_("scheduled at"),
+        null=True, blank=True, db_index=True,
+        help_text=_("Execute the release at this point in time. Leave blank to execute it manually.")
+    )
+
+    STATE_CHOICES = (
+        (constants.RELEASE_STATE_OPEN, _('open')),
+        (constants.RELEASE_STATE_DONE, _('done')),
+        (constants.RELEASE_STATE_FAILED, _('failed')),
+    )
+    STATE_DICT = dict(STATE_CHOICES)
+
+    state = models.CharField(
+        max_length=6, choices=STATE_CHOICES, default=constants.RELEASE_STATE_OPEN,
+        editable=False, db_index=True
+    )
+
+    @property
+    def state_name(self):
+        return self.STATE_DICT[self.state]
+
+    user = models.ForeignKey( # User that creates the release
+        getattr(settings, 'AUTH_USER_MODEL', 'auth.User'),
+        null=True, blank=True, editable=False, on_delete=models.SET_NULL,
+        related_name='%(app_label)s_%(class)s_user'
+    )
+
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    executed_at = models.DateTimeField(null=True, editable=False)
+
+    error = models.TextField(null=True, editable=False)
+
+    def add(self, publisher_instance, action=constants.ACTION_PUBLISH):
+        """
+        Add the draft of publisher_instance to this release.
+        """
+        assert action in (constants.ACTION_PUBLISH, constants.ACTION_UNPUBLISH)
+        assert self.state == constants.RELEASE_STATE_OPEN, "Release %s is not open" % self
+
+        draft = publisher_instance.get_draft_object()
+        item, created = self.items.update_or_create(
+            content_type=ContentType.objects.get_for_model(draft),
+            object_id=draft.pk,
+            defaults={"action": action},
+        )
+        return item
+
+    def execute(self):
+        """
+        (Un-)publish all items in one transaction:
+        Publish dirty drafts (dependencies between the items first)
+        with one bulk publish per model and unpublish with one bulk unpublish per model.
+
+        Returns the number of published and unpublished entries.
+        A failed release is marked with state 'failed' and the error is raised.
+        """
+        try:
+            with transaction.atomic(using=self._state.db):
+                # Lock the release, so it can't be executed twice at the same time:
+                release = PublisherRelease.objects.select_for_update().get(pk=self.pk)
+                if release.state != constants.RELEASE_STATE_OPEN:
+                    log.info("Skip %s: state is %r", release, release.state)
+                    return 0, 0
+
+                publish_nodes = []
+                unpublish_pks = defaultdict(list)
+                for item in self.items.select_related("content_type"):
+                    model = item.content_type.model_class()
+                    if item.action == constants.ACTION_PUBLISH:
+                        publish_nodes.append((model, item.object_id))
+                    else:
+                        unpublish_pks[model].append(item.object_id)
+
+                publish_count = dependencies.publish_graph(
+                    dependencies.get_items_graph(publish_nodes), using=self._state.db
+                )
+
+                unpublish_count = 0
+                for model, pks in unpublish_pks.items():
+                    unpublish_count += model.objects.filter(pk__in=pks).unpublish()
+
+                self.state = constants.RELEASE_STATE_DONE
+                self.executed_at = timezone.now()
+                self.error = None
+                self.save()
+        except Exception as err:
+            log.exception("Release %s failed", self)
+            self.state = constants.RELEASE_STATE_FAILED
+            self.executed_at = timezone.now()
+            self.error = "%s: %s" % (err.__class__.__name__, err)
+            self.save()
+            raise
+
+        log.info("%s executed: %i published, %i unpublished", self, publish_count, unpublish_count)
+        return publish_count, unpublish_count
+
+    def __str__(self):
+        return "%s (%s)" % (self.name, self.state)
+
+    class Meta:
+        ordering = ("-created_at",)
+        verbose_name = _("Release")
+        verbose_name_plural = _("Releases")
+
+
+class PublisherReleaseItem(models.Model):
+    """
+    A draft in a PublisherRelease
+    """
+    release = models.ForeignKey(PublisherRelease, related_name="items", on_delete=models.CASCADE)
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+
+    # Note: It's always the draft version!
+    publisher_instance = GenericForeignKey('content_type', 'object_id')
+
+    action = models.CharField(
+        max_length=9, choices=PublisherStateModel.ACTION_CHOICES, default=constants.ACTION_PUBLISH
+    )
+
+    def __str__(self):
+        return "%s %s pk:%r" % (self.action, self.content_type, self.object_id)
+
+    class Meta:
+        unique_together = (
+            ("release", "content_type", "object_id"),
+        )
+        default_permissions = () # Managed with the PublisherRelease
+
+
+class PublisherSchedulerRun(models.Model):
+    """
+    The last run of the 'publisher_scheduler' management command (only one row),
+    the next run sends the signals for all changes since then.
+    """
+    objects = PublisherSchedulerRunManager()
+
+    last_run_at = models.DateTimeField()
+
+    def __str__(self):
+        return "Last scheduler run: %s" % self.last_run_at
+
+    class Meta:
+        verbose_name = _("Publisher Scheduler Run")
+        verbose_name_plural = _("Publisher Scheduler Runs")
+        default_permissions = () # only changed by the 'publisher_scheduler' command
@@ -0,0 +1,129 @@
+"""
+    Send reads of public entries to read replicas, everything else to the primary database.
+
+    settings.py e.g.:
+
+        DATABASE_ROUTERS = ["publisher.routers.PublisherRouter"]
+        MIDDLEWARE = [
+            ...
+            "publisher.routers.PublisherPinningMiddleware",
+        ]
+        PUBLISHER_READ_DATABASES = ["replica1", "replica2"]
+
+    Only PublisherQuerySet.published() and visible() are read from a
+    replica. drafts(), (un-)publish, PublisherStateModel and all other
+    models use the primary database.
+
+    Read-your-publish: After a (un-)publish, revert or rollback all reads are pinned to the
+    primary database for settings.PUBLISHER_PIN_SECONDS, so the publisher
+    will not see stale content because of the replication lag. The
+    middleware keeps the pinning over the following requests via a cookie.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS
+
+from publisher import app_settings
+from publisher.signals import (publisher_post_bulk_publish, publisher_post_bulk_unpublish, publisher_post_publish,
+                               publisher_post_revert, publisher_post_rollback, publisher_post_unpublish)
+
+log = logging.getLogger(__name__)
+
+
+# Set by PublisherQuerySet.published()
+PUBLIC_HINT = "publisher_public"
+
+PIN_COOKIE_NAME = "publisher_pinned"
+
+_locals = threading.local()
+
+
+def _pin(seconds):
+    _locals.pinned_until = time.monotonic() + seconds
+
+
+def pin_to_primary(seconds=None):
+    """
+    Read everything from the primary database in the current thread
+    for the next seconds (default: settings.PUBLISHER_PIN_SECONDS)
+    """
+    if seconds is None:
+        seconds = app_settings.PUBLISHER_PIN_SECONDS
+    _pin(seconds)
+    _locals.set_cookie = True
+
+
+def unpin():
+    _locals.pinned_until = 0
+    _locals.set_cookie = False
+
+
+def is_pinned():
+    return getattr(_locals, "pinned_until", 0) > time.monotonic()
+
+
+def publisher_pin_handler(sender, **kwargs):
+    pin_to_primary()
+
+
+for signal in (publisher_post_publish, publisher_post_unpublish,
+               publisher_post_bulk_publish, publisher_post_bulk_unpublish,
+               publisher_post_revert, publisher_post_rollback):
+    signal.connect(publisher_pin_handler, dispatch_uid="publisher_pin_handler")
+
+
+class PublisherRouter:
+    def get_databases(self):
+        return [DEFAULT_DB_ALIAS] + list(app_settings.PUBLISHER_READ_DATABASES)
+
+    def db_for_read(self, model, **hints):
+        if not hints.get(PUBLIC_HINT) or not app_settings.PUBLISHER_READ_DATABASES:
+            return None
+
+        if is_pinned():
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(app_settings.PUBLISHER_READ_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db in app_settings.PUBLISHER_READ_DATABASES:
+            # Loaded from a replica: write to the primary database
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = self.get_databases()
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class PublisherPinningMiddleware:
+    """
+    Pin all reads of a request to the primary database,
+    if the client has (un-)published something in the last seconds.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        unpin()
+        if request.COOKIES.get(PIN_COOKIE_NAME):
+            _pin(app_settings.PUBLISHER_PIN_SECONDS)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            set_cookie = getattr(_locals, "set_cookie", False)
+            unpin()
+
+        if set_cookie:
+            log.debug("Pin %s to the primary database", request.path)
+            response.set_cookie(PIN_COOKIE_NAME, "1", max_age=app_settings.PUBLISHER_PIN_SECONDS)
+
+        return response
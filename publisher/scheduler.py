@@ -0,0 +1,153 @@
+"""
+    Find public entries that became visible/hidden by
+    publication_start_date/publication_end_date and send the signals:
+
+        publisher_became_visible
+        publisher_became_hidden
+
+    and execute scheduled PublisherRelease entries.
+
+    Used in the 'publisher_scheduler' management command.
+"""
+
+import logging
+
+from django.apps import apps
+from django.db.models import Q
+
+from publisher import generations
+from publisher.models import PublisherModelBase, PublisherRelease
+from publisher.signals import publisher_became_hidden, publisher_became_visible
+from publisher.utils import chunks
+
+log = logging.getLogger(__name__)
+
+
+# Max. number of pks in one signal:
+BATCH_SIZE = 500
+
+
+def get_publisher_models():
+    """
+    Returns all installed models with publication start/end dates.
+    """
+    return [model for model in apps.get_models() if issubclass(model, PublisherModelBase)]
+
+
+def became_visible(model, since, now):
+    """
+    Public entries that were hidden at 'since' and are visible at 'now'
+    """
+    return model._base_manager.filter(
+        Q(publication_end_date__isnull=True) | Q(publication_end_date__gt=now),
+        publisher_is_draft=False,
+        publication_start_date__gt=since,
+        publication_start_date__lte=now,
+    )
+
+
+def became_hidden(model, since, now):
+    """
+    Public entries that were visible at 'since' and are hidden at 'now'
+    """
+    return model._base_manager.filter(
+        Q(publication_start_date__isnull=True) | Q(publication_start_date__lte=since),
+        publisher_is_draft=False,
+        publication_end_date__gt=since,
+        publication_end_date__lte=now,
+    )
+
+
+def send_in_batches(signal, model, pks, batch_size):
+    for batch in chunks(pks, batch_size):
+        signal.send(sender=model, pks=batch)
+
+
+def send_transitions(since, now, models=None, batch_size=BATCH_SIZE):
+    """
+    Send the signals for all visibility changes between 'since' and 'now'.
+    Returns the number of visible and hidden entries.
+    """
+    if models is None:
+        models = get_publisher_models()
+
+    visible_count = hidden_count = 0
+    for model in models:
+        visible_pks = list(became_visible(model, since, now).order_by("pk").values_list("pk", flat=True))
+        if visible_pks:
+            log.info("%i %s entries became visible", len(visible_pks), model.__name__)
+            send_in_batches(publisher_became_visible, model, visible_pks, batch_size)
+            visible_count += len(visible_pks)
+
+        hidden_pks = list(became_hidden(model, since, now).order_by("pk").values_list("pk", flat=True))
+        if hidden_pks:
+            log.info("%i %s entries became hidden", len(hidden_pks), model.__name__)
+            send_in_batches(publisher_became_hidden, model, hidden_pks, batch_size)
+            hidden_count += len(hidden_pks)
+
+        if model.publisher_track_visible and (visible_pks or hidden_pks):
+            model.objects.filter(pk__in=visible_pks + hidden_pks).update_visible(now)
+
+        if visible_pks or hidden_pks:
+            # The generations are keyed by the draft pks:
+            draft_pks = model._base_manager.filter(
+                publisher_linked__in=visible_pks + hidden_pks
+            ).values_list("pk", flat=True)
+            generations.increment_generation(model, list(draft_pks))
+
+    return visible_count, hidden_count
+
+
+def update_visible(now, models=None):
+    """
+    Set the 'publisher_visible' field of all public entries
+    of the models with 'publisher_track_visible'.
+    Returns the number of changed entries.
+    """
+    if models is None:
+        models = get_publisher_models()
+
+    count = 0
+    for model in models:
+        if model.publisher_track_visible:
+            count += model.objects.update_visible(now)
+    return count
+
+
+def execute_due_releases(now):
+    """
+    Execute all open releases that are scheduled before 'now'.
+    Returns the number of executed releases.
+    """
+    count = 0
+    for release in PublisherRelease.objects.due(now).order_by("scheduled_at", "pk"):
+        try:
+            release.execute()
+        except Exception:
+            # The error is stored in the release
+            continue
+        count += 1
+    return count
+
+
+def next_transition(now, models=None):
+    """
+    Returns the next point in time after 'now' on which entries
+    becomes visible or hidden or a release is scheduled.
+    None if there is no upcoming change.
+    """
+    if models is None:
+        models = get_publisher_models()
+
+    dates = []
+    dt = PublisherRelease.objects.next_scheduled(now)
+    if dt is not None:
+        dates.append(dt)
+
+    for model in models:
+        dt = model.objects.next_visibility_change(now)
+        if dt is not None:
+            dates.append(dt)
+
+    if dates:
+        return min(dates)
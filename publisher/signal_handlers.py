@@ -15,6 +15,18 @@ def publisher_pre_delete(sender, **kwargs):
         instance.unpublish()
 
 
+def publisher_class_prepared(sender, **kwargs):
+    """
+    Collect the placeholder field names once per model class,
+    see: PublisherModelBase.get_placeholder_fields()
+    """
+    from publisher.models import PublisherModelBase
+    if not issubclass(sender, PublisherModelBase):
+        return
+
+    sender.publisher_placeholder_fields = sender.collect_placeholder_fields()
+
+
 def publisher_post_save(sender, **kwargs):
     """
     Work-a-round for:
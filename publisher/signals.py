@@ -9,7 +9,7 @@ publisher_pre_publish = Signal(providing_args=['instance'])
 publisher_publish_pre_save_draft = Signal(providing_args=['instance'])
 
 
-# Sent when a model is published (the draft is sent)
+# Sent after the transaction of PublisherModelBase.publish() is committed (the draft is sent)
 publisher_post_publish = Signal(providing_args=['instance'])
 
 
@@ -17,5 +17,44 @@ publisher_post_publish = Signal(providing_args=['instance'])
 publisher_pre_unpublish = Signal(providing_args=['instance'])
 
 
-# Sent when a model is unpublished (the draft is sent).
+# Sent after the transaction of PublisherModelBase.unpublish() is committed (the draft is sent).
 publisher_post_unpublish = Signal(providing_args=['instance'])
+
+
+# Sent after the transaction of PublisherModelBase.revert_to_public() is committed (the draft is sent).
+publisher_post_revert = Signal(providing_args=['instance'])
+
+
+# Sent after the transaction of PublisherModelBase.rollback_to() is committed
+# (the draft and the restored PublisherSnapshot are sent).
+publisher_post_rollback = Signal(providing_args=['instance', 'snapshot'])
+
+
+# Sent for every batch in PublisherQuerySet.publish(), before the drafts are published
+# (the model and the list of draft pks are sent).
+publisher_pre_bulk_publish = Signal(providing_args=['pks'])
+
+
+# Sent for every batch after the transaction of PublisherQuerySet.publish() is committed
+# (the model and the list of draft pks are sent).
+publisher_post_bulk_publish = Signal(providing_args=['pks'])
+
+
+# Sent for every batch in PublisherQuerySet.unpublish(), before the drafts are unpublished
+# (the model and the list of draft pks are sent).
+publisher_pre_bulk_unpublish = Signal(providing_args=['pks'])
+
+
+# Sent for every batch after the transaction of PublisherQuerySet.unpublish() is committed
+# (the model and the list of draft pks are sent).
+publisher_post_bulk_unpublish = Signal(providing_args=['pks'])
+
+
+# Sent by the 'publisher_scheduler' command, if entries became visible by publication_start_date
+# (the model and the list of public pks are sent).
+publisher_became_visible = Signal(providing_args=['pks'])
+
+
+# Sent by the 'publisher_scheduler' command, if entries became hidden by publication_end_date
+# (the model and the list of public pks are sent).
+publisher_became_hidden = Signal(providing_args=['pks'])
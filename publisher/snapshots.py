@@ -0,0 +1,211 @@
+"""
+    Serialize public versions into compact snapshots and restore them.
+
+    A snapshot contains the field values, the translations and the
+    placeholder plugins of a public object as zlib compressed JSON.
+
+    Used by PublisherSnapshot and PublisherModelBase.rollback_to()
+"""
+
+import json
+import zlib
+from collections import defaultdict
+
+from publisher.utils import django_cms_exists
+
+if django_cms_exists:
+    from cms.api import add_plugin
+    from cms.models import CMSPlugin
+    from cms.models.placeholdermodel import Placeholder
+    from cms.plugin_pool import plugin_pool
+    from cms.utils.plugins import downcast_plugins
+
+
+# Fields that will not be saved in snapshots:
+EXCLUDE_FIELDS = ('publisher_linked', 'publisher_is_draft', 'publisher_modified_at')
+
+
+def dump_values(obj, fields):
+    values = {}
+    for field in fields:
+        if field.value_from_object(obj) is None:
+            values[field.attname] = None
+        else:
+            values[field.attname] = field.value_to_string(obj)
+    return values
+
+
+def load_values(fields, values):
+    """
+    Fields that doesn't exist in the snapshot are skipped.
+    """
+    return dict(
+        (field.attname, None if values[field.attname] is None else field.to_python(values[field.attname]))
+        for field in fields
+        if field.attname in values
+    )
+
+
+def get_placeholder_fields(model):
+    if model.publisher_placeholder_fields is None:
+        # class_prepared signal was not sent, yet
+        return model.collect_placeholder_fields()
+    return model.publisher_placeholder_fields
+
+
+def get_object_fields(model):
+    placeholder_fields = get_placeholder_fields(model)
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in EXCLUDE_FIELDS and field.name not in placeholder_fields
+    ]
+
+
+def get_translation_fields(relation):
+    return [
+        field for field in relation.related_model._meta.concrete_fields
+        if not field.primary_key and field.name != relation.field.name
+    ]
+
+
+def get_plugin_fields(plugin_model):
+    """
+    The fields of the plugin model, without the CMSPlugin base fields
+    """
+    return [
+        field for field in plugin_model._meta.concrete_fields
+        if field.model is not CMSPlugin and not field.primary_key
+    ]
+
+
+def dump_plugins(plugins):
+    """
+    plugins must be ordered by path, so parents are dumped before their children.
+    """
+    positions = {}
+    data = []
+    for plugin in plugins:
+        positions[plugin.pk] = len(data)
+        data.append({
+            'plugin_type': plugin.plugin_type,
+            'language': plugin.language,
+            'parent': positions.get(plugin.parent_id),
+            'fields': dump_values(plugin, get_plugin_fields(plugin.__class__)),
+        })
+    return data
+
+
+def dump_many(model, objects):
+    """
+    Returns the snapshot data of all objects as a dict: {<pk>: <bytes>}
+    The number of queries doesn't depend on the number of objects.
+    """
+    if not objects:
+        return {}
+
+    pks = [obj.pk for obj in objects]
+    fields = get_object_fields(model)
+    data = dict(
+        (obj.pk, {'fields': dump_values(obj, fields), 'translations': {}, 'placeholders': {}})
+        for obj in objects
+    )
+
+    for rel_name in model.get_translation_relations():
+        relation = model._meta.get_field(rel_name)
+        translation_fields = get_translation_fields(relation)
+        translations = relation.related_model._base_manager.filter(
+            **{"%s__in" % relation.field.name: pks}
+        ).order_by("pk")
+        for obj_data in data.values():
+            obj_data['translations'][rel_name] = []
+        for translation in translations:
+            data[getattr(translation, relation.field.attname)]['translations'][rel_name].append(
+                dump_values(translation, translation_fields)
+            )
+
+    placeholder_fields = get_placeholder_fields(model)
+    if django_cms_exists and placeholder_fields:
+        placeholder_map = {}
+        for obj in objects:
+            for field_name in placeholder_fields:
+                placeholder_id = getattr(obj, "%s_id" % field_name)
+                if placeholder_id is not None:
+                    placeholder_map[placeholder_id] = (obj.pk, field_name)
+
+        plugins = defaultdict(list)
+        queryset = CMSPlugin.objects.filter(placeholder_id__in=list(placeholder_map)).order_by("path")
+        for plugin in downcast_plugins(queryset):
+            plugins[plugin.placeholder_id].append(plugin)
+
+        for placeholder_id, (pk, field_name) in placeholder_map.items():
+            data[pk]['placeholders'][field_name] = dump_plugins(plugins[placeholder_id])
+
+    return dict(
+        (pk, zlib.compress(json.dumps(obj_data).encode("utf-8")))
+        for pk, obj_data in data.items()
+    )
+
+
+def load(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+
+
+def get_field_values(model, data):
+    """
+    Returns the field values of the snapshot data as a dict: {<attname>: <value>}
+    """
+    return load_values(get_object_fields(model), data['fields'])
+
+
+def restore_translations(publish_obj, data):
+    """
+    Replace all translations of publish_obj with the translations from the snapshot data
+    """
+    model = publish_obj.__class__
+    for rel_name in model.get_translation_relations():
+        relation = model._meta.get_field(rel_name)
+        translation_model = relation.related_model
+        translation_fields = get_translation_fields(relation)
+
+        translation_model._base_manager.filter(**{relation.field.name: publish_obj}).delete()
+
+        translations = []
+        for values in data['translations'].get(rel_name, []):
+            translation = translation_model(**load_values(translation_fields, values))
+            setattr(translation, relation.field.name, publish_obj)
+            translations.append(translation)
+        translation_model._base_manager.bulk_create(translations)
+
+    model.clear_translations_cache([publish_obj])
+
+
+def restore_placeholders(publish_obj, draft_obj, data):
+    """
+    Replace all plugins in the placeholders of publish_obj with the plugins from the snapshot data.
+    The public object gets a new placeholder, if it shares the placeholder with the draft.
+    """
+    if not django_cms_exists:
+        return
+
+    model = publish_obj.__class__
+    for field_name in get_placeholder_fields(model):
+        placeholder = getattr(publish_obj, field_name)
+        if placeholder is None or placeholder.pk == getattr(draft_obj, "%s_id" % field_name):
+            field = model._meta.get_field(field_name)
+            placeholder = Placeholder.objects.create(slot=field._get_placeholder_slot(publish_obj))
+            model._base_manager.filter(pk=publish_obj.pk).update(**{field_name: placeholder})
+            setattr(publish_obj, field_name, placeholder)
+        else:
+            CMSPlugin._base_manager.filter(placeholder=placeholder).delete()
+
+        plugins = []
+        for plugin_data in data['placeholders'].get(field_name, []):
+            parent = None
+            if plugin_data['parent'] is not None:
+                parent = plugins[plugin_data['parent']]
+
+            plugin_model = plugin_pool.get_plugin(plugin_data['plugin_type']).model
+            values = load_values(get_plugin_fields(plugin_model), plugin_data['fields'])
+            plugins.append(add_plugin(
+                placeholder, plugin_data['plugin_type'], plugin_data['language'], target=parent, **values
+            ))
@@ -14,5 +14,23 @@
         }
       });
     });
+
+    // Poll the state of a background (un-)publish job, see: PublisherAdmin.job_status_view()
+    $('.publisher-job-status').each(function() {
+      var elem = $(this);
+      var poll = function() {
+        $.getJSON(elem.attr('data-status-url'), function(job) {
+          elem.find('.publisher-job-state').text(job.state_name);
+          if (job.state == 'done') {
+            window.location.reload();
+          } else if (job.state == 'failed') {
+            elem.find('.publisher-job-error').text(job.error);
+          } else {
+            setTimeout(poll, 2000);
+          }
+        });
+      };
+      setTimeout(poll, 2000);
+    });
   });
 })();
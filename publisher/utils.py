@@ -1,6 +1,10 @@
 
+import datetime
+import functools
 from pkgutil import find_loader
 
+from django.db import OperationalError, connections, transaction
+
 ##############################################################################
 # Some bools that indicate if python packages exists without to import them.
 # Needed for activate code parts depents on modul existing.
@@ -32,6 +36,75 @@ def assert_draft(method):
     return decorated
 
 
+class PublisherLockError(Exception):
+    """
+    The rows can't be locked, because another transaction holds the lock.
+    e.g.: Someone else publish the same draft at the same time.
+    """
+    pass
+
+
+def lock_queryset(queryset):
+    """
+    Evaluate the queryset with SELECT ... FOR UPDATE and returns the result as list.
+    The rows are locked until the end of the current transaction,
+    so it must be called inside transaction.atomic()
+
+    Wait max. settings.PUBLISHER_LOCK_TIMEOUT seconds for the lock,
+    raise PublisherLockError on timeout.
+    """
+    from publisher import app_settings # utils will be imported in settings
+    timeout = app_settings.PUBLISHER_LOCK_TIMEOUT
+    connection = connections[queryset.db]
+
+    nowait = timeout == 0 and connection.features.has_select_for_update_nowait
+    if timeout and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL lock_timeout = %s", ["%ims" % (timeout * 1000)])
+
+    try:
+        return list(queryset.select_for_update(nowait=nowait))
+    except OperationalError as err:
+        raise PublisherLockError("Can't lock %s: %s" % (queryset.model.__name__, err))
+
+
+def chunks(items, size):
+    """
+    Split the list items into lists with max. size items
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def floor_datetime(dt, granularity):
+    """
+    Round dt down to a multiple of granularity (seconds or timedelta).
+    Returns dt unchanged if granularity is None or 0.
+    """
+    if not granularity:
+        return dt
+    if isinstance(granularity, datetime.timedelta):
+        granularity = granularity.total_seconds()
+
+    epoch = datetime.datetime(1970, 1, 1, tzinfo=dt.tzinfo)
+    seconds = (dt - epoch).total_seconds()
+    return epoch + datetime.timedelta(seconds=seconds - seconds % granularity)
+
+
+def publisher_transaction(method):
+    """
+    Run the method of a draft in transaction.atomic()
+    and lock the draft row before, see: PublisherModelBase.lock_draft()
+    """
+    @functools.wraps(method)
+    def decorated(self, *args, **kwargs):
+        with transaction.atomic(using=self._state.db):
+            if self.pk is not None:
+                self.lock_draft()
+            return method(self, *args, **kwargs)
+    return decorated
+
+
 def edit_on_url(url):
     """
     Attach "?edit_on" to url, if django cms is installed.
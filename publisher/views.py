@@ -1,22 +1,165 @@
+import calendar
+import hashlib
 import logging
+import math
 
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import add_never_cache_headers, get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+from django.utils.translation import ugettext as _
 from django.views.generic import ListView
 from django.views.generic.detail import DetailView
 
+from publisher import app_settings
+
 log = logging.getLogger(__name__)
 
 
 class PublisherViewMixin:
 
+    # Max. seconds for "Cache-Control: max-age" (None -> settings.PUBLISHER_VIEW_MAX_AGE)
+    cache_max_age = None
+
+    # Answer conditional GET requests (ETag/Last-Modified) with "304 Not Modified".
+    # Opt in per view: The ETag covers only the publisher entries, not e.g.
+    # other content of the template or the CMS toolbar.
+    use_conditional_response = False
+
     class Meta:
         abstract = True
 
     def get_queryset(self):
         return self.model.objects.visible()
 
+    def use_cache_headers(self):
+        """
+        Overwrite this to disable "Cache-Control: max-age", ETag and Last-Modified
+        for the current request.
+        """
+        return True
+
+    def get_visibility_queryset(self):
+        """
+        The entries that can change the response by becoming visible or hidden:
+        the displayed object, or all entries in list views.
+        """
+        queryset = self.model.objects.all()
+        instance = getattr(self, "object", None)
+        if instance is not None:
+            queryset = queryset.filter(pk=instance.pk)
+        return queryset
+
+    def get_visibility_summary(self):
+        """
+        see: PublisherQuerySet.visible_summary()
+        """
+        if self._visibility_summary is None:
+            self._visibility_summary = self.get_visibility_queryset().visible_summary(now=self._now)
+        return self._visibility_summary
+
+    def get_cache_max_age(self):
+        max_age = self.cache_max_age
+        if max_age is None:
+            max_age = app_settings.PUBLISHER_VIEW_MAX_AGE
+        if not max_age:
+            return None
+
+        next_change = self.get_visibility_summary()["next_change"]
+        if next_change is not None:
+            seconds = int(math.ceil((next_change - self._now).total_seconds()))
+            if seconds < max_age:
+                max_age = seconds
+        return max_age
+
+    def get_etag(self):
+        summary = self.get_visibility_summary()
+        value = repr((
+            self.model._meta.label,
+            get_language(),
+            summary["last_modified"],
+            summary["count"],
+            summary["next_change"],
+        ))
+        return quote_etag(hashlib.md5(value.encode("utf-8")).hexdigest())
+
+    def get_last_modified(self):
+        """
+        Returns the Last-Modified datetime of the displayed object.
+        None in list views, because unpublished entries are not seen there.
+        """
+        instance = getattr(self, "object", None)
+        if instance is not None:
+            return instance.publisher_modified_at
+
+    def render_to_response(self, context, **response_kwargs):
+        """
+        Set ETag and Last-Modified and return "304 Not Modified" if the
+        client has the current version. The template will not be rendered then,
+        because TemplateResponse renders lazily.
+        """
+        response = super().render_to_response(context, **response_kwargs)
+
+        if not self.use_conditional_response or not self.use_cache_headers():
+            return response
+
+        etag = self.get_etag()
+        response["ETag"] = etag
+
+        last_modified = self.get_last_modified()
+        if last_modified is not None:
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+            response["Last-Modified"] = http_date(last_modified)
+
+        return get_conditional_response(self.request, etag=etag, last_modified=last_modified, response=response)
+
+    def dispatch(self, request, *args, **kwargs):
+        self._now = timezone.now()
+        self._visibility_summary = None
+
+        response = super().dispatch(request, *args, **kwargs)
+
+        if request.method in ("GET", "HEAD") and response.status_code in (200, 304):
+            if not self.use_cache_headers():
+                add_never_cache_headers(response)
+            else:
+                max_age = self.get_cache_max_age()
+                if max_age is not None:
+                    log.debug("Cache %s for %i sec.", request.path, max_age)
+                    patch_cache_control(response, max_age=max_age)
+
+        return response
+
 
 class PublisherDetailView(PublisherViewMixin, DetailView):
-    pass
+
+    # Get the object via PublisherQuerySet.get_visible_cached()
+    use_instance_cache = False
+
+    def get_object(self, queryset=None):
+        if queryset is not None or not self.use_instance_cache:
+            return super().get_object(queryset=queryset)
+
+        pk = self.kwargs.get(self.pk_url_kwarg)
+        slug = self.kwargs.get(self.slug_url_kwarg)
+        if pk is None and slug is None:
+            raise AttributeError(
+                "Generic detail view %s must be called with either an object pk or a slug." % self.__class__.__name__
+            )
+
+        lookup = {}
+        if pk is not None:
+            lookup["pk"] = pk
+        if slug is not None and (pk is None or self.query_pk_and_slug):
+            lookup[self.get_slug_field()] = slug
+
+        try:
+            return self.model.objects.get_visible_cached(**lookup)
+        except self.model.DoesNotExist:
+            raise Http404(_("No %(verbose_name)s found matching the query") % {
+                "verbose_name": self.model._meta.verbose_name
+            })
 
 
 class PublisherListView(PublisherViewMixin, ListView):
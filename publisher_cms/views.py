@@ -25,6 +25,12 @@ class PublisherCmsViewMixin(PublisherViewMixin):
             log.info("edit mode is on and User has change permission: List only 'drafts' items.")
             return self.model.objects.drafts()
 
+    def use_cache_headers(self):
+        # Never cache the edit mode or the toolbar of staff users:
+        if self.request.user.is_staff or self.model.edit_mode_and_change_permission(self.request):
+            return False
+        return super(PublisherCmsViewMixin, self).use_cache_headers()
+
 
 class PublisherCmsDetailView(PublisherCmsViewMixin, DetailView):
     # key and name of the "item" toolbar
@@ -143,7 +149,7 @@ class PublisherCmsDetailView(PublisherCmsViewMixin, DetailView):
             return
 
         log.debug("Current publisher instance has no open publishing requests.")
-        if publisher_instance.is_dirty:
+        if publisher_instance.get_publish_status("is_dirty"):
             if not can_publish:
                 log.debug("publisher instance is dirty, user can't publish: Add request publish button")
                 self._add_toolbar_button(
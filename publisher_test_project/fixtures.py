@@ -14,7 +14,7 @@ from django_tools.permissions import get_filtered_permissions, pformat_permissio
 from django_tools.unittest_utils.user import get_or_create_user_and_group
 
 from publisher import constants
-from publisher.models import PublisherStateModel
+from publisher.models import PublisherRelease, PublisherStateModel
 from publisher_test_project.constants import EDITOR_GROUP, EDITOR_USER, REPORTER_GROUP, REPORTER_USER
 from publisher_test_project.publisher_list_app.fixtures import list_item_fixtures
 from publisher_test_project.publisher_list_app.models import PublisherItem
@@ -109,6 +109,10 @@ def create_test_user(delete_first=False):
                 (PublisherStateModel, "add_publisherstatemodel"),
                 (PublisherStateModel, "delete_publisherstatemodel"),
 
+                (PublisherRelease, "add_publisherrelease"),
+                (PublisherRelease, "change_publisherrelease"),
+                (PublisherRelease, "delete_publisherrelease"),
+
                 (PublisherParlerAutoSlugifyTestModel, "can_publish_publisherparlerautoslugifytestmodel"),
                 (PublisherParlerAutoSlugifyTestModel, "delete_publisherparlerautoslugifytestmodel"),
 
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 18:48
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher_list_app', '0002_publisheritem_publisher_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisheritem',
+            name='publisher_visible',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+    ]
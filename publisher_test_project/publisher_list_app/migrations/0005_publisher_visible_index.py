@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 19:25
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher_list_app', '0004_publisheritem_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='publisheritem',
+            index_together=set([('publisher_is_draft', 'publisher_modified_at'), ('publisher_is_draft', 'publication_start_date', 'publication_end_date'), ('publisher_is_draft', 'publisher_visible')]),
+        ),
+    ]
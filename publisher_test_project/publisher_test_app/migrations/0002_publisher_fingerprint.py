@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 18:15
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher_test_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisherparlerautoslugifytestmodel',
+            name='publisher_fingerprint',
+            field=models.CharField(editable=False, max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='publisherparlertestmodel',
+            name='publisher_fingerprint',
+            field=models.CharField(editable=False, max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='publishertestmodel',
+            name='publisher_fingerprint',
+            field=models.CharField(editable=False, max_length=40, null=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 18:30
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import django_tools.permissions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher_test_app', '0002_publisher_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublisherRelationTestModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('publisher_is_draft', models.BooleanField(db_index=True, default=True, editable=False)),
+                ('publisher_modified_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('publisher_published_at', models.DateTimeField(editable=False, null=True)),
+                ('publisher_fingerprint', models.CharField(editable=False, max_length=40, null=True)),
+                ('publication_start_date', models.DateTimeField(blank=True, db_index=True, help_text='Published content will only be visible from this point in time. Leave blank if always visible.', null=True, verbose_name='publication start date')),
+                ('publication_end_date', models.DateTimeField(blank=True, db_index=True, help_text='When to expire the published version. Leave empty to never expire.', null=True, verbose_name='publication end date')),
+                ('title', models.CharField(max_length=100)),
+                ('links', models.ManyToManyField(blank=True, to='publisher_test_app.PublisherRelationTestModel')),
+                ('publisher_linked', models.OneToOneField(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='publisher_draft', to='publisher_test_app.PublisherRelationTestModel')),
+            ],
+            options={
+                'abstract': False,
+                'default_permissions': (),
+            },
+            bases=(django_tools.permissions.ModelPermissionMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='PublisherRelationTestNote',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=100)),
+                ('relation_test_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notes', to='publisher_test_app.PublisherRelationTestModel')),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 18:38
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher_test_app', '0003_publisher_relation_test_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisherrelationtestmodel',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='publisher_test_app.PublisherRelationTestModel'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 18:48
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher_test_app', '0004_publisher_relation_test_model_parent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisherparlerautoslugifytestmodel',
+            name='publisher_visible',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='publisherparlertestmodel',
+            name='publisher_visible',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='publisherrelationtestmodel',
+            name='publisher_visible',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='publishertestmodel',
+            name='publisher_visible',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 19:25
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher_test_app', '0007_publisher_relation_test_model_parent_cascade'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='publisherparlerautoslugifytestmodel',
+            index_together=set([('publisher_is_draft', 'publisher_modified_at'), ('publisher_is_draft', 'publication_start_date', 'publication_end_date'), ('publisher_is_draft', 'publisher_visible')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='publisherparlertestmodel',
+            index_together=set([('publisher_is_draft', 'publisher_modified_at'), ('publisher_is_draft', 'publication_start_date', 'publication_end_date'), ('publisher_is_draft', 'publisher_visible')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='publisherrelationtestmodel',
+            index_together=set([('publisher_is_draft', 'publisher_modified_at'), ('publisher_is_draft', 'publication_start_date', 'publication_end_date'), ('publisher_is_draft', 'publisher_visible')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='publishertestmodel',
+            index_together=set([('publisher_is_draft', 'publisher_modified_at'), ('publisher_is_draft', 'publication_start_date', 'publication_end_date'), ('publisher_is_draft', 'publisher_visible')]),
+        ),
+    ]
@@ -32,6 +32,33 @@ class PublisherTestModel(PublisherModel):
         )
 
 
+class PublisherRelationTestModel(PublisherModel):
+    """
+    Used to test 'publisher_clone_relations' and publish(with_dependencies=True)
+    """
+    title = models.CharField(max_length=100)
+    links = models.ManyToManyField("self", blank=True, symmetrical=False)
+    parent = models.ForeignKey("self", null=True, blank=True, related_name="children", on_delete=models.CASCADE)
+
+    objects = PublisherManager()
+
+    publisher_clone_relations = ("links", "notes")
+
+    def __str__(self):
+        return "<PublisherRelationTestModel pk:%r is_draft:%r title:%r>" % (self.pk, self.publisher_is_draft, self.title)
+
+    class Meta(PublisherModel.Meta):
+        default_permissions = () # Only used in unittests
+
+
+class PublisherRelationTestNote(models.Model):
+    relation_test_model = models.ForeignKey(PublisherRelationTestModel, related_name="notes")
+    text = models.CharField(max_length=100)
+
+    class Meta:
+        default_permissions = () # Only used in unittests
+
+
 class PlainTextPluginModel(CMSPlugin):
     text = models.TextField()
 
@@ -1,5 +1,6 @@
 
 import os
+from unittest import mock
 
 from django.core.management import call_command
 from django.test import TestCase
@@ -8,6 +9,7 @@ from django_tools.unittest_utils.django_command import DjangoCommandMixin
 from django_tools.unittest_utils.stdout_redirect import StdoutStderrBuffer
 
 import publisher_test_project
+from publisher_test_project.publisher_test_app.models import PublisherTestModel
 from publisher_tests.base import ClientBaseTestCase
 
 MANAGE_DIR = os.path.abspath(os.path.dirname(publisher_test_project.__file__))
@@ -60,6 +62,25 @@ class ManageCheckTests(TestCase):
         self.assertNotIn('ERROR', output)
 
 
+class PublisherIndexesCommandTests(TestCase):
+
+    def test_all_indexes_exist(self):
+        with StdoutStderrBuffer() as buff:
+            call_command('publisher_indexes')
+        self.assertIn('All publisher indexes exist.', buff.get_output())
+
+    def test_not_declared(self):
+        with mock.patch.object(PublisherTestModel._meta, 'index_together', ()):
+            with StdoutStderrBuffer() as buff:
+                call_command('publisher_indexes')
+        output = buff.get_output()
+        self.assertIn(
+            'publisher_test_app.PublisherTestModel: index publisher_is_draft, publisher_modified_at not declared',
+            output
+        )
+        self.assertNotIn('PublisherRelationTestModel', output)
+
+
 class PermissionTestCase(ClientBaseTestCase):
     def test_reporter_permissions(self):
         with StdoutStderrBuffer() as buff:
@@ -139,6 +160,9 @@ class PermissionTestCase(ClientBaseTestCase):
             [*] menus.add_cachekey
             [*] menus.change_cachekey
             [*] menus.delete_cachekey
+            [ ] publisher.add_publisherrelease
+            [ ] publisher.change_publisherrelease
+            [ ] publisher.delete_publisherrelease
             [ ] publisher.add_publisherstatemodel
             [*] publisher.change_publisherstatemodel
             [ ] publisher.delete_publisherstatemodel
@@ -250,6 +274,9 @@ class PermissionTestCase(ClientBaseTestCase):
             [*] menus.add_cachekey
             [*] menus.change_cachekey
             [*] menus.delete_cachekey
+            [*] publisher.add_publisherrelease
+            [*] publisher.change_publisherrelease
+            [*] publisher.delete_publisherrelease
             [ ] publisher.add_publisherstatemodel
             [*] publisher.change_publisherstatemodel
             [ ] publisher.delete_publisherstatemodel
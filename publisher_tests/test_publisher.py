@@ -2,13 +2,17 @@
 import datetime
 
 from django import test
+from django.db import OperationalError, connection, transaction
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from mock import MagicMock
+from mock import MagicMock, patch
 
-from publisher.signals import publisher_post_publish, publisher_post_unpublish
-from publisher.utils import NotDraftException
+from publisher import app_settings
+from publisher.signals import (publisher_post_bulk_publish, publisher_post_bulk_unpublish, publisher_post_publish,
+                               publisher_post_unpublish, publisher_pre_bulk_publish, publisher_pre_bulk_unpublish)
+from publisher.utils import NotDraftException, PublisherLockError, lock_queryset
 from publisher_test_project.publisher_test_app.models import PublisherTestModel
 
 
@@ -150,6 +154,30 @@ class PublisherTest(test.TestCase):
         revert_instance = instance.revert_to_public()
         self.assertEqual(title, revert_instance.title)
 
+    def test_revert_to_public_keeps_draft_pk(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        publish_obj = draft.publish()
+        draft_pk = draft.pk
+
+        draft.title = "two"
+        draft.publication_end_date = timezone.now()
+        draft.save()
+        self.assertTrue(draft.is_dirty)
+
+        draft.revert_to_public()
+        self.assertEqual(draft.pk, draft_pk)
+        self.assertEqual(draft.title, "one")
+        self.assertEqual(draft.publication_end_date, None)
+        self.assertFalse(draft.is_dirty)
+
+        draft = PublisherTestModel.objects.drafts().get()
+        self.assertEqual(draft.pk, draft_pk)
+        self.assertEqual(draft.title, "one")
+        self.assertEqual(draft.publisher_linked_id, publish_obj.pk)
+        self.assertFalse(draft.is_dirty)
+
+        self.assertEqual(PublisherTestModel.objects.published().get().pk, publish_obj.pk)
+
     def test_only_draft_records_can_be_published_or_reverted(self):
         draft = PublisherTestModel.objects.create(no=1, title='Test model')
         draft.publish()
@@ -159,70 +187,6 @@ class PublisherTest(test.TestCase):
         self.assertRaises(NotDraftException, published.unpublish)
         self.assertRaises(NotDraftException, published.revert_to_public)
 
-    def test_published_signal(self):
-        # Check the signal was sent. These get lost if they don't reference self.
-        self.got_signal = False
-        self.signal_sender = None
-        self.signal_instance = None
-
-        def handle_signal(sender, instance, **kwargs):
-            self.got_signal = True
-            self.signal_sender = sender
-            self.signal_instance = instance
-
-        publisher_post_publish.connect(handle_signal)
-
-        # call the function
-        instance = PublisherTestModel.objects.create(no=1, title='Test model')
-        instance.publish()
-
-        self.assertTrue(self.got_signal)
-        self.assertEqual(self.signal_sender, PublisherTestModel)
-        self.assertEqual(self.signal_instance, instance)
-
-    def test_unpublished_signal(self):
-        # Check the signal was sent. These get lost if they don't reference self.
-        self.got_signal = False
-        self.signal_sender = None
-        self.signal_instance = None
-
-        def handle_signal(sender, instance, **kwargs):
-            self.got_signal = True
-            self.signal_sender = sender
-            self.signal_instance = instance
-
-        publisher_post_unpublish.connect(handle_signal)
-
-        # Call the function.
-        instance = PublisherTestModel.objects.create(no=1, title='Test model')
-        instance.publish()
-        instance.unpublish()
-
-        self.assertTrue(self.got_signal)
-        self.assertEqual(self.signal_sender, PublisherTestModel)
-        self.assertEqual(self.signal_instance, instance)
-
-    def test_unpublished_signal_is_sent_when_deleting(self):
-        self.got_signal = False
-        self.signal_sender = None
-        self.signal_instance = None
-
-        def handle_signal(sender, instance, **kwargs):
-            self.got_signal = True
-            self.signal_sender = sender
-            self.signal_instance = instance
-
-        publisher_post_unpublish.connect(handle_signal)
-
-        # Call the function.
-        instance = PublisherTestModel.objects.create(no=1, title='Test model')
-        instance.publish()
-        instance.delete()
-
-        self.assertTrue(self.got_signal)
-        self.assertEqual(self.signal_sender, PublisherTestModel)
-        self.assertEqual(self.signal_instance, instance)
-
     def test_model_properties(self):
         draft_obj = PublisherTestModel.objects.create(no=1, title="one")
 
@@ -412,6 +376,54 @@ class PublisherTest(test.TestCase):
         self.assertEqual(obj.hidden_by_start_date, False)
         self.assertEqual(obj.is_visible, True)
 
+    def test_seconds_until_visibility_change(self):
+        now = timezone.now()
+        self.assertEqual(PublisherTestModel.objects.seconds_until_visibility_change(now=now), None)
+
+        instance = PublisherTestModel.objects.create(
+            no=1, title='one', publication_end_date=now + datetime.timedelta(seconds=90.5)
+        )
+        instance.publish()
+        instance = PublisherTestModel.objects.create(
+            no=2, title='two', publication_start_date=now + datetime.timedelta(seconds=30)
+        )
+        instance.publish()
+
+        with self.assertNumQueries(2):
+            self.assertEqual(PublisherTestModel.objects.seconds_until_visibility_change(now=now), 30)
+
+        queryset = PublisherTestModel.objects.filter(no=1)
+        self.assertEqual(queryset.seconds_until_visibility_change(now=now), 91)
+
+        with self.assertNumQueries(1):
+            summary = PublisherTestModel.objects.visible_summary(now=now)
+        self.assertEqual(summary, {
+            "last_modified": PublisherTestModel.objects.published().get(no=1).publisher_modified_at,
+            "count": 1,
+            "next_change": now + datetime.timedelta(seconds=30),
+        })
+
+    def test_visible_granularity(self):
+        now = timezone.now().replace(minute=10, second=1)
+        instance = PublisherTestModel.objects.create(no=1, title='Test model', publication_start_date=now)
+        instance.publish()
+
+        def get_query(now, **kwargs):
+            with patch.object(timezone, "now", return_value=now):
+                queryset = PublisherTestModel.objects.visible(**kwargs)
+                return str(queryset.query), queryset.count()
+
+        later = now + datetime.timedelta(seconds=30)
+        self.assertNotEqual(get_query(now)[0], get_query(later)[0])
+
+        # Same SQL in the same bucket:
+        query, count = get_query(now, granularity=60)
+        self.assertEqual(get_query(later, granularity=datetime.timedelta(minutes=1)), (query, count))
+
+        # 'now' is rounded down, so the entry is visible in the next bucket:
+        self.assertEqual(count, 0)
+        self.assertEqual(get_query(now + datetime.timedelta(minutes=1), granularity=60)[1], 1)
+
     def test_unique_together_direct(self):
         PublisherTestModel.objects.create(no=1, title="one")
 
@@ -430,3 +442,518 @@ class PublisherTest(test.TestCase):
         self.assertRaises(IntegrityError,
             two.publish
         )
+
+    def test_publish_in_place_keeps_public_pk(self):
+        with patch.object(PublisherTestModel, "publisher_update_in_place", True):
+            draft = PublisherTestModel.objects.create(no=1, title="one")
+            publish_obj = draft.publish()
+            public_pk = publish_obj.pk
+
+            draft.title = "two"
+            draft.save()
+            self.assertTrue(draft.is_dirty)
+
+            publish_obj = draft.publish()
+            self.assertEqual(publish_obj.pk, public_pk)
+            self.assertEqual(publish_obj.title, "two")
+            self.assertEqual(draft.publisher_linked_id, public_pk)
+            self.assertFalse(draft.is_dirty)
+
+        published = PublisherTestModel.objects.published().get()
+        self.assertEqual(published.pk, public_pk)
+        self.assertEqual(published.title, "two")
+        self.assertEqual(published.publisher_is_draft, False)
+        self.assertEqual(PublisherTestModel.objects.drafts().count(), 1)
+
+    def test_publish_in_place_uses_one_update(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        draft.title = "two"
+        draft.save()
+
+        with patch.object(PublisherTestModel, "publisher_update_in_place", True):
+            # SAVEPOINT + lock draft + UPDATE public row + save draft + RELEASE SAVEPOINT
+            with self.assertNumQueries(5):
+                draft.publish()
+
+    def test_bulk_publish(self):
+        for no in range(5):
+            PublisherTestModel.objects.create(no=no, title="draft %i" % no)
+
+        # The number of queries doesn't depend on the number of drafts:
+        with self.assertNumQueries(8):
+            count = PublisherTestModel.objects.all().publish()
+        self.assertEqual(count, 5)
+
+        self.assertEqual(PublisherTestModel.objects.drafts().count(), 5)
+        self.assertEqual(PublisherTestModel.objects.published().count(), 5)
+
+        for draft in PublisherTestModel.objects.drafts():
+            publish_obj = draft.get_public_object()
+            self.assertEqual(publish_obj.title, draft.title)
+            self.assertEqual(publish_obj.publisher_linked, None)
+            self.assertEqual(publish_obj.get_draft_object(), draft)
+            self.assertEqual(publish_obj.publisher_published_at, draft.publisher_published_at)
+            self.assertFalse(draft.is_dirty)
+
+    def test_bulk_republish(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        old_public_pk = draft.publisher_linked_id
+        published_at = draft.publisher_published_at
+
+        draft.title = "two"
+        draft.save()
+
+        PublisherTestModel.objects.filter(pk=draft.pk).publish()
+
+        draft = PublisherTestModel.objects.drafts().get()
+        self.assertNotEqual(draft.publisher_linked_id, old_public_pk)
+        self.assertEqual(draft.publisher_published_at, published_at)
+        self.assertEqual(draft.publisher_linked.title, "two")
+        self.assertEqual(PublisherTestModel.objects.published().count(), 1)
+
+    def test_bulk_publish_skips_clean_drafts(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft1.publish()
+        public_pk = draft1.publisher_linked_id
+        PublisherTestModel.objects.create(no=2, title="two")
+
+        self.assertEqual(PublisherTestModel.objects.all().publish(), 1)
+        self.assertEqual(PublisherTestModel.objects.drafts().get(no=1).publisher_linked_id, public_pk)
+        self.assertEqual(PublisherTestModel.objects.published().count(), 2)
+
+    def test_bulk_unpublish(self):
+        for no in range(3):
+            PublisherTestModel.objects.create(no=no, title="draft %i" % no).publish()
+
+        with self.assertNumQueries(8):
+            count = PublisherTestModel.objects.all().unpublish()
+        self.assertEqual(count, 3)
+
+        self.assertEqual(PublisherTestModel.objects.published().count(), 0)
+        for draft in PublisherTestModel.objects.drafts():
+            self.assertEqual(draft.publisher_linked, None)
+            self.assertEqual(draft.publisher_published_at, None)
+
+    def test_bulk_publish_not_on_manager(self):
+        self.assertFalse(hasattr(PublisherTestModel.objects, "publish"))
+        self.assertFalse(hasattr(PublisherTestModel.objects, "unpublish"))
+
+    def test_fingerprint_no_op_save_is_not_dirty(self):
+        with patch.object(PublisherTestModel, "publisher_track_fingerprint", True):
+            draft = PublisherTestModel.objects.create(no=1, title="one")
+            self.assertEqual(len(draft.publisher_fingerprint), 40)
+
+            publish_obj = draft.publish()
+            self.assertEqual(publish_obj.publisher_fingerprint, draft.publisher_fingerprint)
+            self.assertFalse(draft.is_dirty)
+
+            # Save without changes:
+            draft = PublisherTestModel.objects.drafts().get()
+            draft.save()
+            self.assertFalse(draft.is_dirty)
+
+            # publish will be skipped:
+            self.assertEqual(draft.publish(), draft)
+            self.assertEqual(PublisherTestModel.objects.published().get().pk, publish_obj.pk)
+
+            draft.title = "two"
+            draft.save()
+            self.assertTrue(draft.is_dirty)
+
+            # Change back to the published content:
+            draft.title = "one"
+            draft.save()
+            self.assertFalse(draft.is_dirty)
+
+            draft.publication_end_date = timezone.now()
+            draft.save()
+            self.assertTrue(draft.is_dirty)
+
+    def test_fingerprint_disabled(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        self.assertEqual(draft.publisher_fingerprint, None)
+
+        draft.save()
+        self.assertTrue(draft.is_dirty)
+
+    def test_track_changes(self):
+        with patch.object(PublisherTestModel, "publisher_track_changes", True):
+            draft = PublisherTestModel.objects.create(no=1, title="one")
+            draft.publish()
+
+            # Save without changes doesn't hit the database:
+            draft = PublisherTestModel.objects.drafts().get()
+            modified_at = draft.publisher_modified_at
+            with self.assertNumQueries(0):
+                draft.save()
+            self.assertEqual(draft.publisher_modified_at, modified_at)
+            self.assertFalse(draft.is_dirty)
+
+            # Only the changed fields will be saved:
+            draft.title = "two"
+            with CaptureQueriesContext(connection) as queries:
+                draft.save()
+            self.assertEqual(len(queries), 1)
+            sql = queries[0]["sql"]
+            self.assertIn('"title"', sql)
+            self.assertIn('"publisher_modified_at"', sql)
+            self.assertNotIn('"no"', sql)
+            self.assertGreater(draft.publisher_modified_at, modified_at)
+            self.assertTrue(draft.is_dirty)
+
+            self.assertEqual(PublisherTestModel.objects.drafts().get().title, "two")
+
+            # The saved values are the new reference:
+            with self.assertNumQueries(0):
+                draft.save()
+
+    def test_track_changes_refresh_from_db(self):
+        with patch.object(PublisherTestModel, "publisher_track_changes", True):
+            draft = PublisherTestModel.objects.create(no=1, title="one")
+            PublisherTestModel.objects.filter(pk=draft.pk).update(title="two")
+
+            draft = PublisherTestModel.objects.only("no").get(pk=draft.pk)
+            self.assertEqual(draft.title, "two") # deferred field loaded via refresh_from_db()
+            with self.assertNumQueries(0):
+                draft.save()
+
+            draft.refresh_from_db()
+            with self.assertNumQueries(0):
+                draft.save()
+
+    def _assert_publish_status(self, queryset):
+        names = ("is_dirty", "is_published", "is_visible", "hidden_by_start_date", "hidden_by_end_date")
+        with self.assertNumQueries(1):
+            annotated = list(queryset.with_publish_status().order_by("pk"))
+
+        for obj in annotated:
+            # Compare with the property values:
+            fresh_obj = queryset.model.objects.get(pk=obj.pk)
+            for name in names:
+                self.assertEqual(
+                    obj.get_publish_status(name), fresh_obj.get_publish_status(name),
+                    "%s %s" % (obj, name)
+                )
+
+    def test_with_publish_status(self):
+        now = timezone.now()
+        day = datetime.timedelta(days=1)
+
+        PublisherTestModel.objects.create(no=1, title="not published")
+
+        draft = PublisherTestModel.objects.create(no=2, title="published")
+        draft.publish()
+
+        draft = PublisherTestModel.objects.create(no=3, title="dirty")
+        draft.publish()
+        draft.title = "changed"
+        draft.save()
+
+        draft = PublisherTestModel.objects.create(no=4, title="start", publication_start_date=now + day)
+        draft.publish()
+
+        draft = PublisherTestModel.objects.create(no=5, title="end", publication_end_date=now - day)
+        draft.publish()
+
+        self._assert_publish_status(PublisherTestModel.objects.all())
+
+        status = dict(
+            (obj.no, obj)
+            for obj in PublisherTestModel.objects.drafts().with_publish_status()
+        )
+        self.assertTrue(status[1].publisher_status_is_dirty)
+        self.assertFalse(status[1].publisher_status_is_published)
+        self.assertFalse(status[2].publisher_status_is_dirty)
+        self.assertTrue(status[2].publisher_status_is_visible)
+        self.assertTrue(status[3].publisher_status_is_dirty)
+        self.assertTrue(status[4].publisher_status_hidden_by_start_date)
+        self.assertFalse(status[4].publisher_status_is_visible)
+        self.assertTrue(status[5].publisher_status_hidden_by_end_date)
+        self.assertFalse(status[5].publisher_status_is_visible)
+
+    def test_with_publish_status_fingerprint(self):
+        with patch.object(PublisherTestModel, "publisher_track_fingerprint", True):
+            draft1 = PublisherTestModel.objects.create(no=1, title="one")
+            draft1.publish()
+            draft1.save() # no changes
+
+            draft2 = PublisherTestModel.objects.create(no=2, title="two")
+            draft2.publish()
+            draft2.title = "changed"
+            draft2.save()
+
+            self._assert_publish_status(PublisherTestModel.objects.all())
+
+            status = dict(
+                PublisherTestModel.objects.drafts().with_publish_status().values_list(
+                    "no", "publisher_status_is_dirty"
+                )
+            )
+            self.assertEqual(status, {1: False, 2: True})
+
+    def test_publish_with_stale_instance(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+
+        # Two editors load the same draft:
+        draft1 = PublisherTestModel.objects.get(pk=draft.pk)
+        draft2 = PublisherTestModel.objects.get(pk=draft.pk)
+
+        publish_obj = draft1.publish()
+
+        # The locked row says: draft2 is already published and not dirty:
+        self.assertEqual(draft2.publish(), draft2)
+        self.assertEqual(draft2.publisher_linked_id, publish_obj.pk)
+
+        self.assertEqual(PublisherTestModel.objects.published().get().pk, publish_obj.pk)
+
+        draft1.unpublish()
+        draft2.unpublish() # the public version is already deleted
+        self.assertEqual(draft2.publisher_linked_id, None)
+        self.assertEqual(PublisherTestModel.objects.published().count(), 0)
+
+    def test_lock_queryset(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        queryset = PublisherTestModel.objects.filter(pk=draft.pk)
+
+        with transaction.atomic():
+            self.assertEqual(lock_queryset(queryset), [draft])
+
+        def raise_error(*args, **kwargs):
+            raise OperationalError("could not obtain lock")
+
+        with patch.object(PublisherTestModel.objects.none().__class__, "select_for_update", raise_error):
+            with transaction.atomic():
+                with self.assertRaises(PublisherLockError):
+                    lock_queryset(queryset)
+
+
+# TransactionTestCase: The post (bulk) signals are sent on commit
+class PublisherSignalTest(test.TransactionTestCase):
+
+    def test_published_signal(self):
+        # Check the signal was sent. These get lost if they don't reference self.
+        self.got_signal = False
+        self.signal_sender = None
+        self.signal_instance = None
+
+        def handle_signal(sender, instance, **kwargs):
+            self.got_signal = True
+            self.signal_sender = sender
+            self.signal_instance = instance
+
+        publisher_post_publish.connect(handle_signal)
+
+        # call the function
+        instance = PublisherTestModel.objects.create(no=1, title='Test model')
+        instance.publish()
+
+        self.assertTrue(self.got_signal)
+        self.assertEqual(self.signal_sender, PublisherTestModel)
+        self.assertEqual(self.signal_instance, instance)
+
+    def test_unpublished_signal(self):
+        # Check the signal was sent. These get lost if they don't reference self.
+        self.got_signal = False
+        self.signal_sender = None
+        self.signal_instance = None
+
+        def handle_signal(sender, instance, **kwargs):
+            self.got_signal = True
+            self.signal_sender = sender
+            self.signal_instance = instance
+
+        publisher_post_unpublish.connect(handle_signal)
+
+        # Call the function.
+        instance = PublisherTestModel.objects.create(no=1, title='Test model')
+        instance.publish()
+        instance.unpublish()
+
+        self.assertTrue(self.got_signal)
+        self.assertEqual(self.signal_sender, PublisherTestModel)
+        self.assertEqual(self.signal_instance, instance)
+
+    def test_unpublished_signal_is_sent_when_deleting(self):
+        self.got_signal = False
+        self.signal_sender = None
+        self.signal_instance = None
+
+        def handle_signal(sender, instance, **kwargs):
+            self.got_signal = True
+            self.signal_sender = sender
+            self.signal_instance = instance
+
+        publisher_post_unpublish.connect(handle_signal)
+
+        # Call the function.
+        instance = PublisherTestModel.objects.create(no=1, title='Test model')
+        instance.publish()
+        instance.delete()
+
+        self.assertTrue(self.got_signal)
+        self.assertEqual(self.signal_sender, PublisherTestModel)
+        self.assertEqual(self.signal_instance, instance)
+
+    def test_published_signal_rollback(self):
+        handler = MagicMock()
+        publisher_post_publish.connect(handler)
+        try:
+            instance = PublisherTestModel.objects.create(no=1, title="one")
+            with self.assertRaises(IntegrityError):
+                with transaction.atomic():
+                    instance.publish()
+                    self.assertEqual(handler.call_count, 0)
+                    raise IntegrityError("rollback")
+        finally:
+            publisher_post_publish.disconnect(handler)
+
+        self.assertEqual(handler.call_count, 0)
+        self.assertEqual(PublisherTestModel.objects.published().count(), 0)
+
+    def test_bulk_publish_in_place(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        public_pk = draft.publisher_linked_id
+
+        draft.title = "two"
+        draft.save()
+
+        handler = MagicMock()
+        publisher_post_publish.connect(handler)
+        try:
+            with patch.object(PublisherTestModel, "publisher_update_in_place", True):
+                self.assertEqual(PublisherTestModel.objects.all().publish(), 1)
+        finally:
+            publisher_post_publish.disconnect(handler)
+
+        self.assertEqual(handler.call_count, 1)
+        publish_obj = PublisherTestModel.objects.published().get()
+        self.assertEqual(publish_obj.pk, public_pk)
+        self.assertEqual(publish_obj.title, "two")
+
+    def test_bulk_signals_in_place(self):
+        received = []
+
+        def handler(signal, sender, pks, **kwargs):
+            received.append((signal, sorted(pks)))
+
+        signals = (publisher_pre_bulk_publish, publisher_post_bulk_publish)
+        for signal in signals:
+            signal.connect(handler)
+        try:
+            pks = [PublisherTestModel.objects.create(no=no, title="no %i" % no).pk for no in range(3)]
+
+            with patch.object(PublisherTestModel, "publisher_update_in_place", True):
+                with transaction.atomic():
+                    self.assertEqual(PublisherTestModel.objects.all().publish(batch_size=2), 3)
+                    # The post signals are sent on commit:
+                    self.assertEqual(received, [
+                        (publisher_pre_bulk_publish, pks[0:2]),
+                        (publisher_pre_bulk_publish, pks[2:]),
+                    ])
+        finally:
+            for signal in signals:
+                signal.disconnect(handler)
+
+        self.assertEqual(received, [
+            (publisher_pre_bulk_publish, pks[0:2]),
+            (publisher_pre_bulk_publish, pks[2:]),
+            (publisher_post_bulk_publish, pks[0:2]),
+            (publisher_post_bulk_publish, pks[2:]),
+        ])
+
+    def test_bulk_signals(self):
+        publish_handler = MagicMock()
+        unpublish_handler = MagicMock()
+        publisher_post_bulk_publish.connect(publish_handler)
+        publisher_post_bulk_unpublish.connect(unpublish_handler)
+        try:
+            draft1 = PublisherTestModel.objects.create(no=1, title="one")
+            draft2 = PublisherTestModel.objects.create(no=2, title="two")
+
+            PublisherTestModel.objects.all().publish()
+            self.assertEqual(publish_handler.call_count, 1)
+            kwargs = publish_handler.call_args[1]
+            self.assertEqual(kwargs["sender"], PublisherTestModel)
+            self.assertEqual(sorted(kwargs["pks"]), [draft1.pk, draft2.pk])
+
+            PublisherTestModel.objects.all().unpublish()
+            self.assertEqual(unpublish_handler.call_count, 1)
+            kwargs = unpublish_handler.call_args[1]
+            self.assertEqual(sorted(kwargs["pks"]), [draft1.pk, draft2.pk])
+        finally:
+            publisher_post_bulk_publish.disconnect(publish_handler)
+            publisher_post_bulk_unpublish.disconnect(unpublish_handler)
+
+    def test_bulk_signals_batches(self):
+        received = []
+
+        def handler(signal, sender, pks, **kwargs):
+            received.append((signal, sorted(pks)))
+
+        signals = (
+            publisher_pre_bulk_publish, publisher_post_bulk_publish,
+            publisher_pre_bulk_unpublish, publisher_post_bulk_unpublish,
+        )
+        for signal in signals:
+            signal.connect(handler)
+        try:
+            pks = [PublisherTestModel.objects.create(no=no, title="no %i" % no).pk for no in range(5)]
+
+            count = PublisherTestModel.objects.all().publish(batch_size=2)
+            self.assertEqual(count, 5)
+            self.assertEqual(PublisherTestModel.objects.published().count(), 5)
+            self.assertEqual(received, [
+                (publisher_pre_bulk_publish, pks[0:2]),
+                (publisher_pre_bulk_publish, pks[2:4]),
+                (publisher_pre_bulk_publish, pks[4:]),
+                (publisher_post_bulk_publish, pks[0:2]),
+                (publisher_post_bulk_publish, pks[2:4]),
+                (publisher_post_bulk_publish, pks[4:]),
+            ])
+
+            received.clear()
+            with patch.object(app_settings, "PUBLISHER_BULK_BATCH_SIZE", 3):
+                count = PublisherTestModel.objects.all().unpublish()
+            self.assertEqual(count, 5)
+            self.assertEqual(PublisherTestModel.objects.published().count(), 0)
+            self.assertEqual(received, [
+                (publisher_pre_bulk_unpublish, pks[0:3]),
+                (publisher_pre_bulk_unpublish, pks[3:]),
+                (publisher_post_bulk_unpublish, pks[0:3]),
+                (publisher_post_bulk_unpublish, pks[3:]),
+            ])
+        finally:
+            for signal in signals:
+                signal.disconnect(handler)
+
+    def test_bulk_signals_rollback(self):
+        handler = MagicMock()
+        publisher_post_bulk_publish.connect(handler)
+        try:
+            PublisherTestModel.objects.create(no=1, title="one")
+            with self.assertRaises(IntegrityError):
+                with transaction.atomic():
+                    PublisherTestModel.objects.all().publish()
+                    raise IntegrityError("rollback")
+        finally:
+            publisher_post_bulk_publish.disconnect(handler)
+
+        self.assertEqual(handler.call_count, 0)
+        self.assertEqual(PublisherTestModel.objects.published().count(), 0)
+
+    def test_bulk_signals_on_commit(self):
+        handler = MagicMock()
+        publisher_post_bulk_publish.connect(handler)
+        try:
+            PublisherTestModel.objects.create(no=1, title="one")
+            with transaction.atomic():
+                PublisherTestModel.objects.all().publish()
+                self.assertEqual(handler.call_count, 0)
+        finally:
+            publisher_post_bulk_publish.disconnect(handler)
+
+        self.assertEqual(handler.call_count, 1)
@@ -8,6 +8,7 @@ import django
 import mock
 
 from publisher.models import PublisherStateModel
+from publisher.utils import PublisherLockError
 from publisher_test_project.publisher_test_app.models import PublisherTestModel
 from publisher_tests.base import ClientBaseTestCase
 
@@ -93,3 +94,21 @@ class AdminLoggedinTests(ClientBaseTestCase):
         self.assertMessages(response,
             ["You can't edit this, because a publish request is pending!"]
         )
+
+    def test_publish_view_locked(self):
+        draft = PublisherTestModel.objects.create(no=1, title="foobar")
+        published_count = PublisherTestModel.objects.published().count()
+
+        self.login_superuser()
+        url = "/en/admin/publisher_test_app/publishertestmodel/%s/publish/" % draft.pk
+
+        with mock.patch.object(PublisherTestModel, "lock_draft", side_effect=PublisherLockError("locked")):
+            response = self.client.get(url, HTTP_ACCEPT_LANGUAGE='en')
+
+        self.assertRedirects(response,
+            expected_url="/en/admin/publisher_test_app/publishertestmodel/"
+        )
+        self.assertMessages(response,
+            ["Someone else is publishing this entry at the moment. Please try again."]
+        )
+        self.assertEqual(PublisherTestModel.objects.published().count(), published_count)
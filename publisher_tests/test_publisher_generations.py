@@ -0,0 +1,248 @@
+"""
+    Publish generation counters for versioned cache keys,
+    the cached PublisherQuerySet.visible() and the cached public instances
+"""
+
+import datetime
+from unittest import mock
+
+from django import test
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from publisher import app_settings, generations, scheduler
+from publisher.views import PublisherDetailView
+from publisher_test_project.publisher_test_app.models import PublisherParlerTestModel, PublisherTestModel
+
+
+# TransactionTestCase: The generations are incremented on commit
+class PublisherGenerationTest(test.TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_publish(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+
+        with self.assertNumQueries(0):
+            generation = PublisherTestModel.objects.publish_generation()
+            generation1 = PublisherTestModel.objects.publish_generation(pk=draft1.pk)
+            generation2 = PublisherTestModel.objects.publish_generation(pk=draft2.pk)
+
+        # Stable without (un-)publish:
+        self.assertEqual(PublisherTestModel.objects.publish_generation(), generation)
+        self.assertEqual(PublisherTestModel.objects.publish_generation(pk=draft1.pk), generation1)
+
+        draft1.publish()
+
+        self.assertGreater(PublisherTestModel.objects.publish_generation(), generation)
+        self.assertNotEqual(PublisherTestModel.objects.publish_generation(pk=draft1.pk), generation1)
+        self.assertEqual(PublisherTestModel.objects.publish_generation(pk=draft2.pk), generation2)
+
+        generation = PublisherTestModel.objects.publish_generation()
+        generation1 = PublisherTestModel.objects.publish_generation(pk=draft1.pk)
+        draft1.unpublish()
+        self.assertGreater(PublisherTestModel.objects.publish_generation(), generation)
+        self.assertNotEqual(PublisherTestModel.objects.publish_generation(pk=draft1.pk), generation1)
+
+    def test_rolled_back(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        generation = PublisherTestModel.objects.publish_generation()
+
+        try:
+            with transaction.atomic():
+                draft.publish()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(PublisherTestModel.objects.publish_generation(), generation)
+
+    def test_bulk_publish(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+        generation = PublisherTestModel.objects.publish_generation()
+        generation1 = PublisherTestModel.objects.publish_generation(pk=draft1.pk)
+        generation2 = PublisherTestModel.objects.publish_generation(pk=draft2.pk)
+
+        PublisherTestModel.objects.filter(pk=draft1.pk).publish()
+
+        self.assertGreater(PublisherTestModel.objects.publish_generation(), generation)
+        self.assertNotEqual(PublisherTestModel.objects.publish_generation(pk=draft1.pk), generation1)
+        self.assertEqual(PublisherTestModel.objects.publish_generation(pk=draft2.pk), generation2)
+
+        generation = PublisherTestModel.objects.publish_generation()
+        PublisherTestModel.objects.all().unpublish()
+        self.assertGreater(PublisherTestModel.objects.publish_generation(), generation)
+
+    def test_scheduler(self):
+        now = timezone.now()
+        draft = PublisherTestModel.objects.create(
+            no=1, title="one", publication_start_date=now + datetime.timedelta(minutes=1),
+        )
+        draft.publish()
+        generation = PublisherTestModel.objects.publish_generation()
+        generation1 = PublisherTestModel.objects.publish_generation(pk=draft.pk)
+
+        scheduler.send_transitions(now, now + datetime.timedelta(minutes=2), models=[PublisherTestModel])
+
+        self.assertGreater(PublisherTestModel.objects.publish_generation(), generation)
+        self.assertNotEqual(PublisherTestModel.objects.publish_generation(pk=draft.pk), generation1)
+
+
+class PublisherCachedVisibleTest(test.TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cached_visible(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft1.publish()
+        PublisherTestModel.objects.create(no=2, title="two")
+
+        queryset = PublisherTestModel.objects.cached_visible()
+        self.assertEqual(list(queryset.values_list("title", flat=True)), ["one"])
+
+        # The pks are taken from the cache:
+        with self.assertNumQueries(0):
+            PublisherTestModel.objects.cached_visible()
+
+        # The database is not part of the cache key (e.g.: a random read replica):
+        with self.assertNumQueries(0):
+            queryset = PublisherTestModel.objects.using("replica").cached_visible()
+        self.assertEqual(queryset.db, "replica")
+
+        # Invalidated by publish:
+        PublisherTestModel.objects.drafts().get(title="two").publish()
+        queryset = PublisherTestModel.objects.cached_visible()
+        self.assertEqual(sorted(queryset.values_list("title", flat=True)), ["one", "two"])
+
+        # Filters are part of the cache key:
+        queryset = PublisherTestModel.objects.filter(no=2).cached_visible()
+        self.assertEqual(list(queryset.values_list("title", flat=True)), ["two"])
+
+    def test_timeout(self):
+        now = timezone.now().replace(minute=10, second=1, microsecond=0)
+        draft = PublisherTestModel.objects.create(
+            no=1, title="one", publication_end_date=now + datetime.timedelta(seconds=90),
+        )
+        draft.publish()
+
+        with mock.patch.object(timezone, "now", return_value=now):
+            with mock.patch.object(generations.get_cache(), "set") as cache_set:
+                PublisherTestModel.objects.cached_visible(granularity=60)
+                # The end of the bucket:
+                self.assertEqual(cache_set.call_args[0][2], 59)
+
+                PublisherTestModel.objects.cached_visible(granularity=3600)
+                # The next visibility change:
+                self.assertEqual(cache_set.call_args[0][2], 90)
+
+
+class PublisherInstanceCacheTest(test.TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_cached(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+
+        instance = PublisherTestModel.objects.get_cached(no=1)
+        self.assertEqual(instance.title, "one")
+        self.assertFalse(instance.publisher_is_draft)
+
+        with self.assertNumQueries(0):
+            instance = PublisherTestModel.objects.get_cached(no=1)
+        self.assertEqual(instance.title, "one")
+
+        # Invalidated by publish:
+        draft.title = "two"
+        draft.save()
+        draft.publish()
+        self.assertEqual(PublisherTestModel.objects.get_cached(no=1).title, "two")
+
+        # Invalidated by unpublish:
+        draft.unpublish()
+        with self.assertRaises(PublisherTestModel.DoesNotExist):
+            PublisherTestModel.objects.get_cached(no=1)
+
+    def test_other_objects_stay_cached(self):
+        PublisherTestModel.objects.create(no=1, title="one").publish()
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+        draft2.publish()
+
+        PublisherTestModel.objects.get_cached(no=1)
+        draft2.publish()
+        with self.assertNumQueries(0):
+            PublisherTestModel.objects.get_cached(no=1)
+
+    def test_get_visible_cached(self):
+        now = timezone.now()
+        draft = PublisherTestModel.objects.create(
+            no=1, title="one", publication_start_date=now + datetime.timedelta(minutes=1),
+        )
+        draft.publish()
+
+        with self.assertRaises(PublisherTestModel.DoesNotExist):
+            PublisherTestModel.objects.get_visible_cached(no=1)
+
+        # The cached instance expires on publication_start_date:
+        with mock.patch.object(generations.get_cache(), "set") as cache_set:
+            with mock.patch.object(timezone, "now", return_value=now):
+                cache.clear()
+                PublisherTestModel.objects.get_cached(no=1)
+            self.assertEqual(cache_set.call_args[0][2], 60)
+
+        with mock.patch.object(timezone, "now", return_value=now + datetime.timedelta(minutes=2)):
+            self.assertEqual(PublisherTestModel.objects.get_visible_cached(no=1).title, "one")
+
+    def test_max_size(self):
+        PublisherTestModel.objects.create(no=1, title="one").publish()
+        with mock.patch.object(app_settings, "PUBLISHER_INSTANCE_CACHE_MAX_SIZE", 10):
+            PublisherTestModel.objects.get_cached(no=1)
+            with self.assertNumQueries(1):
+                PublisherTestModel.objects.get_cached(no=1)
+
+    def test_translations(self):
+        draft = PublisherParlerTestModel.objects.language("en").create(title="english")
+        draft.set_current_language("de")
+        draft.title = "deutsch"
+        draft.save()
+        draft.publish()
+        public_pk = PublisherParlerTestModel.objects.published().get().pk
+
+        PublisherParlerTestModel.objects.get_cached(pk=public_pk)
+        with self.assertNumQueries(0):
+            instance = PublisherParlerTestModel.objects.get_cached(pk=public_pk)
+            self.assertEqual(instance.safe_translation_getter("title", language_code="en"), "english")
+            self.assertEqual(instance.safe_translation_getter("title", language_code="de"), "deutsch")
+
+    def test_detail_view(self):
+        class DetailView(PublisherDetailView):
+            model = PublisherTestModel
+            use_instance_cache = True
+
+            def render_to_response(self, context, **response_kwargs):
+                return HttpResponse(context["object"].title)
+
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        public_pk = draft.publish().pk
+
+        request = RequestFactory().get("/")
+        self.assertEqual(DetailView.as_view()(request, pk=public_pk).content, b"one")
+        with self.assertNumQueries(0):
+            self.assertEqual(DetailView.as_view()(request, pk=public_pk).content, b"one")
+
+        with self.assertRaises(Http404):
+            DetailView.as_view()(request, pk=draft.pk)
@@ -0,0 +1,172 @@
+"""
+    Background (un-)publish via PublisherJob
+"""
+
+import datetime
+import json
+from unittest import mock
+
+from django import test
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from publisher import app_settings, constants
+from publisher.models import PublisherJob
+from publisher.utils import PublisherLockError
+from publisher_test_project.publisher_test_app.models import PublisherTestModel
+from publisher_tests.base import ClientBaseTestCase
+
+
+class PublisherJobTest(test.TestCase):
+
+    def test_enqueue_claim_run(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        job = PublisherJob.objects.enqueue_publish(draft)
+        self.assertEqual(job.state, constants.JOB_STATE_PENDING)
+        self.assertEqual(PublisherTestModel.objects.published().count(), 0)
+
+        claimed = PublisherJob.objects.claim()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.state, constants.JOB_STATE_RUNNING)
+
+        # Can't be claimed twice:
+        self.assertEqual(PublisherJob.objects.claim(), None)
+
+        claimed.run()
+        job.refresh_from_db()
+        self.assertEqual(job.state, constants.JOB_STATE_DONE)
+        self.assertNotEqual(job.finished_at, None)
+        self.assertEqual(PublisherTestModel.objects.published().count(), 1)
+
+    def test_worker_command(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+        draft2.publish()
+
+        PublisherJob.objects.enqueue_publish(draft1)
+        PublisherJob.objects.enqueue_unpublish(draft2)
+
+        out = StringIO()
+        call_command("publisher_worker", "--once", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "2 jobs executed.")
+
+        self.assertEqual(
+            list(PublisherTestModel.objects.published().values_list("no", flat=True)),
+            [1]
+        )
+        self.assertEqual(PublisherJob.objects.pending().count(), 0)
+
+    def test_failed_job(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        job = PublisherJob.objects.enqueue_publish(draft)
+        draft.delete()
+
+        PublisherJob.objects.claim().run()
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, constants.JOB_STATE_FAILED)
+        self.assertEqual(job.error, "ObjectDoesNotExist: Publisher instance was deleted!")
+
+    @mock.patch.object(app_settings, "PUBLISHER_JOB_RETRY_DELAY", 5)
+    @mock.patch.object(app_settings, "PUBLISHER_JOB_MAX_ATTEMPTS", 3)
+    def test_locked_job_retry(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        job = PublisherJob.objects.enqueue_publish(draft)
+        now = timezone.now()
+
+        with mock.patch.object(PublisherTestModel, "publish", side_effect=PublisherLockError("locked")):
+            for attempt, delay in ((1, 5), (2, 10)):
+                with mock.patch.object(timezone, "now", return_value=now):
+                    claimed = PublisherJob.objects.claim()
+                    self.assertEqual(claimed.pk, job.pk)
+                    claimed.run()
+
+                job.refresh_from_db()
+                self.assertEqual(job.state, constants.JOB_STATE_PENDING)
+                self.assertEqual(job.attempts, attempt)
+                self.assertEqual(job.retry_after, now + datetime.timedelta(seconds=delay))
+
+                # Not claimed before 'retry_after':
+                with mock.patch.object(timezone, "now", return_value=job.retry_after - datetime.timedelta(seconds=1)):
+                    self.assertEqual(PublisherJob.objects.claim(), None)
+                now = job.retry_after
+
+            # Fails after the last attempt:
+            with mock.patch.object(timezone, "now", return_value=now):
+                PublisherJob.objects.claim().run()
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, constants.JOB_STATE_FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertEqual(job.error, "PublisherLockError: locked")
+
+    @mock.patch.object(app_settings, "PUBLISHER_JOB_STALE_TIMEOUT", 60)
+    def test_reclaim_stale_job(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        job = PublisherJob.objects.enqueue_publish(draft)
+        claimed = PublisherJob.objects.claim()
+
+        # The worker was killed:
+        self.assertEqual(PublisherJob.objects.claim(), None)
+
+        later = claimed.started_at + datetime.timedelta(seconds=61)
+        with mock.patch.object(timezone, "now", return_value=later):
+            reclaimed = PublisherJob.objects.claim()
+        self.assertEqual(reclaimed.pk, job.pk)
+        self.assertEqual(reclaimed.attempts, 2)
+        self.assertEqual(reclaimed.started_at, later)
+
+        reclaimed.run()
+        job.refresh_from_db()
+        self.assertEqual(job.state, constants.JOB_STATE_DONE)
+
+
+@mock.patch.object(app_settings, "PUBLISHER_BACKGROUND_PUBLISH", True)
+class PublisherJobAdminTest(ClientBaseTestCase):
+
+    def test_publish_view_enqueue(self):
+        draft = PublisherTestModel.objects.create(no=1, title="foobar")
+        published_count = PublisherTestModel.objects.published().count()
+
+        self.login_superuser()
+        response = self.client.get(
+            "/en/admin/publisher_test_app/publishertestmodel/%s/publish/" % draft.pk,
+            HTTP_ACCEPT_LANGUAGE="en",
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        data = json.loads(response.content.decode("utf-8"))
+        self.assertTrue(data["success"])
+        self.assertEqual(data["job"]["state"], constants.JOB_STATE_PENDING)
+
+        # Not published, yet:
+        self.assertEqual(PublisherTestModel.objects.published().count(), published_count)
+
+        PublisherJob.objects.claim().run()
+        self.assertEqual(PublisherTestModel.objects.published().count(), published_count + 1)
+
+        response = self.client.get(data["status_url"], HTTP_ACCEPT_LANGUAGE="en")
+        data = json.loads(response.content.decode("utf-8"))
+        self.assertEqual(data["state"], constants.JOB_STATE_DONE)
+
+    def test_change_view_job_status(self):
+        draft = PublisherTestModel.objects.create(no=1, title="foobar")
+        job = PublisherJob.objects.enqueue_publish(draft)
+
+        self.login_superuser()
+        url = "/en/admin/publisher_test_app/publishertestmodel/%s/change/" % draft.pk
+        status_url = "/en/admin/publisher_test_app/publishertestmodel/job/%s/" % job.pk
+
+        response = self.client.get(url, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertContains(response, 'data-status-url="%s"' % status_url)
+        self.assertContains(response, "publisher/publisher.js")
+
+        response = self.client.get(status_url, HTTP_ACCEPT_LANGUAGE="en")
+        data = json.loads(response.content.decode("utf-8"))
+        self.assertEqual(data["state_name"], "pending")
+
+        PublisherJob.objects.claim().run()
+
+        # Finished jobs are not polled:
+        response = self.client.get(url, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertNotContains(response, "data-status-url")
@@ -12,8 +12,10 @@ from django.test.utils import override_settings
 
 from cms.models import Page
 
+from publisher import app_settings
 from publisher.models import PublisherStateModel
 from publisher_test_project.publisher_list_app.models import PublisherItem
+from publisher_test_project.publisher_list_app.views import PublisherItemDetailView, PublisherItemListView
 from publisher_tests.base import ClientBaseTestCase
 
 
@@ -176,6 +178,68 @@ class PublisherItemAppTestCase(ClientBaseTestCase):
             html=False,
         )
 
+    def test_anonymous_cache_control(self):
+        response = self.client.get(self.published_item_url, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertFalse(response.has_header("Cache-Control"))
+
+        with mock.patch.object(app_settings, "PUBLISHER_VIEW_MAX_AGE", 3600):
+            response = self.client.get(self.published_item_url, HTTP_ACCEPT_LANGUAGE="en")
+            self.assertEqual(response["Cache-Control"], "max-age=3600")
+
+        # The 'hidden by start date' item becomes visible in one day:
+        with mock.patch.object(app_settings, "PUBLISHER_VIEW_MAX_AGE", 7 * 24 * 60 * 60):
+            response = self.client.get(self.list_page_url, HTTP_ACCEPT_LANGUAGE="en")
+            max_age = int(response["Cache-Control"].split("=")[1])
+            self.assertGreater(max_age, 23 * 60 * 60)
+            self.assertLessEqual(max_age, 24 * 60 * 60)
+
+    def test_anonymous_no_conditional_response(self):
+        response = self.client.get(self.list_page_url, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+        response = self.client.get(self.published_item_url, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertFalse(response.has_header("Last-Modified"))
+
+    @mock.patch.object(PublisherItemListView, "use_conditional_response", True)
+    def test_anonymous_conditional_list(self):
+        response = self.client.get(self.list_page_url, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        response = self.client.get(self.list_page_url, HTTP_ACCEPT_LANGUAGE="en", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        # A new published entry changes the ETag:
+        PublisherItem.objects.filter(pk=self.not_published_item.pk).publish()
+        response = self.client.get(self.list_page_url, HTTP_ACCEPT_LANGUAGE="en", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @mock.patch.object(PublisherItemDetailView, "use_conditional_response", True)
+    def test_anonymous_conditional_detail(self):
+        response = self.client.get(self.published_item_url, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertEqual(response.status_code, 200)
+        last_modified = response["Last-Modified"]
+
+        response = self.client.get(
+            self.published_item_url, HTTP_ACCEPT_LANGUAGE="en", HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    @mock.patch.object(PublisherItemListView, "use_conditional_response", True)
+    def test_editor_no_cache_control(self):
+        self.login_editor_user()
+        with mock.patch.object(app_settings, "PUBLISHER_VIEW_MAX_AGE", 3600):
+            response = self.client.get(self.list_page_url + "?edit", HTTP_ACCEPT_LANGUAGE="en")
+        self.assertNotIn("max-age=3600", response["Cache-Control"])
+        self.assertIn("max-age=0", response["Cache-Control"])
+        self.assertFalse(response.has_header("ETag"))
+
     #-------------------------------------------------------------------------
 
     def test_anonymous_hidden(self):
@@ -1,5 +1,6 @@
 
 import unittest
+from unittest import mock
 
 from django import test
 from django.core.cache import cache
@@ -17,6 +18,9 @@ if parler_exists:
 
 @unittest.skipIf(parler_exists != True, 'Django-Parler is not installed')
 class PublisherParlerTest(test.TestCase):
+    def tearDown(self):
+        # Clear the parler cache
+        cache.clear()
 
     def test_queryset_subclass(self):
         queryset = PublisherParlerTestModel.objects.all()
@@ -83,6 +87,124 @@ class PublisherParlerTest(test.TestCase):
         count = PublisherParlerTestModel.objects.visible().count()
         self.assertEqual(count, 1)
 
+    def test_publish_in_place_syncs_translations(self):
+        instance = PublisherParlerTestModel.objects.language('en').create(title='one')
+        instance.create_translation('de', title='eins')
+        publish_obj = instance.publish()
+        public_pk = publish_obj.pk
+
+        instance = PublisherParlerTestModel.objects.get(pk=instance.pk)
+        instance.set_current_language('en')
+        instance.title = 'two'
+        instance.save()
+        instance.delete_translation('de')
+
+        with mock.patch.object(PublisherParlerTestModel, "publisher_update_in_place", True):
+            publish_obj = instance.publish()
+
+        self.assertEqual(publish_obj.pk, public_pk)
+
+        cache.clear()
+        publish_obj = PublisherParlerTestModel.objects.published().get()
+        self.assertEqual(publish_obj.pk, public_pk)
+        self.assertEqual(sorted(publish_obj.get_available_languages()), ['en'])
+        self.assertEqual(publish_obj.safe_translation_getter('title', language_code='en'), 'two')
+
+
+    def test_bulk_publish_translations(self):
+        for no in range(3):
+            instance = PublisherParlerTestModel.objects.language('en').create(title='title %i' % no)
+            instance.create_translation('de', title='Titel %i' % no)
+
+        count = PublisherParlerTestModel.objects.all().publish()
+        self.assertEqual(count, 3)
+
+        cache.clear()
+        for publish_obj in PublisherParlerTestModel.objects.published():
+            self.assertEqual(sorted(publish_obj.get_available_languages()), ['de', 'en'])
+            draft = publish_obj.get_draft_object()
+            for language_code in ('de', 'en'):
+                self.assertEqual(
+                    publish_obj.safe_translation_getter('title', language_code=language_code),
+                    draft.safe_translation_getter('title', language_code=language_code),
+                )
+
+    def test_publish_in_place_invalidates_translation_cache(self):
+        instance = PublisherParlerTestModel.objects.language('en').create(title='one')
+        instance.publish()
+
+        # Fill the parler cache with the public translation:
+        publish_obj = PublisherParlerTestModel.objects.published().get()
+        self.assertEqual(publish_obj.safe_translation_getter('title', language_code='en'), 'one')
+
+        instance = PublisherParlerTestModel.objects.drafts().get()
+        instance.set_current_language('en')
+        instance.title = 'two'
+        instance.save()
+
+        with mock.patch.object(PublisherParlerTestModel, "publisher_update_in_place", True):
+            instance.publish()
+
+        publish_obj = PublisherParlerTestModel.objects.published().get()
+        self.assertEqual(publish_obj.safe_translation_getter('title', language_code='en'), 'two')
+
+    def test_bulk_clone_translations_queries(self):
+        pairs = []
+        for no in range(3):
+            instance = PublisherParlerTestModel.objects.language('en').create(title='title %i' % no)
+            instance.create_translation('de', title='Titel %i' % no)
+            instance.create_translation('fr', title='titre %i' % no)
+            dst_obj = PublisherParlerTestModel.objects.create(publisher_is_draft=False)
+            pairs.append((instance, dst_obj))
+
+        # DELETE old translations + SELECT translations + one INSERT
+        with self.assertNumQueries(3):
+            PublisherParlerTestModel.bulk_clone_translations(pairs, replace=True)
+
+        for instance, dst_obj in pairs:
+            self.assertEqual(sorted(dst_obj.get_available_languages()), ['de', 'en', 'fr'])
+
+    def test_fingerprint_translations(self):
+        with mock.patch.object(PublisherParlerTestModel, "publisher_track_fingerprint", True):
+            instance = PublisherParlerTestModel.objects.language('en').create(title='one')
+            instance.publish()
+            self.assertFalse(instance.is_dirty)
+
+            instance = PublisherParlerTestModel.objects.drafts().get()
+            instance.set_current_language('en')
+            instance.title = 'one'
+            instance.save()
+            self.assertFalse(instance.is_dirty)
+
+            instance.title = 'two'
+            instance.save()
+            self.assertTrue(instance.is_dirty)
+            instance.publish()
+            self.assertFalse(instance.is_dirty)
+
+            instance.create_translation('de', title='zwei')
+            instance.save()
+            self.assertTrue(instance.is_dirty)
+
+    def test_track_changes_translations(self):
+        with mock.patch.object(PublisherParlerTestModel, "publisher_track_changes", True):
+            instance = PublisherParlerTestModel.objects.language('en').create(title='one')
+            instance.publish()
+
+            instance = PublisherParlerTestModel.objects.drafts().get()
+            instance.set_current_language('en')
+            self.assertEqual(instance.title, 'one')
+            instance.save()
+            self.assertFalse(instance.is_dirty)
+
+            # A changed translation marks the draft as dirty:
+            instance.title = 'two'
+            instance.save()
+            self.assertTrue(instance.is_dirty)
+
+            instance = PublisherParlerTestModel.objects.drafts().get()
+            instance.set_current_language('en')
+            self.assertEqual(instance.title, 'two')
 
 
 @unittest.skipIf(aldryn_translation_tools_exists != True, 'aldryn_translation_tools is not installed')
@@ -0,0 +1,198 @@
+"""
+    PlaceholderField handling on publish
+"""
+
+from unittest import mock
+
+from django import test
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from cms.api import add_plugin
+
+from publisher_test_project.publisher_list_app.models import PublisherItem
+from publisher_test_project.publisher_test_app.models import PublisherTestModel
+
+
+class PublisherPlaceholderTest(test.TestCase):
+    def tearDown(self):
+        # Clear the parler cache
+        cache.clear()
+
+    def _create_draft(self, text):
+        draft = PublisherItem.objects.language("en").create(text=text)
+        add_plugin(draft.content, "PlainTextPlugin", "en", text="plugin one")
+        return draft
+
+    def _get_plugin_texts(self, placeholder):
+        return [
+            plugin.get_plugin_instance()[0].text
+            for plugin in placeholder.get_plugins_list()
+        ]
+
+    def test_placeholder_fields_class_attribute(self):
+        self.assertEqual(PublisherItem.publisher_placeholder_fields, ("content",))
+        self.assertEqual(PublisherTestModel.publisher_placeholder_fields, ())
+
+        draft = PublisherItem(text="item")
+        self.assertEqual(draft.get_placeholder_fields(), ("content",))
+
+    def test_publish_copies_plugins(self):
+        draft = self._create_draft(text="item")
+        publish_obj = draft.publish()
+
+        self.assertNotEqual(publish_obj.content.pk, draft.content.pk)
+        self.assertEqual(self._get_plugin_texts(publish_obj.content), ["plugin one"])
+        self.assertEqual(self._get_plugin_texts(draft.content), ["plugin one"])
+
+    def test_publish_in_place_keeps_placeholder(self):
+        draft = self._create_draft(text="item")
+
+        with mock.patch.object(PublisherItem, "publisher_update_in_place", True):
+            publish_obj = draft.publish()
+            public_pk = publish_obj.pk
+            placeholder_pk = publish_obj.content.pk
+
+            add_plugin(draft.content, "PlainTextPlugin", "en", text="plugin two")
+            draft.text = "changed item"
+            draft.save()
+
+            publish_obj = draft.publish()
+
+        self.assertEqual(publish_obj.pk, public_pk)
+
+        publish_obj = PublisherItem.objects.published().get()
+        self.assertEqual(publish_obj.pk, public_pk)
+        self.assertEqual(publish_obj.content.pk, placeholder_pk)
+        self.assertEqual(
+            self._get_plugin_texts(publish_obj.content),
+            ["plugin one", "plugin two"]
+        )
+        self.assertEqual(
+            publish_obj.safe_translation_getter("text", language_code="en"),
+            "changed item"
+        )
+
+    def test_bulk_publish_copies_plugins(self):
+        draft1 = self._create_draft(text="item one")
+        draft2 = self._create_draft(text="item two")
+
+        count = PublisherItem.objects.filter(pk__in=[draft1.pk, draft2.pk]).publish()
+        self.assertEqual(count, 2)
+
+        for publish_obj in PublisherItem.objects.published():
+            draft = publish_obj.get_draft_object()
+            self.assertNotEqual(publish_obj.content.pk, draft.content.pk)
+            self.assertEqual(self._get_plugin_texts(publish_obj.content), ["plugin one"])
+
+    def test_bulk_clone_placeholders_existing(self):
+        drafts = [self._create_draft(text="item %i" % no) for no in range(3)]
+        public_objects = [draft.publish() for draft in drafts]
+        for draft in drafts:
+            add_plugin(draft.content, "PlainTextPlugin", "en", text="plugin two")
+
+        # The placeholders of the public objects exist: The old plugins are
+        # deleted with one query and no placeholder is created.
+        with CaptureQueriesContext(connection) as queries:
+            PublisherItem.bulk_clone_placeholders(list(zip(drafts, public_objects)))
+        self.assertFalse([query for query in queries if 'INSERT INTO "cms_placeholder"' in query["sql"]])
+
+        for publish_obj in public_objects:
+            self.assertEqual(self._get_plugin_texts(publish_obj.content), ["plugin one", "plugin two"])
+
+    def test_bulk_publish_queries(self):
+        def publish(count):
+            PublisherItem.objects.all().delete()
+            for no in range(count):
+                PublisherItem.objects.language("en").create(text="item %i" % no)
+
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(PublisherItem.objects.all().publish(), count)
+            inserts = [query for query in queries if 'INSERT INTO "cms_placeholder"' in query["sql"]]
+            return len(queries), len(inserts)
+
+        queries2, inserts2 = publish(2)
+        queries4, inserts4 = publish(4)
+
+        # PlaceholderField.pre_save() creates one placeholder per public object,
+        # all other queries don't depend on the number of drafts:
+        self.assertEqual((inserts2, inserts4), (2, 4))
+        self.assertEqual(queries4 - queries2, 2)
+
+    def test_fingerprint_plugins(self):
+        with mock.patch.object(PublisherItem, "publisher_track_fingerprint", True):
+            draft = self._create_draft(text="item")
+            draft.save()
+            fingerprint = draft.publisher_fingerprint
+            draft.publish()
+            self.assertFalse(draft.is_dirty)
+
+            plugin = draft.content.get_plugins_list()[0].get_plugin_instance()[0]
+            plugin.text = "changed"
+            plugin.save()
+            draft.save()
+            self.assertNotEqual(draft.publisher_fingerprint, fingerprint)
+            self.assertTrue(draft.is_dirty)
+
+    def test_with_publish_status_plugins(self):
+        draft = self._create_draft(text="item")
+        draft.publish()
+
+        qs = PublisherItem.objects.drafts().with_publish_status()
+        self.assertFalse(qs.get().publisher_status_is_dirty)
+
+        plugin = draft.content.get_plugins_list()[0].get_plugin_instance()[0]
+        plugin.text = "changed"
+        plugin.save()
+
+        draft = PublisherItem.objects.drafts().get()
+        self.assertTrue(draft.is_dirty)
+
+        qs = PublisherItem.objects.drafts().with_publish_status()
+        self.assertTrue(qs.get().publisher_status_is_dirty)
+
+    def test_bulk_clone_placeholders(self):
+        draft1 = self._create_draft(text="item one")
+        add_plugin(draft1.content, "PlainTextPlugin", "en", text="plugin two")
+        draft2 = self._create_draft(text="item two")
+
+        # The second copy shares the placeholder with its draft:
+        dst1 = PublisherItem.objects.language("en").create(text="copy one", publisher_is_draft=False)
+        dst2 = PublisherItem.objects.language("en").create(text="copy two", publisher_is_draft=False)
+        PublisherItem.objects.filter(pk=dst2.pk).update(content=draft2.content)
+        dst2 = PublisherItem.objects.get(pk=dst2.pk)
+        add_plugin(dst1.content, "PlainTextPlugin", "en", text="old plugin")
+
+        PublisherItem.bulk_clone_placeholders([(draft1, dst1), (draft2, dst2)])
+
+        dst1 = PublisherItem.objects.get(pk=dst1.pk)
+        dst2 = PublisherItem.objects.get(pk=dst2.pk)
+        self.assertNotEqual(dst2.content.pk, draft2.content.pk)
+        self.assertEqual(self._get_plugin_texts(dst1.content), ["plugin one", "plugin two"])
+        self.assertEqual(self._get_plugin_texts(dst2.content), ["plugin one"])
+        self.assertEqual(self._get_plugin_texts(draft2.content), ["plugin one"])
+
+    def test_revert_to_public(self):
+        draft = self._create_draft(text="item")
+        publish_obj = draft.publish()
+
+        draft = PublisherItem.objects.language("en").get(pk=draft.pk)
+        draft.text = "changed"
+        draft.save()
+        add_plugin(draft.content, "PlainTextPlugin", "en", text="plugin two")
+        self.assertTrue(draft.is_dirty)
+
+        revert_obj = draft.revert_to_public()
+        self.assertEqual(revert_obj.pk, draft.pk)
+        self.assertEqual(revert_obj.content.pk, draft.content.pk)
+        self.assertFalse(revert_obj.is_dirty)
+
+        draft = PublisherItem.objects.language("en").get(pk=draft.pk)
+        self.assertEqual(draft.text, "item")
+        self.assertEqual(self._get_plugin_texts(draft.content), ["plugin one"])
+        self.assertFalse(draft.is_dirty)
+
+        # The public version is untouched:
+        self.assertEqual(PublisherItem.objects.published().get().pk, publish_obj.pk)
+        self.assertEqual(self._get_plugin_texts(publish_obj.content), ["plugin one"])
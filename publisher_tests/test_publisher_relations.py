@@ -0,0 +1,235 @@
+"""
+    Clone relations listed in 'publisher_clone_relations' on publish
+"""
+
+from unittest import mock
+
+from django import test
+
+from publisher import dependencies
+from publisher_test_project.publisher_test_app.models import PublisherRelationTestModel, PublisherRelationTestNote
+
+
+class PublisherRelationsTest(test.TestCase):
+
+    def _create_draft(self, title, notes=(), parent=None):
+        draft = PublisherRelationTestModel.objects.create(title=title, parent=parent)
+        for text in notes:
+            PublisherRelationTestNote.objects.create(relation_test_model=draft, text=text)
+        return draft
+
+    def _get_notes(self, obj):
+        return list(obj.notes.order_by("pk").values_list("text", flat=True))
+
+    def test_publish_clones_relations(self):
+        published_target = self._create_draft(title="published")
+        public_target = published_target.publish()
+        not_published_target = self._create_draft(title="not published")
+
+        draft = self._create_draft(title="draft", notes=("one", "two"))
+        draft.links.add(published_target, not_published_target)
+
+        publish_obj = draft.publish()
+
+        # The draft target is replaced by the public version, the not published target is skipped:
+        self.assertEqual(list(publish_obj.links.all()), [public_target])
+        self.assertEqual(self._get_notes(publish_obj), ["one", "two"])
+
+        # The draft is unchanged:
+        self.assertEqual(
+            sorted(draft.links.values_list("title", flat=True)),
+            ["not published", "published"]
+        )
+        self.assertEqual(self._get_notes(draft), ["one", "two"])
+
+    def test_publish_in_place_replaces_relations(self):
+        draft = self._create_draft(title="draft", notes=("one",))
+
+        with mock.patch.object(PublisherRelationTestModel, "publisher_update_in_place", True):
+            publish_obj = draft.publish()
+
+            PublisherRelationTestNote.objects.create(relation_test_model=draft, text="two")
+            draft.save()
+            publish_obj = draft.publish()
+
+        self.assertEqual(self._get_notes(publish_obj), ["one", "two"])
+        self.assertEqual(PublisherRelationTestNote.objects.count(), 4)
+
+    def test_bulk_publish_remaps_targets(self):
+        target = self._create_draft(title="target")
+        draft = self._create_draft(title="draft", notes=("one",))
+        draft.links.add(target)
+
+        PublisherRelationTestModel.objects.all().publish()
+
+        publish_obj = PublisherRelationTestModel.objects.published().get(title="draft")
+        public_target = PublisherRelationTestModel.objects.published().get(title="target")
+        self.assertEqual(list(publish_obj.links.all()), [public_target])
+        self.assertEqual(self._get_notes(publish_obj), ["one"])
+
+    def test_revert_to_public_restores_relations(self):
+        target = self._create_draft(title="target")
+        target.publish()
+        other = self._create_draft(title="other")
+        other.publish()
+
+        draft = self._create_draft(title="draft", notes=("one",))
+        draft.links.add(target)
+        draft.publish()
+
+        draft.links.set([other])
+        PublisherRelationTestNote.objects.create(relation_test_model=draft, text="two")
+
+        draft.revert_to_public()
+
+        # The public targets are replaced by their drafts:
+        self.assertEqual(list(draft.links.all()), [target])
+        self.assertEqual(self._get_notes(draft), ["one"])
+
+    def test_bulk_clone_relations_queries(self):
+        target = self._create_draft(title="target")
+        target.publish()
+
+        pairs = []
+        for no in range(5):
+            draft = self._create_draft(title="draft %i" % no, notes=("one", "two"))
+            draft.links.add(target)
+            dst_obj = PublisherRelationTestModel.objects.create(title="copy %i" % no, publisher_is_draft=False)
+            pairs.append((draft, dst_obj))
+
+        # links: SELECT through rows + SELECT public targets + INSERT
+        # notes: SELECT + INSERT
+        with self.assertNumQueries(5):
+            PublisherRelationTestModel.bulk_clone_relations(pairs)
+
+        for draft, dst_obj in pairs:
+            self.assertEqual(list(dst_obj.links.all()), [target.publisher_linked])
+            self.assertEqual(self._get_notes(dst_obj), ["one", "two"])
+
+    def _get_published_titles(self):
+        return sorted(PublisherRelationTestModel.objects.published().values_list("title", flat=True))
+
+    def test_publish_with_dependencies(self):
+        grandparent = self._create_draft(title="grandparent")
+        parent = self._create_draft(title="parent", parent=grandparent)
+        link = self._create_draft(title="link")
+        parent.links.add(link)
+        draft = self._create_draft(title="draft", parent=parent)
+        self._create_draft(title="not related")
+
+        graph = dependencies.get_dependency_graph(draft)
+        self.assertEqual(len(graph), 4)
+        self.assertEqual(
+            dependencies.get_publish_batches(graph),
+            [
+                set([(PublisherRelationTestModel, grandparent.pk), (PublisherRelationTestModel, link.pk)]),
+                set([(PublisherRelationTestModel, parent.pk)]),
+                set([(PublisherRelationTestModel, draft.pk)]),
+            ]
+        )
+
+        publish_obj = draft.publish(with_dependencies=True)
+        self.assertEqual(self._get_published_titles(), ["draft", "grandparent", "link", "parent"])
+        self.assertIs(publish_obj.parent.publisher_is_draft, False)
+
+        # "link" was published before "parent", so the link is not skipped:
+        public_parent = PublisherRelationTestModel.objects.published().get(title="parent")
+        self.assertEqual(list(public_parent.links.values_list("title", flat=True)), ["link"])
+
+        # The public ForeignKeys points to the public dependencies:
+        public = PublisherRelationTestModel.objects.published().get(title="draft")
+        self.assertIs(public.parent.publisher_is_draft, False)
+        self.assertEqual(public.parent.pk, public_parent.pk)
+        self.assertIs(public_parent.parent.publisher_is_draft, False)
+        self.assertEqual(public_parent.parent.title, "grandparent")
+
+    def _create_dependent(self):
+        target = self._create_draft(title="target")
+        draft = self._create_draft(title="draft", parent=target)
+        draft.links.add(target)
+        draft.publish(with_dependencies=True)
+
+        public = PublisherRelationTestModel.objects.published().get(title="draft")
+        self.assertEqual(public.parent.title, "target")
+        self.assertIs(public.parent.publisher_is_draft, False)
+        self.assertEqual([obj.publisher_is_draft for obj in public.links.all()], [False])
+
+        target = PublisherRelationTestModel.objects.drafts().get(pk=target.pk)
+        return target, draft
+
+    def _assert_references(self, draft):
+        draft = PublisherRelationTestModel.objects.drafts().get(pk=draft.pk)
+        self.assertIsNotNone(draft.publisher_linked_id)
+        self.assertFalse(draft.is_dirty)
+
+        public_target = PublisherRelationTestModel.objects.published().get(title="target2")
+        public = PublisherRelationTestModel.objects.published().get(title="draft")
+        self.assertEqual(public.pk, draft.publisher_linked_id)
+        self.assertEqual(public.parent_id, public_target.pk)
+        self.assertEqual(list(public.links.all()), [public_target])
+
+    def test_republish_dependency_keeps_references(self):
+        target, draft = self._create_dependent()
+
+        # The public target is replaced, the references of the public draft are kept
+        # (and not deleted by on_delete=CASCADE):
+        target.title = "target2"
+        target.save()
+        target.publish()
+
+        self.assertEqual(self._get_published_titles(), ["draft", "target2"])
+        self._assert_references(draft)
+
+    def test_bulk_republish_dependency_keeps_references(self):
+        target, draft = self._create_dependent()
+
+        target.title = "target2"
+        target.save()
+        self.assertEqual(PublisherRelationTestModel.objects.filter(pk=target.pk).publish(), 1)
+
+        self.assertEqual(self._get_published_titles(), ["draft", "target2"])
+        self._assert_references(draft)
+
+    def test_remap_foreign_keys_queries(self):
+        pks = []
+        for no in range(3):
+            parent = self._create_draft(title="parent %i" % no)
+            parent.publish()
+            draft = self._create_draft(title="draft %i" % no, parent=parent)
+            draft.publish() # The public ForeignKey points to the draft parent
+            pks.append(draft.pk)
+
+        # Doesn't depend on the number of targets:
+        with self.assertNumQueries(4):
+            changes = dependencies.remap_foreign_keys(PublisherRelationTestModel, pks, using="default")
+        self.assertEqual(len(changes), 3)
+
+        for public in PublisherRelationTestModel.objects.published().filter(title__startswith="draft"):
+            self.assertIs(public.parent.publisher_is_draft, False)
+            self.assertEqual(public.parent.title, public.title.replace("draft", "parent"))
+
+    def test_publish_without_dependencies(self):
+        parent = self._create_draft(title="parent")
+        draft = self._create_draft(title="draft", parent=parent)
+
+        draft.publish()
+        self.assertEqual(self._get_published_titles(), ["draft"])
+
+    def test_publish_with_dependencies_skips_not_dirty(self):
+        parent = self._create_draft(title="parent")
+        public_parent = parent.publish()
+        draft = self._create_draft(title="draft", parent=parent)
+
+        draft.publish(with_dependencies=True)
+        self.assertEqual(self._get_published_titles(), ["draft", "parent"])
+        self.assertEqual(PublisherRelationTestModel.objects.published().get(title="parent").pk, public_parent.pk)
+
+    def test_publish_with_cyclic_dependencies(self):
+        draft1 = self._create_draft(title="one")
+        draft2 = self._create_draft(title="two", parent=draft1)
+        draft3 = self._create_draft(title="three", parent=draft2)
+        draft1.parent = draft3
+        draft1.save()
+
+        draft1.publish(with_dependencies=True)
+        self.assertEqual(self._get_published_titles(), ["one", "three", "two"])
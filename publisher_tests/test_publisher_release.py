@@ -0,0 +1,130 @@
+"""
+    (Un-)publish many entries together via PublisherRelease
+"""
+
+import datetime
+from unittest import mock
+
+from django import test
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from publisher import constants, scheduler
+from publisher.managers import PublisherQuerySet
+from publisher.models import PublisherRelease
+from publisher_test_project.publisher_test_app.models import PublisherRelationTestModel, PublisherTestModel
+from publisher_tests.base import ClientBaseTestCase
+
+
+class PublisherReleaseTest(test.TestCase):
+
+    def test_execute(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+        draft3 = PublisherTestModel.objects.create(no=3, title="three")
+        draft3.publish()
+
+        # The link target is added after the link source:
+        source = PublisherRelationTestModel.objects.create(title="source")
+        target = PublisherRelationTestModel.objects.create(title="target")
+        source.links.add(target)
+
+        release = PublisherRelease.objects.create(name="release")
+        release.add(draft1)
+        release.add(draft2)
+        release.add(draft3, action=constants.ACTION_UNPUBLISH)
+        release.add(source)
+        release.add(target)
+
+        self.assertEqual(PublisherTestModel.objects.published().count(), 1)
+
+        self.assertEqual(release.execute(), (4, 1))
+
+        self.assertEqual(release.state, constants.RELEASE_STATE_DONE)
+        self.assertNotEqual(release.executed_at, None)
+        self.assertEqual(
+            sorted(PublisherTestModel.objects.published().values_list("title", flat=True)),
+            ["one", "two"]
+        )
+
+        # Dependencies are published first, so the link is not skipped:
+        public_source = PublisherRelationTestModel.objects.published().get(title="source")
+        self.assertEqual(list(public_source.links.values_list("title", flat=True)), ["target"])
+
+        # Can't be executed twice:
+        self.assertEqual(release.execute(), (0, 0))
+
+    def test_add_twice(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        release = PublisherRelease.objects.create(name="release")
+        release.add(draft)
+        release.add(draft.publish(), action=constants.ACTION_UNPUBLISH)
+
+        item = release.items.get()
+        self.assertEqual(item.object_id, draft.pk)
+        self.assertEqual(item.action, constants.ACTION_UNPUBLISH)
+
+    def test_failed_release_is_rolled_back(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+        draft2.publish()
+
+        release = PublisherRelease.objects.create(name="release")
+        release.add(draft1)
+        release.add(draft2, action=constants.ACTION_UNPUBLISH)
+
+        with mock.patch.object(PublisherQuerySet, "unpublish", side_effect=RuntimeError("Boom")):
+            with self.assertRaises(RuntimeError):
+                release.execute()
+
+        release.refresh_from_db()
+        self.assertEqual(release.state, constants.RELEASE_STATE_FAILED)
+        self.assertEqual(release.error, "RuntimeError: Boom")
+
+        # draft1 was published before the error: rolled back
+        self.assertEqual(list(PublisherTestModel.objects.published().values_list("title", flat=True)), ["two"])
+
+    def test_scheduled(self):
+        now = timezone.now()
+        hour = datetime.timedelta(hours=1)
+
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        release1 = PublisherRelease.objects.create(name="due", scheduled_at=now - hour)
+        release1.add(draft1)
+
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+        release2 = PublisherRelease.objects.create(name="later", scheduled_at=now + hour)
+        release2.add(draft2)
+
+        self.assertEqual(list(PublisherRelease.objects.due(now)), [release1])
+        self.assertEqual(scheduler.next_transition(now, models=[]), now + hour)
+
+        out = StringIO()
+        call_command("publisher_scheduler", "--once", stdout=out)
+        self.assertIn("1 releases executed.", out.getvalue())
+
+        self.assertEqual(list(PublisherTestModel.objects.published().values_list("title", flat=True)), ["one"])
+        release2.refresh_from_db()
+        self.assertEqual(release2.state, constants.RELEASE_STATE_OPEN)
+
+
+class PublisherReleaseAdminTest(ClientBaseTestCase):
+
+    def test_execute_action(self):
+        draft = PublisherTestModel.objects.create(no=1, title="foobar")
+        release = PublisherRelease.objects.create(name="release")
+        release.add(draft)
+        published_count = PublisherTestModel.objects.published().count()
+
+        self.login_superuser()
+        response = self.client.post(
+            "/en/admin/publisher/publisherrelease/",
+            data={"action": "execute_releases", "_selected_action": [release.pk]},
+            HTTP_ACCEPT_LANGUAGE="en",
+        )
+        self.assertRedirects(response, "/en/admin/publisher/publisherrelease/", fetch_redirect_response=False)
+
+        release.refresh_from_db()
+        self.assertEqual(release.state, constants.RELEASE_STATE_DONE)
+        self.assertEqual(PublisherTestModel.objects.published().count(), published_count + 1)
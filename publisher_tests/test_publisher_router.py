@@ -0,0 +1,103 @@
+"""
+    Read public entries from replicas, see: publisher/routers.py
+"""
+
+from unittest import mock
+
+from django import test
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from publisher import app_settings, routers
+from publisher.models import PublisherStateModel
+from publisher_test_project.publisher_test_app.models import PublisherTestModel
+
+
+# TransactionTestCase: The pin is set by the post signals, on commit
+@mock.patch.object(app_settings, "PUBLISHER_READ_DATABASES", ("replica",))
+class PublisherRouterTest(test.TransactionTestCase):
+    def setUp(self):
+        super(PublisherRouterTest, self).setUp()
+        routers.unpin()
+        self.patcher = mock.patch.object(router, "routers", [routers.PublisherRouter()])
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        routers.unpin()
+        super(PublisherRouterTest, self).tearDown()
+
+    def test_db_for_read(self):
+        self.assertEqual(PublisherTestModel.objects.visible().db, "replica")
+        self.assertEqual(PublisherTestModel.objects.published().filter(no=1).db, "replica")
+
+        self.assertEqual(PublisherTestModel.objects.drafts().db, "default")
+        self.assertEqual(PublisherTestModel.objects.all().db, "default")
+        self.assertEqual(PublisherStateModel.objects.all().db, "default")
+
+        # (Un-)publish never writes to a replica:
+        self.assertEqual(PublisherTestModel.objects.published()._get_write_db(), "default")
+
+        with mock.patch.object(app_settings, "PUBLISHER_READ_DATABASES", ()):
+            self.assertEqual(PublisherTestModel.objects.visible().db, "default")
+
+    def test_pinned_after_publish(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        PublisherTestModel.objects.filter(pk=draft.pk).publish()
+
+        self.assertTrue(routers.is_pinned())
+        self.assertEqual(PublisherTestModel.objects.visible().db, "default")
+
+        routers.unpin()
+        self.assertEqual(PublisherTestModel.objects.visible().db, "replica")
+
+        with mock.patch.object(app_settings, "PUBLISHER_PIN_SECONDS", 0):
+            routers.pin_to_primary()
+        self.assertFalse(routers.is_pinned())
+
+    def test_pinned_after_revert_and_rollback(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        with mock.patch.object(PublisherTestModel, "publisher_snapshots", True):
+            draft.publish()
+        routers.unpin()
+
+        draft.title = "two"
+        draft.save()
+        draft.revert_to_public()
+        self.assertTrue(routers.is_pinned())
+
+        routers.unpin()
+        draft.rollback_to(draft.get_snapshots().get())
+        self.assertTrue(routers.is_pinned())
+        self.assertEqual(PublisherTestModel.objects.visible().db, "default")
+
+    def test_write_replica_instance(self):
+        instance = PublisherTestModel(no=1, title="one")
+        instance._state.db = "replica"
+        self.assertEqual(router.db_for_write(PublisherTestModel, instance=instance), "default")
+
+    def test_middleware(self):
+        def publish_view(request):
+            routers.pin_to_primary()
+            return HttpResponse()
+
+        def public_view(request):
+            return HttpResponse(PublisherTestModel.objects.visible().db)
+
+        factory = RequestFactory()
+
+        response = routers.PublisherPinningMiddleware(publish_view)(factory.post("/"))
+        cookie = response.cookies[routers.PIN_COOKIE_NAME]
+        self.assertEqual(cookie["max-age"], app_settings.PUBLISHER_PIN_SECONDS)
+        self.assertFalse(routers.is_pinned())
+
+        request = factory.get("/")
+        request.COOKIES[routers.PIN_COOKIE_NAME] = cookie.value
+        response = routers.PublisherPinningMiddleware(public_view)(request)
+        self.assertEqual(response.content, b"default")
+        self.assertNotIn(routers.PIN_COOKIE_NAME, response.cookies)
+
+        response = routers.PublisherPinningMiddleware(public_view)(factory.get("/"))
+        self.assertEqual(response.content, b"replica")
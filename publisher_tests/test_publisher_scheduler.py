@@ -0,0 +1,179 @@
+"""
+    Visibility transitions by publication start/end date
+"""
+
+import datetime
+from unittest import mock
+
+from django import test
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from publisher import app_settings, scheduler
+from publisher.models import PublisherSchedulerRun
+from publisher.signals import publisher_became_hidden, publisher_became_visible
+from publisher_test_project.publisher_test_app.models import PublisherTestModel
+
+
+class PublisherSchedulerTest(test.TestCase):
+
+    def setUp(self):
+        super(PublisherSchedulerTest, self).setUp()
+        self.now = timezone.now()
+        self.received = []
+        publisher_became_visible.connect(self.visible_handler)
+        publisher_became_hidden.connect(self.hidden_handler)
+
+    def tearDown(self):
+        publisher_became_visible.disconnect(self.visible_handler)
+        publisher_became_hidden.disconnect(self.hidden_handler)
+        cache.clear()
+        super(PublisherSchedulerTest, self).tearDown()
+
+    def visible_handler(self, sender, pks, **kwargs):
+        self.received.append(("visible", sender, pks))
+
+    def hidden_handler(self, sender, pks, **kwargs):
+        self.received.append(("hidden", sender, pks))
+
+    def create_public(self, no, start=None, end=None):
+        draft = PublisherTestModel.objects.create(
+            no=no, title="no %i" % no,
+            publication_start_date=start, publication_end_date=end,
+        )
+        return draft.publish()
+
+    def test_track_visible(self):
+        hour = datetime.timedelta(hours=1)
+        with mock.patch.object(PublisherTestModel, "publisher_track_visible", True):
+            starts = self.create_public(no=1, start=self.now + hour)
+            ends = self.create_public(no=2, end=self.now + hour * 2)
+            self.create_public(no=3, end=self.now - hour) # never visible
+            self.assertFalse(starts.publisher_visible)
+            self.assertTrue(ends.publisher_visible)
+
+            def get_visible():
+                return sorted(PublisherTestModel.objects.visible().values_list("no", flat=True))
+
+            self.assertEqual(get_visible(), [2])
+            self.assertIn("publisher_visible", str(PublisherTestModel.objects.visible().query))
+
+            # Changed by the scheduler, not by the time:
+            with mock.patch.object(timezone, "now", return_value=self.now + hour * 3):
+                self.assertEqual(get_visible(), [2])
+
+            scheduler.send_transitions(self.now, self.now + hour, models=[PublisherTestModel])
+            self.assertEqual(get_visible(), [1, 2])
+
+            scheduler.send_transitions(self.now + hour, self.now + hour * 2, models=[PublisherTestModel])
+            self.assertEqual(get_visible(), [1])
+
+            # Bulk publish:
+            draft = PublisherTestModel.objects.drafts().get(no=2)
+            draft.publication_end_date = None
+            draft.save()
+            PublisherTestModel.objects.filter(no=2).publish()
+            self.assertEqual(get_visible(), [1, 2])
+
+            # Unpublish:
+            PublisherTestModel.objects.drafts().get(no=1).unpublish()
+            self.assertEqual(get_visible(), [2])
+
+    def test_enable_track_visible(self):
+        self.create_public(no=1)
+        self.create_public(no=2)
+
+        with mock.patch.object(PublisherTestModel, "publisher_track_visible", True):
+            # Not set for existing entries:
+            self.assertEqual(PublisherTestModel.objects.visible().count(), 0)
+
+            # publish() of a clean draft sets it:
+            PublisherTestModel.objects.drafts().get(no=1).publish()
+            self.assertEqual(list(PublisherTestModel.objects.visible().values_list("no", flat=True)), [1])
+
+            out = StringIO()
+            call_command("publisher_update_visible", stdout=out)
+            self.assertIn("publisher_test_app.PublisherTestModel: 1 entries updated.", out.getvalue())
+            self.assertEqual(PublisherTestModel.objects.visible().count(), 2)
+
+    def test_send_transitions(self):
+        hour = datetime.timedelta(hours=1)
+        starts = self.create_public(no=1, start=self.now + hour)
+        ends = self.create_public(no=2, end=self.now + hour * 2)
+        self.create_public(no=3) # always visible
+        self.create_public(no=4, start=self.now + hour, end=self.now + hour * 2)
+
+        self.assertEqual(scheduler.next_transition(self.now, models=[PublisherTestModel]), self.now + hour)
+        self.assertEqual(PublisherTestModel.objects.next_visibility_change(self.now + hour), self.now + hour * 2)
+        self.assertEqual(PublisherTestModel.objects.next_visibility_change(self.now + hour * 2), None)
+
+        # Nothing changed:
+        counts = scheduler.send_transitions(self.now, self.now + hour / 2, models=[PublisherTestModel])
+        self.assertEqual(counts, (0, 0))
+        self.assertEqual(self.received, [])
+
+        # Visible and hidden in one step: start < since < end <= now
+        counts = scheduler.send_transitions(self.now, self.now + hour * 3, models=[PublisherTestModel])
+        self.assertEqual(counts, (1, 1))
+        self.assertEqual(self.received, [
+            ("visible", PublisherTestModel, [starts.pk]),
+            ("hidden", PublisherTestModel, [ends.pk]),
+        ])
+
+    def test_batches(self):
+        hour = datetime.timedelta(hours=1)
+        pks = [self.create_public(no=no, start=self.now + hour).pk for no in range(5)]
+
+        scheduler.send_transitions(self.now, self.now + hour, models=[PublisherTestModel], batch_size=2)
+        self.assertEqual(self.received, [
+            ("visible", PublisherTestModel, pks[0:2]),
+            ("visible", PublisherTestModel, pks[2:4]),
+            ("visible", PublisherTestModel, pks[4:]),
+        ])
+
+    def test_command(self):
+        hour = datetime.timedelta(hours=1)
+        ended = self.create_public(no=1, end=self.now - hour)
+
+        out = StringIO()
+        since = (self.now - hour * 2).isoformat()
+        call_command("publisher_scheduler", "--once", "--since=%s" % since, stdout=out)
+        self.assertEqual(out.getvalue().strip(), "0 entries became visible, 1 entries became hidden.")
+        self.assertEqual(self.received, [("hidden", PublisherTestModel, [ended.pk])])
+
+        # Stored in the database, not in the cache:
+        cache.clear()
+        self.assertIsNotNone(PublisherSchedulerRun.objects.get_last_run())
+
+        # The next run starts at the last run:
+        out = StringIO()
+        call_command("publisher_scheduler", "--once", stdout=out)
+        self.assertEqual(out.getvalue(), "")
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(PublisherSchedulerRun.objects.count(), 1)
+
+    def test_command_first_run(self):
+        hour = datetime.timedelta(hours=1)
+        self.create_public(no=1, end=self.now - hour * 48)
+        ended = self.create_public(no=2, end=self.now - hour)
+        self.assertIsNone(PublisherSchedulerRun.objects.get_last_run())
+
+        # Catch up the changes of the last day:
+        out = StringIO()
+        with mock.patch.object(app_settings, "PUBLISHER_SCHEDULER_CATCH_UP", 24 * 60 * 60):
+            call_command("publisher_scheduler", "--once", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "0 entries became visible, 1 entries became hidden.")
+        self.assertEqual(self.received, [("hidden", PublisherTestModel, [ended.pk])])
+
+    def test_command_first_run_update_visible(self):
+        self.create_public(no=1)
+
+        with mock.patch.object(PublisherTestModel, "publisher_track_visible", True):
+            PublisherTestModel.objects.update(publisher_visible=False)
+
+            out = StringIO()
+            call_command("publisher_scheduler", "--once", stdout=out)
+            self.assertEqual(out.getvalue().strip(), "1 'publisher_visible' entries updated.")
+            self.assertEqual(PublisherTestModel.objects.visible().count(), 1)
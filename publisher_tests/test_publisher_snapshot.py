@@ -0,0 +1,165 @@
+"""
+    Restore public versions from PublisherSnapshot
+"""
+
+import datetime
+from unittest import mock
+
+from django import test
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from cms.api import add_plugin
+
+from publisher import app_settings
+from publisher.models import PublisherSnapshot
+from publisher_test_project.publisher_list_app.models import PublisherItem
+from publisher_test_project.publisher_test_app.models import PublisherTestModel
+
+
+@mock.patch.object(PublisherTestModel, "publisher_snapshots", True)
+class PublisherSnapshotTest(test.TestCase):
+
+    def _publish(self, draft, title):
+        draft.title = title
+        draft.save()
+        return draft.publish()
+
+    def test_rollback(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        publish_obj = draft.publish()
+        self._publish(draft, title="two")
+
+        snapshot2, snapshot1 = draft.get_snapshots()
+        self.assertEqual(snapshot1.get_data()["fields"]["title"], "one")
+        self.assertEqual(snapshot2.get_data()["fields"]["title"], "two")
+
+        publish_obj = draft.rollback_to(snapshot1)
+        self.assertEqual(publish_obj.title, "one")
+
+        publish_obj = PublisherTestModel.objects.published().get()
+        self.assertEqual(publish_obj.title, "one")
+
+        # The draft is not changed and has changes against the public version:
+        draft = PublisherTestModel.objects.drafts().get()
+        self.assertEqual(draft.title, "two")
+        self.assertEqual(draft.publisher_linked_id, publish_obj.pk)
+        self.assertTrue(draft.is_dirty)
+
+        draft.rollback_to(snapshot2)
+        self.assertEqual(PublisherTestModel.objects.published().get().title, "two")
+
+    def test_rollback_modified_at(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        self._publish(draft, title="two")
+        self.assertNotIn("publisher_modified_at", draft.get_snapshots().first().get_data()["fields"])
+
+        rolled_back = draft.rollback_to(draft.get_snapshots().last())
+
+        # The timestamp doesn't go backwards:
+        publish_obj = PublisherTestModel.objects.published().get()
+        self.assertEqual(publish_obj.title, "one")
+        self.assertGreater(publish_obj.publisher_modified_at, draft.get_snapshots().first().created_at)
+        self.assertEqual(publish_obj.publisher_modified_at, rolled_back.publisher_modified_at)
+
+        self.assertTrue(PublisherTestModel.objects.drafts().get().is_dirty)
+
+    def test_rollback_unpublished(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        draft.unpublish()
+
+        publish_obj = draft.rollback_to(draft.get_snapshots().get())
+        self.assertEqual(publish_obj.title, "one")
+        self.assertFalse(publish_obj.publisher_is_draft)
+
+        draft = PublisherTestModel.objects.drafts().get()
+        self.assertEqual(draft.publisher_linked_id, publish_obj.pk)
+
+    def test_rollback_foreign_snapshot(self):
+        draft1 = PublisherTestModel.objects.create(no=1, title="one")
+        draft1.publish()
+        draft2 = PublisherTestModel.objects.create(no=2, title="two")
+
+        with self.assertRaises(ValidationError):
+            draft2.rollback_to(draft1.get_snapshots().get())
+
+    def test_bulk_publish(self):
+        PublisherTestModel.objects.create(no=1, title="one")
+        PublisherTestModel.objects.create(no=2, title="two")
+        PublisherTestModel.objects.all().publish()
+
+        self.assertEqual(
+            sorted(snapshot.get_data()["fields"]["title"] for snapshot in PublisherSnapshot.objects.all()),
+            ["one", "two"]
+        )
+
+    def test_disabled(self):
+        with mock.patch.object(PublisherTestModel, "publisher_snapshots", False):
+            draft = PublisherTestModel.objects.create(no=1, title="one")
+            draft.publish()
+        self.assertEqual(PublisherSnapshot.objects.count(), 0)
+
+    def test_max_count(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        with mock.patch.object(app_settings, "PUBLISHER_SNAPSHOT_MAX_COUNT", 2):
+            draft.publish()
+            self._publish(draft, title="two")
+            self._publish(draft, title="three")
+
+        self.assertEqual(
+            [snapshot.get_data()["fields"]["title"] for snapshot in draft.get_snapshots()],
+            ["three", "two"]
+        )
+
+    def test_max_age(self):
+        draft = PublisherTestModel.objects.create(no=1, title="one")
+        draft.publish()
+        PublisherSnapshot.objects.update(created_at=timezone.now() - datetime.timedelta(days=8))
+
+        with mock.patch.object(app_settings, "PUBLISHER_SNAPSHOT_MAX_AGE", 7):
+            self._publish(draft, title="two")
+
+        self.assertEqual(
+            [snapshot.get_data()["fields"]["title"] for snapshot in draft.get_snapshots()],
+            ["two"]
+        )
+
+
+@mock.patch.object(PublisherItem, "publisher_snapshots", True)
+class PublisherSnapshotPlaceholderTest(test.TestCase):
+    def tearDown(self):
+        # Clear the parler cache
+        cache.clear()
+
+    def _get_plugin_texts(self, placeholder):
+        return [
+            plugin.get_plugin_instance()[0].text
+            for plugin in placeholder.get_plugins_list()
+        ]
+
+    def test_rollback_translations_and_plugins(self):
+        draft = PublisherItem.objects.language("en").create(text="one")
+        add_plugin(draft.content, "PlainTextPlugin", "en", text="plugin one")
+        draft.publish()
+
+        draft = PublisherItem.objects.language("en").get(pk=draft.pk)
+        draft.text = "two"
+        draft.save()
+        add_plugin(draft.content, "PlainTextPlugin", "en", text="plugin two")
+        draft.publish()
+
+        snapshot = draft.get_snapshots().last()
+        draft.rollback_to(snapshot)
+
+        publish_obj = PublisherItem.objects.published().language("en").get()
+        self.assertEqual(publish_obj.text, "one")
+        self.assertNotEqual(publish_obj.content.pk, draft.content.pk)
+        self.assertEqual(self._get_plugin_texts(publish_obj.content), ["plugin one"])
+
+        # The draft is not changed:
+        draft = PublisherItem.objects.drafts().language("en").get()
+        self.assertEqual(draft.text, "two")
+        self.assertEqual(self._get_plugin_texts(draft.content), ["plugin one", "plugin two"])